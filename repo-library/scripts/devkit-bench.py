@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""Benchmark harness for the DevKit scripts on a synthetic library.
+
+Builds a throwaway repo in a temp dir (copies of repo-library/scripts + a schema derived
+from config/schema.yml), fills library/ with generated tools, then times cold and warm
+runs of sync, validate, update-profile and catalogue generation as subprocesses.
+
+- Schema-driven: categories, file patterns, required fields/values/subfolders/sections
+  and example ids all come from config/schema.yml; only the author list is synthetic.
+- Cold = app caches (.devkit-cache/), sync state and destinations removed first;
+  warm = the same command again with everything in place.
+- The generated tree is backdated (BACKDATE_SECONDS) before timing: the library index
+  does not cache anything modified in the last 2 seconds, so a fresh tree would make
+  every warm run a cold one.
+- Peak memory = max RSS of the child process tree (wait4 rusage).
+- Fully offline: nothing outside the temp dir is read after setup or written at all.
+
+Example:
+  python3 repo-library/scripts/devkit-bench.py --authors 4 --items 1000 --save-baseline bench.json
+  python3 repo-library/scripts/devkit-bench.py --authors 4 --items 1000 --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+BENCHMARKS = ("update-profile", "validate", "catalogue", "sync")
+BACKDATE_SECONDS = 60  # well past devkit_library_index.RACY_NS
+WORDS = (
+    "agent command skill profile library sync review refactor test deploy debug "
+    "document search index cache schema release branch commit merge format lint"
+).split()
+
+
+def repo_root() -> Path:
+    return Path(__file__).resolve().parent.parent.parent
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def body_text(rng: random.Random, title: str, sections: List[str], paragraphs: int) -> str:
+    out = [f"# {title}", ""]
+    for heading in sections or ["## Purpose", "## Usage"]:
+        out += [heading, ""]
+        out += [sentence(rng, 40) + "." for _ in range(paragraphs)]
+        out.append("")
+    return "\n".join(out)
+
+
+def frontmatter(fields: Dict[str, Any]) -> str:
+    import yaml
+
+    return "---\n" + yaml.safe_dump(fields, sort_keys=False, default_flow_style=None).rstrip("\n") + "\n---\n\n"
+
+
+def field_value(name: str, tool_id: str, rng: random.Random) -> Any:
+    if name == "name":
+        return tool_id
+    if name == "description":
+        return sentence(rng, 8)
+    if name == "disable-model-invocation":
+        return True  # the validator treats false as a missing required field
+    if name == "user-invocable":
+        return True
+    if name == "hook_type":
+        return rng.choice(["PreToolUse", "PostToolUse", "Stop"])
+    return sentence(rng, 2)
+
+
+class LibraryGenerator:
+    # Writes library/<author>/<category>/... following each category's schema rules.
+
+    def __init__(self, root: Path, schema: Dict[str, Any], args: argparse.Namespace) -> None:
+        self.root = root
+        self.schema = schema
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.authors = [a["id"] for a in schema["authors"]]
+        self.extras: List[str] = []
+        self.scripts: List[str] = []
+        self.files = 0
+        self.bytes = 0
+
+    def write(self, path: Path, text: str, executable: bool = False) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        if executable:
+            path.chmod(0o755)
+        self.files += 1
+        self.bytes += len(text)
+
+    def ids(self, category: str, author: str, count: int) -> List[str]:
+        # The schema example id (if any) is created once, under the first author.
+        out = [f"{author}-{category}-{i:05d}" for i in range(count)]
+        example = self.schema["categories"][category].get("example")
+        if example and author == self.authors[0]:
+            out[0:1] = [example]
+        return out
+
+    def count_for(self, category: str) -> int:
+        if category in ("skills", "skills-user-only"):
+            return self.args.skills
+        if category == "extras":
+            return self.args.extras
+        if category == "scripts":
+            return self.args.scripts
+        if category in ("agents", "commands"):
+            return self.args.items
+        return max(1, self.args.items // 10)
+
+    def generate(self) -> None:
+        categories: Dict[str, Any] = self.schema["categories"]
+        # Dependency targets first, so other categories can reference them.
+        order = ["extras", "scripts"] + [c for c in categories if c not in ("extras", "scripts")]
+        for category in order:
+            if category not in categories:
+                continue
+            config = categories[category]
+            for author in self.authors:
+                for tool_id in self.ids(category, author, self.count_for(category)):
+                    self.generate_tool(category, config, author, tool_id)
+
+    def generate_tool(self, category: str, config: Dict[str, Any], author: str, tool_id: str) -> None:
+        rng = self.rng
+        library = self.root / "library"
+        if category == "scripts":
+            ext = rng.choice([".py", ".sh"])
+            shebang = "#!/usr/bin/env python3" if ext == ".py" else "#!/bin/bash"
+            self.write(library / author / "scripts" / f"{tool_id}{ext}", f"{shebang}\n# {sentence(rng, 6)}\n", True)
+            self.scripts.append(f"{tool_id}{ext}")
+            return
+        if category == "extras":
+            tool_id = f"{tool_id}-{rng.choice(['cli', 'gui'])}" if not config.get("example") == tool_id else tool_id
+            self.extras.append(tool_id)
+
+        fields: Dict[str, Any] = {name: field_value(name, tool_id, rng) for name in config.get("required_fields", [])}
+        fields.update(config.get("required_values", {}))
+        optional = config.get("optional_fields", [])
+        if "requires_extras" in optional and self.extras and rng.random() < self.args.deps:
+            fields["requires_extras"] = rng.sample(self.extras, min(len(self.extras), rng.randint(1, 3)))
+        if "requires_scripts" in optional and self.scripts and rng.random() < self.args.deps:
+            picks = rng.sample(self.scripts, min(len(self.scripts), rng.randint(1, 2)))
+            fields["requires_scripts"] = "`" + "`, `".join(picks) + "`"
+        text = frontmatter(fields) + body_text(rng, tool_id, config.get("required_sections", []), 3)
+
+        pattern = config.get("file_pattern", "{author}/" + category + "/{id}.md")
+        path = library / pattern.format(author=author, id=tool_id)
+        self.write(path, text)
+        if path.name == "SKILL.md":
+            skill_dir = path.parent
+            for sub in config.get("required_subfolders", []):
+                (skill_dir / sub).mkdir(parents=True, exist_ok=True)
+            for i in range(self.args.assets):
+                self.write(skill_dir / "assets" / f"asset-{i:02d}.txt", "x" * (self.args.asset_kb * 1024))
+            self.write(skill_dir / "reference" / "notes.md", body_text(rng, "Reference", [], 2))
+
+
+def backdate(top: Path, seconds: float) -> None:
+    # Files first, then their directory (bottom-up), so setting a child's times does not
+    # bump the parent again; symlinks are not followed.
+    when = time.time() - seconds
+    for dirpath, _dirnames, filenames in os.walk(top, topdown=False):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (when, when), follow_symlinks=False)
+        os.utime(dirpath, (when, when))
+
+
+def build_repo(dest: Path, args: argparse.Namespace) -> Tuple[Dict[str, Any], LibraryGenerator]:
+    import yaml
+
+    src = repo_root()
+    schema = yaml.safe_load((src / "config" / "schema.yml").read_text(encoding="utf-8"))
+    first = schema["authors"][0]["id"]  # keeps the schema example ids' author prefix meaningful
+    schema["authors"] = [{"id": first, "description": "Synthetic author"}] + [
+        {"id": f"author-{i:02d}", "description": "Synthetic author"} for i in range(1, args.authors)
+    ]
+    (dest / "config").mkdir(parents=True)
+    (dest / "config" / "schema.yml").write_text(yaml.safe_dump(schema, sort_keys=False), encoding="utf-8")
+
+    scripts_dir = dest / "repo-library" / "scripts"
+    scripts_dir.mkdir(parents=True)
+    for f in (src / "repo-library" / "scripts").iterdir():
+        if f.is_file() and f.name.startswith("devkit") and f.suffix in (".py", ".sh"):
+            shutil.copy2(f, scripts_dir / f.name)
+
+    readme = (src / "README.md").read_text(encoding="utf-8")
+    marker = "<!-- AUTO-GENERATED CATALOGUE -->"
+    head = readme.split(marker)[0] if marker in readme else readme + "\n"
+    (dest / "README.md").write_text(head + marker + "\n", encoding="utf-8")
+
+    gen = LibraryGenerator(dest, schema, args)
+    gen.generate()
+
+    (dest / "profiles").mkdir()
+    for author in gen.authors:
+        (dest / "profiles" / f"{author}.yml").write_text("", encoding="utf-8")
+    backdate(dest, BACKDATE_SECONDS)
+    return schema, gen
+
+
+def run_measured(argv: List[str], cwd: Path, env: Dict[str, str]) -> Tuple[float, int]:
+    # Returns (wall seconds, peak RSS in KiB of the child and its reaped descendants).
+    with tempfile.TemporaryFile() as log:
+        t0 = time.perf_counter()
+        p = subprocess.Popen(argv, cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        _pid, status, usage = os.wait4(p.pid, 0)
+        seconds = time.perf_counter() - t0
+        p.returncode = os.waitstatus_to_exitcode(status)
+        if p.returncode != 0:
+            log.seek(0)
+            tail = log.read().decode("utf-8", "replace")[-2000:]
+            raise SystemExit(f"Benchmark command failed ({p.returncode}): {' '.join(argv)}\n{tail}")
+    peak = usage.ru_maxrss // 1024 if platform.system() == "Darwin" else usage.ru_maxrss
+    return seconds, int(peak)
+
+
+def enable_all(profile: Path) -> None:
+    profile.write_text(profile.read_text(encoding="utf-8").replace("enabled: false", "enabled: true"), encoding="utf-8")
+
+
+def bench_commands(repo: Path, profile: str) -> Dict[str, Tuple[List[str], Callable[[], None]]]:
+    # name -> (argv, reset-for-cold-run)
+    scripts = repo / "repo-library" / "scripts"
+    out_root = repo.parent / "targets"
+    cache = repo / ".devkit-cache"
+
+    def clear_cache() -> None:
+        shutil.rmtree(cache, ignore_errors=True)
+
+    def clear_sync() -> None:
+        clear_cache()
+        shutil.rmtree(out_root, ignore_errors=True)
+        for f in repo.glob(".sync-state-*"):
+            f.unlink()
+
+    py = sys.executable
+    return {
+        "update-profile": ([py, str(scripts / "devkit-update-profile.py"), "--all"], clear_cache),
+        "validate": ([py, str(scripts / "devkit-validate-library.py")], clear_cache),
+        "catalogue": (["bash", str(scripts / "devkit-gen-catalogue.sh")], clear_cache),
+        "sync": (
+            [
+                py,
+                str(scripts / "devkit-sync-adapter.py"),
+                profile,
+                "--claude-root",
+                str(out_root / "claude"),
+                "--opencode-root",
+                str(out_root / "opencode"),
+            ],
+            clear_sync,
+        ),
+    }
+
+
+def summarize(samples: List[Tuple[float, int]]) -> Dict[str, Any]:
+    return {
+        "seconds": round(statistics.median(s for s, _ in samples), 4),
+        "min_seconds": round(min(s for s, _ in samples), 4),
+        "peak_rss_kb": max(m for _, m in samples),
+        "runs": len(samples),
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_seconds: float
+) -> Tuple[List[str], bool]:
+    # A slowdown counts only past both the relative tolerance and an absolute floor, so
+    # millisecond jitter on small libraries is not reported as a regression.
+    lines = [f"Baseline comparison (tolerance {tolerance:.0f}%)"]
+    regressed = False
+    if baseline.get("config") != results.get("config"):
+        lines.append("  note: baseline was recorded with a different library config")
+    for name, phases in results["results"].items():
+        for phase, now in phases.items():
+            before = baseline.get("results", {}).get(name, {}).get(phase)
+            if not before or now.get("skipped") or before.get("skipped"):
+                continue
+            for metric in ("seconds", "peak_rss_kb"):
+                old, new = before[metric], now[metric]
+                delta = 100.0 * (new - old) / old if old else 0.0
+                flag = ""
+                if delta > tolerance and (metric != "seconds" or new - old > min_seconds):
+                    flag = "  REGRESSION"
+                    regressed = True
+                lines.append(f"  {name + ' ' + phase:<22} {metric:<12} {old:>10} -> {new:<10} {delta:+6.1f}%{flag}")
+    return lines, regressed
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DevKit scripts on a synthetic, schema-driven library")
+    parser.add_argument("--authors", type=int, default=3, help="Synthetic authors (default: 3)")
+    parser.add_argument("--items", type=int, default=1000, help="Agents and commands per author (default: 1000)")
+    parser.add_argument("--skills", type=int, default=50, help="Skills per author and skill category (default: 50)")
+    parser.add_argument("--assets", type=int, default=4, help="Asset files per skill (default: 4)")
+    parser.add_argument("--asset-kb", type=int, default=16, help="Size of each skill asset in KiB (default: 16)")
+    parser.add_argument("--extras", type=int, default=10, help="Extras per author (default: 10)")
+    parser.add_argument("--scripts", type=int, default=5, help="Library scripts per author (default: 5)")
+    parser.add_argument("--deps", type=float, default=0.5, help="Share of tools declaring requires_* (default: 0.5)")
+    parser.add_argument("--seed", type=int, default=1, help="Generator seed (default: 1)")
+    parser.add_argument("--runs", type=int, default=3, help="Cold and warm repetitions; median reported (default: 3)")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--baseline", default=None, metavar="FILE", help="Compare against a saved result; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="Allowed slowdown/growth in percent (default: 20)")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this many seconds (default: 0.05)",
+    )
+    parser.add_argument("--save-baseline", default=None, metavar="FILE", help="Write results as JSON to FILE")
+    parser.add_argument("--keep", action="store_true", help="Keep the temp dir and print its path")
+    args = parser.parse_args(argv)
+
+    selected = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = [b for b in selected if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    tmp = Path(tempfile.mkdtemp(prefix="devkit-bench-"))
+    try:
+        repo = tmp / "repo"
+        repo.mkdir()
+        t0 = time.perf_counter()
+        schema, gen = build_repo(repo, args)
+        print(f"Synthetic library: {gen.files} files, {gen.bytes / 1e6:.1f} MB, {len(gen.authors)} authors "
+              f"({time.perf_counter() - t0:.1f}s to generate)")
+
+        env = dict(os.environ, HOME=str(tmp / "home"), PYTHONDONTWRITEBYTECODE="1")
+        (tmp / "home").mkdir()
+        profile = gen.authors[0]
+        commands = bench_commands(repo, profile)
+        have_yq = shutil.which("yq") is not None
+
+        results: Dict[str, Dict[str, Any]] = {}
+        # update-profile first: it fills the (empty) profile that sync reads.
+        for name in BENCHMARKS:
+            if name not in selected and not (name == "update-profile" and "sync" in selected):
+                continue
+            if name == "catalogue" and not have_yq:
+                results[name] = {"cold": {"skipped": "yq not installed"}, "warm": {"skipped": "yq not installed"}}
+                continue
+            cmd, reset = commands[name]
+            cold: List[Tuple[float, int]] = []
+            warm: List[Tuple[float, int]] = []
+            for _ in range(args.runs):
+                reset()
+                cold.append(run_measured(cmd, repo, env))
+            for _ in range(args.runs):
+                warm.append(run_measured(cmd, repo, env))
+            if name == "update-profile":
+                enable_all(repo / "profiles" / f"{profile}.yml")
+            if name in selected:
+                results[name] = {"cold": summarize(cold), "warm": summarize(warm)}
+
+        config = {k: getattr(args, k) for k in ("authors", "items", "skills", "assets", "asset_kb", "extras", "scripts", "deps", "seed")}
+        report: Dict[str, Any] = {
+            "config": config,
+            "files": gen.files,
+            "bytes": gen.bytes,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+
+        print(f"{'benchmark':<16} {'cold s':>9} {'warm s':>9} {'cold MB':>9} {'warm MB':>9}")
+        for name, phases in results.items():
+            if phases["cold"].get("skipped"):
+                print(f"{name:<16} skipped ({phases['cold']['skipped']})")
+                continue
+            c, w = phases["cold"], phases["warm"]
+            print(f"{name:<16} {c['seconds']:>9.3f} {w['seconds']:>9.3f} "
+                  f"{c['peak_rss_kb'] / 1024:>9.1f} {w['peak_rss_kb'] / 1024:>9.1f}")
+
+        if args.save_baseline:
+            Path(args.save_baseline).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            print(f"Baseline written: {args.save_baseline}")
+
+        if args.baseline:
+            baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+            lines, regressed = compare(report, baseline, args.tolerance, args.min_seconds)
+            print("\n".join(lines))
+            if regressed:
+                return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"Kept: {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -5,74 +5,113 @@ set -euo pipefail
 # Groups by category, lists tools alphabetically with author info and descriptions
 # Descriptions are aligned for readability
 
-REPO_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+REPO_ROOT="$(cd "${SCRIPT_DIR}/../.." && pwd)"
+
+# Optional instrumentation (same flags as the Python scripts): phase/counter events are
+# appended to a temp file (works from subshells) and summarised by devkit_trace.py on exit.
+# --check: render to a temp file, compare with README.md, print a diff and exit 1 on
+# drift; nothing is written.
+CHECK=0
+TRACE_TIMINGS=0
+TRACE_FILE=""
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --check) CHECK=1; shift ;;
+        --timings) TRACE_TIMINGS=1; shift ;;
+        --trace)
+            [[ $# -ge 2 ]] || { echo "--trace needs a FILE" >&2; exit 1; }
+            TRACE_FILE="$2"
+            [[ "$TRACE_FILE" == /* ]] || TRACE_FILE="${PWD}/${TRACE_FILE}"
+            shift 2 ;;
+        *) echo "Usage: $(basename "$0") [--check] [--timings] [--trace FILE]" >&2; exit 1 ;;
+    esac
+done
+
 cd "$REPO_ROOT"
 
-SCHEMA_FILE="${REPO_ROOT}/config/schema.yml"
-README_FILE="README.md"
-TEMP_FILE="${README_FILE}.tmp"
-CATALOGUE_MARKER="<!-- AUTO-GENERATED CATALOGUE -->"
+trace_now() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        echo "${EPOCHREALTIME/,/.}"
+    else
+        date +%s
+    fi
+}
 
-# Extract description from YAML frontmatter
-extract_description() {
-    local file=$1
-    local desc=""
+TRACE_EVENTS=""
+if [[ "$TRACE_TIMINGS" == 1 || -n "$TRACE_FILE" ]]; then
+    TRACE_EVENTS="$(mktemp)"
+    TRACE_START="$(trace_now)"
+    trace_report() {
+        local total
+        total=$(awk -v a="$TRACE_START" -v b="$(trace_now)" 'BEGIN{printf "%.6f", b-a}')
+        local cmd=(python3 "${SCRIPT_DIR}/devkit_trace.py" report "$TRACE_EVENTS" --script devkit-gen-catalogue.sh --seconds "$total")
+        [[ "$TRACE_TIMINGS" == 1 ]] && cmd+=(--timings)
+        [[ -n "$TRACE_FILE" ]] && cmd+=(--trace "$TRACE_FILE")
+        "${cmd[@]}" || true
+        rm -f "$TRACE_EVENTS"
+    }
+fi
 
-    # Check if file has YAML frontmatter (starts with ---)
-    if head -1 "$file" | grep -q '^---$'; then
-        # Extract frontmatter and get description field
-        desc=$(sed -n '/^---$/,/^---$/p' "$file" | yq -r '.description // ""' 2>/dev/null || echo "")
+TEMP_FILE=""
+on_exit() {
+    [[ -n "$TEMP_FILE" ]] && rm -f "$TEMP_FILE"
+    [[ -n "$TRACE_EVENTS" ]] && trace_report
+    return 0
+}
+trap on_exit EXIT
+
+# trace_phase <name> <command...>: run the command, recording its wall time when tracing.
+trace_phase() {
+    local name=$1
+    shift
+    if [[ -z "$TRACE_EVENTS" ]]; then
+        "$@"
+        return
     fi
+    local t0 rc=0
+    t0=$(trace_now)
+    "$@" || rc=$?
+    echo "phase ${name} $(awk -v a="$t0" -v b="$(trace_now)" 'BEGIN{printf "%.6f", b-a}')" >> "$TRACE_EVENTS"
+    return $rc
+}
 
-    echo "$desc"
+# trace_count <name> [n]
+trace_count() {
+    if [[ -n "$TRACE_EVENTS" ]]; then
+        echo "count $1 ${2:-1}" >> "$TRACE_EVENTS"
+    fi
 }
 
-# Function to scan library and collect all tools by category
-collect_tools() {
-    local category=$1
+SCHEMA_FILE="${REPO_ROOT}/config/schema.yml"
+README_FILE="README.md"
+# Rendered next to README.md (atomic rename), or in $TMPDIR with --check.
+if [[ "$CHECK" == 1 ]]; then
+    TEMP_FILE="$(mktemp)"
+else
+    TEMP_FILE="${README_FILE}.tmp"
+fi
+# Keep the current "Last updated" date while the catalogue is unchanged, so regenerating
+# an up-to-date README is a no-op (and --check does not fail on a new day).
+TODAY="$(date -u +"%Y-%m-%d")"
+LAST_UPDATED="$(sed -n 's/^\*Last updated: \([0-9-]*\) .*/\1/p' "$README_FILE" | tail -n 1)"
+LAST_UPDATED="${LAST_UPDATED:-$TODAY}"
+CATALOGUE_MARKER="<!-- AUTO-GENERATED CATALOGUE -->"
 
-    # Read scopes from schema
-    local scopes
-    scopes=($(yq -r '.authors[].id' "$SCHEMA_FILE"))
+# One pass over library/ for every category: "category|id|author|relpath|description"
+# lines from the shared library index (cached in .devkit-cache/library-index.json).
+INDEX_LINES=$(trace_phase library-scan python3 "${SCRIPT_DIR}/devkit_library_index.py" catalogue)
+trace_count subprocesses
+trace_count files-scanned "$(printf '%s' "$INDEX_LINES" | grep -c '' || true)"
 
-    for scope in "${scopes[@]}"; do
-        local path
-        if [[ "$category" == "commands" ]]; then
-            path="library/${scope}/.commands"
-        else
-            path="library/${scope}/${category}"
-        fi
-        if [[ ! -d "$path" ]]; then
-            continue
-        fi
+# Function to collect all tools of a category from the index
+collect_tools() {
+    local category=$1
 
-        if [[ "$category" == "skills" || "$category" == "skills-user-only" ]]; then
-            # Skills are stored as:
-            #   library/{author}/skills/{skill-id}/SKILL.md
-            find "$path" -type f -name 'SKILL.md' ! -path '*/.*' ! -path '*/_*' ! -name '.gitkeep' | while read -r file; do
-                local id
-                id=$(basename "$(dirname "$file")")
-                local relpath="${file#./}"
-                local desc
-                desc=$(extract_description "$file")
-
-                # Output as: tool_id|author|filepath|description
-                echo "${id}|${scope}|${relpath}|${desc}"
-            done
-        else
-            # Find all files (excluding .gitkeep, hidden files, and _private docs)
-            find "$path" -type f ! -name '.*' ! -name '.gitkeep' ! -name '_*' | while read -r file; do
-                local basename=$(basename "$file")
-                local id="${basename%.*}"
-                local relpath="${file#./}"
-                local desc
-                desc=$(extract_description "$file")
-
-                # Output as: tool_id|author|filepath|description
-                echo "${id}|${scope}|${relpath}|${desc}"
-            done
-        fi
-    done | sort -t'|' -k1,1
+    # Output as: tool_id|author|filepath|description
+    printf '%s\n' "$INDEX_LINES" \
+        | awk -v c="$category" 'index($0, c "|") == 1 { print substr($0, length(c) + 2) }' \
+        | sort -t'|' -k1,1
 }
 
 # Helper to capitalize first letter
@@ -138,7 +177,8 @@ Auto-generated list of all tools in the library. Your profile is automatically u
 EOF
 
 # Read categories from schema (excluding scripts)
-CATEGORIES=($(yq -r '.categories | keys | .[] | select(. != "scripts")' "$SCHEMA_FILE"))
+CATEGORIES=($(trace_phase yaml-load yq -r '.categories | keys | .[] | select(. != "scripts")' "$SCHEMA_FILE"))
+trace_count subprocesses
 
 for category in "${CATEGORIES[@]}"; do
     cat_title=$(capitalize "$category")
@@ -203,10 +243,27 @@ cat >> "$TEMP_FILE" << EOF
 
 ---
 
-*Last updated: $(date -u +"%Y-%m-%d") • Auto-generated by \`repo-library/scripts/devkit-gen-catalogue.sh\`*
+*Last updated: ${LAST_UPDATED} • Auto-generated by \`repo-library/scripts/devkit-gen-catalogue.sh\`*
 EOF
 
-# Replace README
-mv "$TEMP_FILE" "$README_FILE"
+if cmp -s "$TEMP_FILE" "$README_FILE"; then
+    echo "✓ README.md catalogue up to date"
+    exit 0
+fi
+
+if [[ "$CHECK" == 1 ]]; then
+    echo "❌ README.md catalogue is out of date:"
+    diff -u --label "a/${README_FILE}" --label "b/${README_FILE}" "$README_FILE" "$TEMP_FILE" || true
+    echo "Run 'make generate' and commit the changes."
+    exit 1
+fi
+
+# Content changed: stamp today's date, then replace README (the only write)
+if [[ "$LAST_UPDATED" != "$TODAY" ]]; then
+    sed "s/^\*Last updated: ${LAST_UPDATED} /*Last updated: ${TODAY} /" "$TEMP_FILE" > "${TEMP_FILE}.date"
+    mv "${TEMP_FILE}.date" "$TEMP_FILE"
+fi
+trace_phase write mv "$TEMP_FILE" "$README_FILE"
+TEMP_FILE=""
 
 echo "✓ README.md updated with tool catalogue"
@@ -5,25 +5,45 @@ Design rules (enforced):
 - Sync only profile-enabled tools.
 - Never overwrite/delete anything the adapter does not own.
 - Prune (delete) only when: profile says enabled:false AND adapter owns the destination path.
-- Skills are directories: copy entire folder.
+- Skills are directories: mirror entire folder (per-file delta, no rmtree + copytree).
 """
 
 from __future__ import annotations
 
 import argparse
 import datetime as dt
+import filecmp
+import functools
+import hashlib
+import io
 import json
 import shutil
 import sys
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Literal, Optional, Tuple, cast
-import platform
-import re
+from typing import Any, Callable, Dict, Iterable, Iterator, Literal, Optional, Set, Tuple, TypeVar, Union, cast
 import os
-
-Category = Literal["agents", "commands", "skills", "skills-user-only"]
+import select
+import stat
+import struct
+import time
+
+import devkit_trace
+import devkit_yaml_cache
+from devkit_deps import DependencyGraph
+from devkit_deps import label as dep_label
+from devkit_library_index import LibraryIndex, load_index
+from devkit_probe import ProbeCache, load_extras_registry, spec_from_dict, spec_to_dict
+from devkit_probe import extras_install_hints as probe_extras_install_hints
+
+Category = Literal["agents", "commands", "skills", "skills-user-only", "scripts"]
+# Profiles list the first four; scripts are installed as dependencies of enabled tools.
+STATE_CATEGORIES = ("agents", "commands", "skills", "skills-user-only", "scripts")
 Target = Literal["claude", "opencode"]
+InstallMode = Literal["copy", "reflink", "hardlink", "symlink", "auto"]
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -61,20 +81,17 @@ def default_state_file(profile: str) -> Path:
 
 
 def load_yaml(path: Path) -> Dict[str, Any]:
+    # Parsed documents come from the shared cache; PyYAML is only imported on a miss.
+    data: Any = None
     try:
-        import yaml as pyyaml  # type: ignore
-    except Exception:
-        pyyaml = None
-    if pyyaml is None:
+        with devkit_trace.phase("yaml-load"):
+            data = devkit_yaml_cache.load_yaml(path)
+    except ImportError:
         prompt_and_abort(
             "Missing dependency: PyYAML",
             "This script requires PyYAML. Install it (example):\n"
             "  python3 -m pip install pyyaml\n",
         )
-    assert pyyaml is not None
-    data: Any = None
-    try:
-        data = pyyaml.safe_load(path.read_text(encoding="utf-8"))
     except Exception as e:
         prompt_and_abort("Failed to read profile", f"Profile: {path}\nError: {e}")
     if not isinstance(data, dict):
@@ -86,10 +103,8 @@ def load_state(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {
             "version": 1,
-            "owned": {
-                "claude": {"agents": {}, "commands": {}, "skills": {}, "skills-user-only": {}},
-                "opencode": {"agents": {}, "commands": {}, "skills": {}, "skills-user-only": {}},
-            },
+            "owned": {t: {c: {} for c in STATE_CATEGORIES} for t in ("claude", "opencode")},
+            "fingerprints": {t: {c: {} for c in STATE_CATEGORIES} for t in ("claude", "opencode")},
         }
     data: Any = None
     try:
@@ -101,16 +116,326 @@ def load_state(path: Path) -> Dict[str, Any]:
     data_dict = cast(Dict[str, Any], data)
     data_dict.setdefault("version", 1)
     data_dict.setdefault("owned", {})
-    for t in ("claude", "opencode"):
-        data_dict["owned"].setdefault(t, {})
-        for c in ("agents", "commands", "skills", "skills-user-only"):
-            data_dict["owned"][t].setdefault(c, {})
+    data_dict.setdefault("fingerprints", {})
+    for key in ("owned", "fingerprints"):
+        for t in ("claude", "opencode"):
+            data_dict[key].setdefault(t, {})
+            for c in STATE_CATEGORIES:
+                data_dict[key][t].setdefault(c, {})
     return data_dict
 
 
+def write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 def save_state(path: Path, state: Dict[str, Any]) -> None:
     state["updatedAt"] = dt.datetime.now(dt.timezone.utc).isoformat()
-    path.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    write_atomic(path, json.dumps(state, indent=2, sort_keys=True) + "\n")
+
+
+# Write-ahead journal: ownership intents are appended (and fsynced) before any target
+# root is touched; completions are appended as they happen. A run interrupted before
+# save_state is replayed on the next start, so the adapter still knows what it owns.
+def journal_path(state_path: Path) -> Path:
+    return state_path.with_name(state_path.name + ".journal")
+
+
+def journal_append(path: Path, records: list[Dict[str, Any]], sync: bool = False) -> None:
+    if not records:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r, sort_keys=True) + "\n" for r in records))
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+
+def replay_journal(state: Dict[str, Any], path: Path) -> int:
+    # Returns the number of records applied. A torn trailing line is ignored.
+    if not path.exists():
+        return 0
+    applied = 0
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            r = json.loads(line)
+            owned = state["owned"][r["target"]][r["category"]]
+            fingerprints = state["fingerprints"][r["target"]][r["category"]]
+        except (ValueError, KeyError, TypeError):
+            continue
+        op = r.get("op")
+        if op == "own":
+            # Intent: the write may be partial, so the old fingerprint is no longer trusted.
+            owned[r["id"]] = r["path"]
+            fingerprints.pop(r["id"], None)
+        elif op == "done" and isinstance(r.get("record"), dict):
+            fingerprints[r["id"]] = r["record"]
+        elif op == "clear":
+            owned.pop(r["id"], None)
+            fingerprints.pop(r["id"], None)
+        else:
+            continue
+        applied += 1
+    return applied
+
+
+def journal_record(op: str, target: Target, e: Entry, **extra: Any) -> Dict[str, Any]:
+    return {"op": op, "target": target, "category": e.category, "id": e.id, **extra}
+
+
+class JsonState:
+    # Default backend: one JSON document, loaded whole and rewritten atomically at the
+    # end of a run when anything changed; the write-ahead journal covers the window in
+    # between. As with SqliteState, only newly owned destinations need an intent record.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.data = load_state(path)
+        self.journal = journal_path(path)
+        self.recovered = replay_journal(self.data, self.journal)
+        self.dirty = self.recovered > 0
+
+    def notes(self) -> list[str]:
+        if not self.recovered:
+            return []
+        return [f"Recovered {self.recovered} journal record(s) from an interrupted run: {self.journal}"]
+
+    def owned_path(self, target: Target, e: Entry) -> Optional[str]:
+        owned_map = self.data.get("owned", {}).get(target, {}).get(e.category, {})
+        recorded = owned_map.get(e.id) if isinstance(owned_map, dict) else None
+        return recorded if isinstance(recorded, str) else None
+
+    def owned_ids(self, target: Target, category: str) -> Dict[str, str]:
+        return dict(self.data["owned"][target].get(category, {}))
+
+    def owner_of(self, dest: Path) -> Optional[str]:
+        for t, categories in self.data["owned"].items():
+            for c, ids in categories.items():
+                for tool_id, recorded in ids.items():
+                    if recorded == str(dest):
+                        return f"{t} {c}:{tool_id}"
+        return None
+
+    def fingerprint(self, target: Target, e: Entry) -> Optional[Dict[str, Any]]:
+        record = self.data.get("fingerprints", {}).get(target, {}).get(e.category, {}).get(e.id)
+        return record if isinstance(record, dict) else None
+
+    def begin(self, writes: list[Tuple[Target, Entry, Path]]) -> None:
+        intents = [journal_record("own", t, e, path=str(dest)) for t, e, dest in writes if self.owned_path(t, e) != str(dest)]
+        if intents:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            journal_append(self.journal, intents, sync=True)
+
+    def record_write(self, target: Target, e: Entry, dest: Path, action: str, record: Optional[Dict[str, Any]]) -> None:
+        if action == "unchanged" and record is None:
+            return
+        if action != "unchanged":
+            self.data["owned"][target][e.category][e.id] = str(dest)
+        if record is not None:
+            self.data["fingerprints"][target][e.category][e.id] = record
+        self.dirty = True
+        journal_append(self.journal, [journal_record("done", target, e, record=self.fingerprint(target, e))])
+
+    def record_prune(self, target: Target, e: Entry) -> None:
+        self.data["owned"][target][e.category].pop(e.id, None)
+        self.data["fingerprints"][target][e.category].pop(e.id, None)
+        self.dirty = True
+        journal_append(self.journal, [journal_record("clear", target, e)])
+
+    def commit(self) -> bool:
+        # Returns whether anything was written.
+        if not self.dirty:
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        save_state(self.path, self.data)
+        if self.journal.exists():
+            self.journal.unlink()
+        self.dirty = False
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteState:
+    # Optional backend (--state-backend sqlite): one row per owned entry, keyed by
+    # (target, category, id) with a second index on the destination path. Lookups are
+    # indexed and a run writes only the rows it changes, each in its own short autocommit
+    # transaction, so the write lock is never held across the copy phase (a concurrent
+    # run for another profile or home only waits for one row).
+    # Crash safety without a journal: rows for newly owned destinations are committed
+    # as pending (no fingerprint) before any target root is touched. Destinations that
+    # were already owned need no intent: an interrupted update leaves a dest signature
+    # that no longer matches the stored fingerprint, so the next run rewrites it.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS owned (
+            target TEXT NOT NULL,
+            category TEXT NOT NULL,
+            id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            pending INTEGER NOT NULL DEFAULT 0,
+            fingerprint TEXT,
+            PRIMARY KEY (target, category, id)
+        );
+        CREATE INDEX IF NOT EXISTS owned_by_path ON owned (path);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    """
+
+    def __init__(self, path: Path, legacy_json: Path, dry_run: bool) -> None:
+        import sqlite3
+
+        self.path = path
+        fresh = not path.exists()
+        # A dry run never creates the database; a first-time migration happens in memory.
+        location = ":memory:" if fresh and dry_run else str(path)
+        try:
+            if location != ":memory:":
+                path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(location, isolation_level=None)
+            if location != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                # Per-row commits: WAL + NORMAL syncs at checkpoints, not on every row. A row
+                # lost to a power cut is rewritten by the next run (pending or mismatched).
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+        except sqlite3.Error as e:
+            prompt_and_abort("Failed to open state database", f"State: {path}\nError: {e}")
+        self.migrated = 0
+        self.dirty = False
+        if fresh and legacy_json != path and legacy_json.exists():
+            self._migrate(legacy_json, dry_run)
+        row = self.conn.execute("SELECT COUNT(*) FROM owned WHERE pending = 1").fetchone()
+        self.recovered = int(row[0])
+
+    def _migrate(self, legacy_json: Path, dry_run: bool) -> None:
+        # One-time import of .sync-state-<profile>.json (journal replayed first); the JSON
+        # file is renamed to *.migrated so it cannot drift from the database.
+        legacy = JsonState(legacy_json)
+        rows = []
+        for t, categories in legacy.data["owned"].items():
+            for c, ids in categories.items():
+                for tool_id, recorded in ids.items():
+                    record = legacy.data["fingerprints"].get(t, {}).get(c, {}).get(tool_id)
+                    fingerprint = json.dumps(record, sort_keys=True) if isinstance(record, dict) else None
+                    rows.append((t, c, tool_id, recorded, fingerprint))
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO owned (target, category, id, path, pending, fingerprint) VALUES (?, ?, ?, ?, 0, ?)",
+            rows,
+        )
+        self._touch()
+        self.conn.execute("COMMIT")
+        self.migrated = len(rows)
+        self.migrated_from = legacy_json
+        if not dry_run:
+            os.replace(legacy_json, legacy_json.with_name(legacy_json.name + ".migrated"))
+            if legacy.journal.exists():
+                legacy.journal.unlink()
+
+    def _touch(self) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('updatedAt', ?)",
+            (dt.datetime.now(dt.timezone.utc).isoformat(),),
+        )
+
+    def notes(self) -> list[str]:
+        out = []
+        if self.migrated:
+            out.append(f"Migrated {self.migrated} ownership record(s) from {self.migrated_from} into {self.path}")
+        if self.recovered:
+            out.append(f"Recovered {self.recovered} pending ownership record(s) from an interrupted run: {self.path}")
+        return out
+
+    def _row(self, target: Target, e: Entry) -> Optional[Tuple[str, int, Optional[str]]]:
+        return self.conn.execute(
+            "SELECT path, pending, fingerprint FROM owned WHERE target = ? AND category = ? AND id = ?",
+            (target, e.category, e.id),
+        ).fetchone()
+
+    def owned_path(self, target: Target, e: Entry) -> Optional[str]:
+        row = self._row(target, e)
+        return row[0] if row is not None else None
+
+    def owned_ids(self, target: Target, category: str) -> Dict[str, str]:
+        rows = self.conn.execute("SELECT id, path FROM owned WHERE target = ? AND category = ?", (target, category))
+        return {tool_id: path for tool_id, path in rows}
+
+    def owner_of(self, dest: Path) -> Optional[str]:
+        row = self.conn.execute("SELECT target, category, id FROM owned WHERE path = ? LIMIT 1", (str(dest),)).fetchone()
+        return f"{row[0]} {row[1]}:{row[2]}" if row is not None else None
+
+    def fingerprint(self, target: Target, e: Entry) -> Optional[Dict[str, Any]]:
+        row = self._row(target, e)
+        if row is None or row[1] or row[2] is None:
+            return None
+        try:
+            record = json.loads(row[2])
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) else None
+
+    def begin(self, writes: list[Tuple[Target, Entry, Path]]) -> None:
+        intents = [(t, e.category, e.id, str(dest)) for t, e, dest in writes if self.owned_path(t, e) != str(dest)]
+        if intents:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO owned (target, category, id, path, pending, fingerprint) VALUES (?, ?, ?, ?, 1, NULL)",
+                intents,
+            )
+            self.conn.execute("COMMIT")
+
+    def record_write(self, target: Target, e: Entry, dest: Path, action: str, record: Optional[Dict[str, Any]]) -> None:
+        if action == "unchanged" and record is None:
+            return
+        self.dirty = True
+        self.conn.execute(
+            "INSERT INTO owned (target, category, id, path, pending, fingerprint) VALUES (?, ?, ?, ?, 0, ?) "
+            "ON CONFLICT (target, category, id) DO UPDATE SET path = excluded.path, pending = 0, "
+            "fingerprint = COALESCE(excluded.fingerprint, owned.fingerprint)",
+            (target, e.category, e.id, str(dest), json.dumps(record, sort_keys=True) if record is not None else None),
+        )
+
+    def record_prune(self, target: Target, e: Entry) -> None:
+        self.dirty = True
+        self.conn.execute(
+            "DELETE FROM owned WHERE target = ? AND category = ? AND id = ?",
+            (target, e.category, e.id),
+        )
+
+    def commit(self) -> bool:
+        # Rows are already committed one by one; this only stamps the run.
+        if not self.dirty:
+            return False
+        self._touch()
+        self.dirty = False
+        return True
+
+    def close(self) -> None:
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+
+StateStore = Union[JsonState, SqliteState]
+
+
+def open_state(state_path: Path, backend: str, dry_run: bool) -> StateStore:
+    database = state_path.with_suffix(".sqlite")
+    if backend == "sqlite":
+        # The JSON state to migrate is the state file itself (--state-file may use any suffix).
+        return SqliteState(database, state_path, dry_run)
+    if database != state_path and database.exists():
+        # Migrated (the JSON file is now *.migrated) or created by the sqlite backend: a json
+        # run would see no ownership and refuse to touch every managed destination.
+        prompt_and_abort(
+            "State is in SQLite",
+            f"State: {database}\n\nOwnership for this profile is tracked in the sqlite backend; re-run with --state-backend sqlite.",
+        )
+    return JsonState(state_path)
 
 
 def parse_entries(profile: Dict[str, Any]) -> list[Entry]:
@@ -160,211 +485,17 @@ def parse_extras(profile: Dict[str, Any]) -> list[Dict[str, Any]]:
     return out
 
 
-def _which(cmd: str) -> Optional[str]:
-    import shutil as _shutil
-
-    return _shutil.which(cmd)
-
-
-def _parse_semver(text: str) -> Optional[Tuple[int, int, int]]:
-    m = re.search(r"(\d+)\.(\d+)\.(\d+)", text)
-    if not m:
-        return None
-    return int(m.group(1)), int(m.group(2)), int(m.group(3))
-
-
-def _semver_ge(have: Tuple[int, int, int], want: Tuple[int, int, int]) -> bool:
-    return have >= want
-
-
-def _cmd_output(argv: list[str]) -> str:
-    import subprocess
-
-    p = subprocess.run(argv, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    return (p.stdout or "").strip()
-
-
-def _cmd_exit_code(argv: list[str]) -> int:
-    import subprocess
+def default_probe_cache_file() -> Path:
+    return repo_root() / ".devkit-cache" / "extras-probes.json"
 
-    p = subprocess.run(argv, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    return p.returncode
 
-
-def _brew_has_cask(name: str) -> bool:
-    if _which("brew") is None:
-        return False
-    return _cmd_exit_code(["brew", "list", "--cask", name]) == 0
-
-
-def _macos_app_exists(app_name: str) -> bool:
-    candidates = [
-        Path("/Applications") / f"{app_name}.app",
-        Path.home() / "Applications" / f"{app_name}.app",
-    ]
-    return any(path.exists() for path in candidates)
-
-
-def extras_install_hints(extra_ids: list[str]) -> list[str]:
-    # Prints actions; does not install.
-    sysname = platform.system()
-    have_brew = _which("brew") is not None
-    out: list[str] = []
-
-    def add_block(title: str, lines: list[str]) -> None:
-        out.append(f"extras: {title}")
-        out.extend([f"  {ln}" for ln in lines])
-
-    want_git = (2, 30, 0)
-
-    if sysname == "Darwin" and not have_brew:
-        add_block(
-            "(xapids suggestion) homebrew",
-            [
-                "Install Homebrew first, install everything through homebrew. simplifies management and update processes",
-                "https://brew.sh/",
-            ],
-        )
-
-    for tool_id in extra_ids:
-        if tool_id == "git-cli":
-            path = _which("git")
-            if not path:
-                if sysname == "Darwin":
-                    if have_brew:
-                        add_block("git-cli", ["missing", "1) brew install git", "2) if blocked: xcode-select --install", "3) https://git-scm.com/downloads"])
-                    else:
-                        add_block(
-                            "git-cli",
-                            [
-                                "missing",
-                                "1) (xapids suggestion) install Homebrew: https://brew.sh/",
-                                "2) brew install git",
-                                "3) if blocked: xcode-select --install",
-                                "4) https://git-scm.com/downloads",
-                            ],
-                        )
-                elif sysname == "Linux":
-                    add_block("git-cli", ["missing"])
-                else:
-                    add_block("git-cli", ["missing"])
-                continue
-
-            have = _parse_semver(_cmd_output(["git", "--version"]))
-            if have and not _semver_ge(have, want_git):
-                if sysname == "Darwin":
-                    if have_brew:
-                        add_block("git-cli", [f"outdated ({have[0]}.{have[1]}.{have[2]})", "1) brew upgrade git", "2) https://git-scm.com/downloads"])
-                    else:
-                        add_block(
-                            "git-cli",
-                            [
-                                f"outdated ({have[0]}.{have[1]}.{have[2]})",
-                                "1) (xapids suggestion) install Homebrew: https://brew.sh/",
-                                "2) brew upgrade git",
-                                "3) https://git-scm.com/downloads",
-                            ],
-                        )
-                else:
-                    add_block("git-cli", [f"outdated ({have[0]}.{have[1]}.{have[2]})"])
-            else:
-                add_block("git-cli", ["ok"])
-
-        elif tool_id == "github-cli":
-            if not _which("gh"):
-                if sysname == "Darwin":
-                    if have_brew:
-                        add_block("github-cli", ["missing", "1) brew install gh", "2) https://cli.github.com/"])
-                    else:
-                        add_block(
-                            "github-cli",
-                            [
-                                "missing",
-                                "1) (xapids suggestion) install Homebrew: https://brew.sh/",
-                                "2) brew install gh",
-                                "3) https://cli.github.com/",
-                            ],
-                        )
-                elif sysname == "Linux":
-                    add_block("github-cli", ["missing"])
-                else:
-                    add_block("github-cli", ["missing"])
-            else:
-                add_block("github-cli", ["ok"])
-
-        elif tool_id == "claude-code-cli":
-            if not _which("claude"):
-                if sysname == "Darwin":
-                    if have_brew:
-                        add_block("claude-code-cli", ["missing", "1) brew install --cask <claude> (if published)", "2) https://code.claude.com/"])
-                    else:
-                        add_block("claude-code-cli", ["missing", "1) https://code.claude.com/"])
-                elif sysname == "Linux":
-                    add_block("claude-code-cli", ["missing"])
-                else:
-                    add_block("claude-code-cli", ["missing", "https://code.claude.com/"])
-            else:
-                add_block("claude-code-cli", ["ok"])
-
-        elif tool_id == "opencode-cli":
-            if not _which("opencode"):
-                if sysname == "Darwin":
-                    if have_brew:
-                        add_block("opencode-cli", ["missing", "1) brew install opencode (if published)", "2) https://opencode.ai/"])
-                    else:
-                        add_block("opencode-cli", ["missing", "1) https://opencode.ai/"])
-                elif sysname == "Linux":
-                    add_block("opencode-cli", ["missing"])
-                else:
-                    add_block("opencode-cli", ["missing", "https://opencode.ai/"])
-            else:
-                add_block("opencode-cli", ["ok"])
-
-        elif tool_id == "opencode-gui":
-            installed = False
-            if sysname == "Darwin":
-                installed = _macos_app_exists("OpenCode") or (have_brew and _brew_has_cask("opencode"))
-            if installed:
-                add_block("opencode-gui", ["ok"])
-            elif sysname == "Darwin" and have_brew:
-                add_block("opencode-gui", ["missing", "1) brew install --cask opencode (if published)", "2) https://opencode.ai/"])
-            elif sysname == "Linux":
-                add_block("opencode-gui", ["missing", "1) https://opencode.ai/"])
-            else:
-                add_block("opencode-gui", ["missing", "1) https://opencode.ai/"])
-
-        elif tool_id == "codelayer-gui":
-            installed = False
-            if sysname == "Darwin":
-                installed = _macos_app_exists("CodeLayer") or (have_brew and _brew_has_cask("codelayer"))
-            if installed:
-                add_block("codelayer-gui", ["ok"])
-            elif sysname == "Darwin" and have_brew:
-                add_block("codelayer-gui", ["missing", "1) brew install --cask codelayer (if published)", "2) provider instructions"])
-            elif sysname == "Linux":
-                add_block("codelayer-gui", ["missing", "1) provider instructions"])
-            else:
-                add_block("codelayer-gui", ["missing", "1) provider instructions"])
-
-        elif tool_id == "vscode-gui":
-            installed = False
-            if _which("code"):
-                installed = True
-            elif sysname == "Darwin":
-                installed = _macos_app_exists("Visual Studio Code") or (have_brew and _brew_has_cask("visual-studio-code"))
-            if installed:
-                add_block("vscode-gui", ["ok"])
-            elif sysname == "Darwin" and have_brew:
-                add_block("vscode-gui", ["missing", "1) brew install --cask visual-studio-code", "2) https://code.visualstudio.com/"])
-            elif sysname == "Linux":
-                add_block("vscode-gui", ["missing", "1) https://code.visualstudio.com/"])
-            else:
-                add_block("vscode-gui", ["missing", "1) https://code.visualstudio.com/"])
-
-        else:
-            add_block(tool_id, ["unknown", "1) see library/shared/extras/"])
-
-    return out
+def extras_install_hints(
+    extra_ids: list[str], cache: Optional[ProbeCache] = None, index: Optional[LibraryIndex] = None
+) -> list[str]:
+    # Prints actions; does not install. Probes come from the `probe:` frontmatter of
+    # library/*/extras/*.md and run concurrently (devkit_probe.py).
+    registry = load_extras_registry(repo_root() / "library", index)
+    return probe_extras_install_hints(extra_ids, registry, cache)
 
 
 def detect_duplicates(entries: Iterable[Entry]) -> Optional[Tuple[Category, str, list[Entry]]]:
@@ -380,113 +511,548 @@ def detect_duplicates(entries: Iterable[Entry]) -> Optional[Tuple[Category, str,
 def src_path(e: Entry, root: Path) -> Path:
     category_dir = ".commands" if e.category == "commands" else e.category
     base = root / "library" / e.author / category_dir
-    if e.category in ("skills", "skills-user-only"):
+    if e.category in ("skills", "skills-user-only", "scripts"):
         return base / e.id
     return base / f"{e.id}.md"
 
 
 def claude_dest(e: Entry, claude_root: Path) -> Path:
-    if e.category in ("skills", "skills-user-only"):
+    if e.category in ("skills", "skills-user-only", "scripts"):
         return claude_root / e.category / e.id
     return claude_root / e.category / f"{e.id}.md"
 
 
 def opencode_dest(e: Entry, opencode_root: Path) -> Path:
-    if e.category in ("skills", "skills-user-only"):
+    if e.category in ("skills", "skills-user-only", "scripts"):
         return opencode_root / e.category / e.id
     return opencode_root / e.category / f"{e.id}.md"
 
 
-def is_owned(state: Dict[str, Any], target: Target, e: Entry, dest: Path) -> bool:
-    owned_map = state.get("owned", {}).get(target, {}).get(e.category, {})
-    if not isinstance(owned_map, dict):
-        return False
-    recorded = owned_map.get(e.id)
-    if not isinstance(recorded, str):
-        return False
-    return Path(recorded) == dest
+def is_owned(state: StateStore, target: Target, e: Entry, dest: Path) -> bool:
+    recorded = state.owned_path(target, e)
+    return recorded is not None and Path(recorded) == dest
 
 
-def set_owned(state: Dict[str, Any], target: Target, e: Entry, dest: Path) -> None:
-    state["owned"][target][e.category][e.id] = str(dest)
+def iter_tree(path: Path) -> Iterable[Tuple[str, os.stat_result]]:
+    # Deterministic walk: (relative posix path, stat). A plain file yields itself as "".
+    # Directories are included (with a trailing "/") so empty folders count as content.
+    if not path.is_dir():
+        yield "", path.stat()
+        return
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        base = Path(dirpath)
+        rel_base = base.relative_to(path).as_posix()
+        prefix = "" if rel_base == "." else rel_base + "/"
+        for name in dirnames:
+            yield prefix + name + "/", (base / name).stat()
+        for name in sorted(filenames):
+            p = base / name
+            yield prefix + name, p.stat() if p.exists() else p.lstat()
+
+
+def stat_signature(path: Path) -> Optional[str]:
+    # Cheap change detector (names, sizes, mtimes); no file contents are read.
+    if not path.exists():
+        return None
+    h = hashlib.sha1()
+    for rel, st in iter_tree(path):
+        size = 0 if rel.endswith("/") else st.st_size
+        h.update(f"{rel}\0{size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def content_fingerprint(path: Path) -> str:
+    # Content hash over relative names + bytes; independent of mtimes.
+    h = hashlib.sha256()
+    for rel, _st in iter_tree(path):
+        h.update(rel.encode("utf-8") + b"\0")
+        if rel.endswith("/"):
+            continue
+        with open(path / rel if rel else path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SourceFingerprints:
+    # Per-run memo: each source is stat-walked/hashed at most once (shared across targets).
+
+    def __init__(self) -> None:
+        self._sig: Dict[Path, Optional[str]] = {}
+        self._content: Dict[Path, str] = {}
+
+    def signature(self, src: Path) -> Optional[str]:
+        if src not in self._sig:
+            self._sig[src] = stat_signature(src)
+        return self._sig[src]
+
+    def content(self, src: Path) -> str:
+        if src not in self._content:
+            self._content[src] = content_fingerprint(src)
+        return self._content[src]
+
+
+def get_fingerprint(state: StateStore, target: Target, e: Entry) -> Optional[Dict[str, Any]]:
+    return state.fingerprint(target, e)
+
+
+def is_unchanged(
+    owned: bool,
+    record: Optional[Dict[str, Any]],
+    src: Path,
+    dest: Path,
+    sources: SourceFingerprints,
+    mode: InstallMode = "copy",
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    # Unchanged: dest is owned + untouched since our last write, and source content still
+    # matches what we wrote. A source whose mtime moved but whose bytes did not (e.g. git
+    # checkout) is still unchanged; the refreshed record restores the stat-only fast path.
+    if record is None or not owned or record.get("mode", "copy") != mode:
+        return False, None
+    if record.get("dest") is None or stat_signature(dest) != record.get("dest"):
+        return False, None
+    src_sig = sources.signature(src)
+    if src_sig == record.get("src"):
+        return True, None
+    if sources.content(src) != record.get("content"):
+        return False, None
+    return True, {**record, "src": src_sig}
+
+
+def recorded_unchanged(state: StateStore, t: Target, e: Entry, dest: Path, content: str, mode: InstallMode) -> bool:
+    # Same rule as is_unchanged for a source known only by its content hash (plan files, bundles).
+    record = state.fingerprint(t, e)
+    if record is None or not is_owned(state, t, e, dest) or record.get("mode", "copy") != mode:
+        return False
+    if record.get("dest") is None or stat_signature(dest) != record.get("dest"):
+        return False
+    return record.get("content") == content
 
 
-def clear_owned(state: Dict[str, Any], target: Target, e: Entry) -> None:
-    state["owned"][target][e.category].pop(e.id, None)
+def fingerprint_record(src: Path, dest: Path, sources: SourceFingerprints, mode: InstallMode = "copy") -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "src": sources.signature(src),
+        "dest": stat_signature(dest),
+        "content": sources.content(src),
+    }
 
 
 def ensure_parent(dest: Path) -> None:
     dest.parent.mkdir(parents=True, exist_ok=True)
 
 
-def copy_file(src: Path, dest: Path) -> None:
+def clone_file(src: Path, dest: Path) -> bool:
+    # Copy-on-write clone (btrfs/xfs/bcachefs FICLONE, APFS clonefile). False if unsupported.
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        ficlone = 0x40049409
+        with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), ficlone, fsrc.fileno())
+                return True
+            except OSError:
+                pass
+        dest.unlink()
+        return False
+    if sys.platform == "darwin":
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        clonefile = getattr(libc, "clonefile", None)
+        if clonefile is None:
+            return False
+        return clonefile(os.fsencode(src), os.fsencode(dest), 0) == 0
+    return False
+
+
+def copy_file_range(src: Path, dest: Path) -> bool:
+    # In-kernel copy (server-side on NFS/SMB, implicit reflink on some filesystems).
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        try:
+            while remaining > 0:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        except OSError:
+            remaining = -1
+    if remaining != 0:
+        dest.unlink()
+        return False
+    return True
+
+
+class CopyOrigins:
+    # Fan-out: library source -> first destination written from it in this process (a file,
+    # or a skill dir whose files map by relative path). Later copies of the same source are
+    # CoW-cloned from that copy when it is still identical (size + mtime, which copy2 /
+    # copystat preserve) and the filesystem supports it; otherwise they copy from the library.
+
+    def __init__(self) -> None:
+        self._dests: Dict[Path, Path] = {}
+        self._no_clone: set[Tuple[int, int]] = set()  # (origin dev, dest dev) pairs that failed
+
+    def add(self, src: Path, dest: Path) -> None:
+        self._dests.setdefault(src, dest)
+
+    def _find(self, src: Path) -> Optional[Path]:
+        if not self._dests:
+            return None
+        for base in (src, *src.parents):
+            dest = self._dests.get(base)
+            if dest is not None:
+                return dest / src.relative_to(base) if base != src else dest
+        return None
+
+    def clone(self, src: Path, tmp: Path) -> bool:
+        origin = self._find(src)
+        if origin is None:
+            return False
+        try:
+            o, s = origin.lstat(), src.stat()
+            dest_dev = os.stat(tmp.parent).st_dev
+        except OSError:
+            return False
+        if not stat.S_ISREG(o.st_mode) or (o.st_size, o.st_mtime_ns) != (s.st_size, s.st_mtime_ns):
+            return False
+        devs = (o.st_dev, dest_dev)
+        if devs in self._no_clone:
+            return False
+        if clone_file(origin, tmp):
+            return True
+        self._no_clone.add(devs)
+        return False
+
+
+STAGING_SUFFIXES = (".devkit-tmp", ".devkit-bundle")  # staging_path, bundle scratch copies
+
+
+def staging_path(dest: Path) -> Path:
+    # Adapter-reserved temp sibling; leftovers from an interrupted run are removed by
+    # remove_stale_staging at the start of the next run (or replaced when reused).
+    return dest.with_name(f".{dest.name}.devkit-tmp")
+
+
+def remove_stale_staging(roots: Iterable[Path]) -> int:
+    # Adapter temp siblings in every category dir under the given roots, left behind by an
+    # interrupted run (an entry disabled since would otherwise keep its leftover forever).
+    # Inside skill dirs, sync_tree already drops anything the source does not have.
+    stale: list[Path] = []
+    for root in roots:
+        for category in STATE_CATEGORIES:
+            try:
+                with os.scandir(root / category) as it:
+                    stale += [Path(de.path) for de in it if de.name.startswith(".") and de.name.endswith(STAGING_SUFFIXES)]
+            except OSError:
+                continue
+    for path in stale:
+        remove_entry(path)
+    return len(stale)
+
+
+def install_file(src: Path, dest: Path, mode: InstallMode, origins: Optional[CopyOrigins] = None) -> None:
+    # Materialize into a temp sibling, then rename over dest: an interrupted run leaves the
+    # old or the new file, never a partial one. rename() replaces a symlink/hardlink entry
+    # itself, so library sources are never written through.
+    tmp = staging_path(dest)
+    if os.path.lexists(tmp):
+        remove_entry(tmp)
+    cloned = False
+    if mode == "symlink":
+        os.symlink(src.resolve(), tmp)
+    elif mode == "hardlink":
+        try:
+            os.link(src, tmp)
+        except OSError as e:
+            abort(f"Hardlink failed (use --install-mode copy/auto across filesystems)\nSource: {src}\nDestination: {dest}\nError: {e}")
+    elif origins is not None and origins.clone(src, tmp):
+        shutil.copystat(src, tmp)
+        cloned = True
+    elif mode == "reflink":
+        if not clone_file(src, tmp):
+            abort(f"Reflink not supported by this filesystem (use --install-mode auto)\nSource: {src}\nDestination: {dest}")
+        shutil.copystat(src, tmp)
+    elif mode == "auto":
+        if clone_file(src, tmp) or copy_file_range(src, tmp):
+            shutil.copystat(src, tmp)
+        else:
+            shutil.copy2(src, tmp)
+    else:
+        shutil.copy2(src, tmp)
+    if dest.is_dir() and not dest.is_symlink():
+        shutil.rmtree(dest)
+    os.replace(tmp, dest)
+    devkit_trace.count("files-copied")
+    if cloned:
+        devkit_trace.count("files-cloned")
+    elif mode not in ("symlink", "hardlink") and devkit_trace.TRACER.enabled:
+        devkit_trace.count("bytes-copied", src.stat().st_size)
+
+
+def copy_file(src: Path, dest: Path, mode: InstallMode = "copy", origins: Optional[CopyOrigins] = None) -> None:
     ensure_parent(dest)
-    shutil.copy2(src, dest)
+    if files_match(src, dest, mode):
+        return
+    install_file(src, dest, mode, origins)
+
+
+def files_match(src: Path, dest: Path, mode: InstallMode = "copy") -> bool:
+    try:
+        s, d = src.stat(), dest.lstat()
+    except FileNotFoundError:
+        return False
+    if mode == "symlink":
+        return stat.S_ISLNK(d.st_mode) and os.readlink(dest) == str(src.resolve())
+    if not stat.S_ISREG(d.st_mode):
+        return False
+    same_inode = (s.st_dev, s.st_ino) == (d.st_dev, d.st_ino)
+    if mode == "hardlink":
+        return same_inode
+    if same_inode or s.st_size != d.st_size:
+        # A hardlink left by a previous --install-mode hardlink is not a copy.
+        return False
+    if s.st_mtime_ns == d.st_mtime_ns:
+        return True
+    if filecmp.cmp(src, dest, shallow=False):
+        # Same bytes, different mtime: align metadata so next compare is stat-only.
+        shutil.copystat(src, dest)
+        return True
+    return False
+
+
+def remove_entry(path: Path) -> None:
+    # Never follows symlinks: a linked dir is unlinked, not emptied.
+    if path.is_symlink() or not path.is_dir():
+        path.unlink()
+    else:
+        shutil.rmtree(path)
 
 
-def copy_skill_dir(src_dir: Path, dest_dir: Path) -> None:
+def sync_tree(src_dir: Path, dest_dir: Path, mode: InstallMode = "copy", origins: Optional[CopyOrigins] = None) -> None:
+    # Per-file delta: add/overwrite/remove only what differs. Existing directories are
+    # kept in place (stable inodes), so watchers never see the whole tree vanish.
+    # Link modes link individual files; directories are always real.
+    if dest_dir.is_symlink() or (dest_dir.exists() and not dest_dir.is_dir()):
+        remove_entry(dest_dir)
+    dest_dir.mkdir(exist_ok=True)
+    src_entries = {entry.name: entry.is_dir() for entry in os.scandir(src_dir)}
+    for entry in os.scandir(dest_dir):
+        want_dir = src_entries.get(entry.name)
+        if want_dir is None or want_dir != entry.is_dir(follow_symlinks=False):
+            remove_entry(Path(entry.path))
+    for name in sorted(src_entries):
+        src, dest = src_dir / name, dest_dir / name
+        if src_entries[name]:
+            sync_tree(src, dest, mode, origins)
+        elif not files_match(src, dest, mode):
+            install_file(src, dest, mode, origins)
+    shutil.copystat(src_dir, dest_dir)
+
+
+def copy_skill_dir(
+    src_dir: Path, dest_dir: Path, mode: InstallMode = "copy", origins: Optional[CopyOrigins] = None
+) -> None:
     ensure_parent(dest_dir)
-    if dest_dir.exists():
-        shutil.rmtree(dest_dir)
-    shutil.copytree(src_dir, dest_dir)
+    if dest_dir.is_dir() and not dest_dir.is_symlink():
+        # Existing install: per-file delta, each file swapped in atomically.
+        sync_tree(src_dir, dest_dir, mode, origins)
+        return
+    # Fresh install: build the whole tree next to dest, then swap it in with one rename.
+    tmp = staging_path(dest_dir)
+    if os.path.lexists(tmp):
+        remove_entry(tmp)
+    sync_tree(src_dir, tmp, mode, origins)
+    if os.path.lexists(dest_dir):
+        remove_entry(dest_dir)
+    os.replace(tmp, dest_dir)
 
 
 def delete_path(path: Path) -> None:
-    if not path.exists():
+    # lstat semantics: a symlinked dest is removed as a link and never followed into library/.
+    if not os.path.lexists(path):
         return
-    if path.is_dir():
-        shutil.rmtree(path)
-    else:
+    if path.is_symlink() or not path.is_dir():
         path.unlink()
+        return
+    library = (repo_root() / "library").resolve()
+    resolved = path.resolve()
+    if resolved == library or library in resolved.parents:
+        abort(f"Refusing to prune a path inside library/: {path}")
+    shutil.rmtree(path)
+
+
+def execute_write(
+    e: Entry,
+    src: Path,
+    dest: Path,
+    owned: bool,
+    record: Optional[Dict[str, Any]],
+    sources: SourceFingerprints,
+    mode: InstallMode,
+    dry_run: bool,
+    origins: Optional[CopyOrigins] = None,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    # Returns (action, fingerprint record to store or None).
+    # origins: copy modes only; dest becomes the clone origin for later roots once complete.
+    unchanged, refreshed = is_unchanged(owned, record, src, dest, sources, mode)
+    if unchanged:
+        if origins is not None and not dry_run:
+            origins.add(src, dest)
+        return "unchanged", refreshed
+    action = "update" if owned and os.path.lexists(dest) else "install"
+    if dry_run:
+        return action, None
+    if e.category in ("skills", "skills-user-only"):
+        copy_skill_dir(src, dest, mode, origins)
+    else:
+        copy_file(src, dest, mode, origins)
+    if origins is not None:
+        origins.add(src, dest)
+    return action, fingerprint_record(src, dest, sources, mode)
 
 
-def main(argv: list[str]) -> int:
-    parser = argparse.ArgumentParser(description="Sync DevKit profile to Claude Code and OpenCode")
-    parser.add_argument("profile", help="Profile name (e.g. xapids)")
-    parser.add_argument(
-        "--target",
-        choices=["both", "claude", "opencode"],
-        default="both",
-        help="Where to sync (default: both)",
-    )
-    parser.add_argument(
-        "--no-prune",
-        action="store_true",
-        help="Disable pruning of adapter-owned disabled entries",
-    )
-    parser.add_argument(
-        "--state-file",
-        default=None,
-        help="Override state file path (default: .sync-state-<profile>.json in repo root)",
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Print actions without changing filesystem",
-    )
-    parser.add_argument(
-        "--claude-root",
-        default=str(Path.home() / ".claude"),
-        help="Claude config root (default: ~/.claude)",
-    )
-    parser.add_argument(
-        "--opencode-root",
-        default=str(Path.home() / ".config" / "opencode"),
-        help="OpenCode config root (default: ~/.config/opencode)",
-    )
-    args = parser.parse_args(argv)
+def execute_prune(dest: Path, dry_run: bool) -> Tuple[str, Optional[Dict[str, Any]]]:
+    if not dry_run:
+        delete_path(dest)
+    return "prune", None
 
-    profile_path = repo_root() / "profiles" / f"{args.profile}.yml"
+
+def run_ordered(jobs: list[Callable[[], T]], workers: int) -> Iterator[T]:
+    # Yields results in submission order; with workers > 1 jobs run on a bounded thread pool
+    # (file operations release the GIL, so threads overlap I/O latency).
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield job()
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+
+@dataclass
+class SyncPlan:
+    profile: str
+    state_path: Path
+    state: StateStore
+    roots: Dict[Target, Path]
+    writes: list[Tuple[Target, Entry, Path, Path]]
+    deletes: list[Tuple[Target, Entry, Path]]
+    enabled_extras: list[str]
+    home: Optional[Path] = None
+
+    @property
+    def label(self) -> str:
+        return self.profile if self.home is None else f"{self.profile} @ {self.home}"
+
+
+class DirListing:
+    # Planner preflight: each directory is read once with os.scandir and every existence /
+    # type question about its children is answered from that listing (the dirent type,
+    # so no per-entry stat except for symlinks, which are followed like Path.is_dir()).
+    # Used for destination dirs (per plan) and library source dirs (per process).
+
+    def __init__(self) -> None:
+        self._dirs: Dict[Path, Dict[str, str]] = {}
+
+    def _list(self, directory: Path) -> Dict[str, str]:
+        if directory not in self._dirs:
+            names: Dict[str, str] = {}
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        names[entry.name] = "dir" if entry.is_dir() else "file" if entry.is_file() else "other"
+            except OSError:
+                pass
+            self._dirs[directory] = names
+        return self._dirs[directory]
+
+    def kind(self, path: Path) -> Optional[str]:
+        # "dir", "file", "other" (broken link, socket, ...) or None when absent.
+        return self._list(path.parent).get(path.name)
+
+    def lexists(self, path: Path) -> bool:
+        return path.name in self._list(path.parent)
+
+
+class LibrarySnapshot:
+    # Shared by every profile/home synced in one process: sources are checked against one
+    # listing of each library category dir the profiles enable, and each source is
+    # fingerprinted at most once, however many profiles/targets/homes reference it;
+    # copies after the first are cloned from the first written copy. Dependency closures
+    # index only the enabled tools plus every extra and script, never the whole library.
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.sources = DirListing()
+        self.fingerprints = SourceFingerprints()
+        self.origins = CopyOrigins()
+        self.loaded_index: Optional[LibraryIndex] = None  # None until deps are resolved
+        self._deps: Optional[DependencyGraph] = None
+        self._indexed: Set[Tuple[str, str, str]] = set()
+
+    def deps(self, keys: Set[Tuple[str, str, str]]) -> DependencyGraph:
+        # Reused by every profile/home planned in this process; re-indexed (from the cache)
+        # only when a plan enables tools the current graph does not cover.
+        if self._deps is None or not keys <= self._indexed:
+            self._indexed |= keys
+            schema = load_yaml(self.root / "config" / "schema.yml")
+            self.loaded_index = load_index(self.root, schema, tools=self._indexed)
+            self._deps = DependencyGraph(self.loaded_index)
+        return self._deps
+
+
+def profile_names_from_schema(root: Path) -> list[str]:
+    # Same rule as `make generate-profiles`: every schema author with a profiles/<id>.yml.
+    schema = load_yaml(root / "config" / "schema.yml")
+    authors = schema.get("authors") or []
+    names = [a["id"] for a in authors if isinstance(a, dict) and isinstance(a.get("id"), str)]
+    return [n for n in names if (root / "profiles" / f"{n}.yml").exists()]
+
+
+def expand_profile_path(value: str, profile: str, home: Optional[Path] = None) -> Path:
+    text = value.replace("{profile}", profile)
+    if home is not None:
+        text = text.replace("{home}", str(home))
+    return Path(text).expanduser()
+
+
+def read_homes(args: argparse.Namespace) -> list[Path]:
+    # --homes a,b,c and/or --homes-file (one path per line, '#' comments); order kept, dups dropped.
+    values: list[str] = []
+    if args.homes:
+        values += args.homes.split(",")
+    if args.homes_file:
+        try:
+            lines = Path(args.homes_file).expanduser().read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            prompt_and_abort("Failed to read homes file", f"File: {args.homes_file}\nError: {e}")
+        values += [line.split("#", 1)[0] for line in lines]
+    homes: list[Path] = []
+    for value in values:
+        if value.strip():
+            home = Path(value.strip()).expanduser().absolute()
+            if home not in homes:
+                homes.append(home)
+    return homes
+
+
+def load_profile_entries(profile_name: str, snapshot: LibrarySnapshot) -> Tuple[list[Entry], list[str]]:
+    # Returns (entries, enabled extra ids); aborts on a missing/invalid profile or duplicate ids.
+    profile_path = snapshot.root / "profiles" / f"{profile_name}.yml"
     if not profile_path.exists():
         prompt_and_abort("Profile not found", f"Expected: {profile_path}")
 
-    state_path = Path(args.state_file).expanduser() if args.state_file else default_state_file(args.profile)
-    state = load_state(state_path)
-
     profile = load_yaml(profile_path)
     entries = parse_entries(profile)
     extras = parse_extras(profile)
-    enabled_extras = [e["id"] for e in extras if e.get("enabled") is True]
 
     dup = detect_duplicates(entries)
     if dup is not None:
@@ -494,98 +1060,1209 @@ def main(argv: list[str]) -> int:
         authors = ", ".join(sorted({e.author for e in group}))
         prompt_and_abort(
             "Duplicate id in profile",
-            f"Category: {category}\nId: {tool_id}\nAuthors: {authors}\n\n"
+            f"Profile: {profile_name}\nCategory: {category}\nId: {tool_id}\nAuthors: {authors}\n\n"
             "Fix: change ids in the repo/profile to be unique, then re-run.",
         )
+    return entries, [e["id"] for e in extras if e.get("enabled") is True]
 
-    root = repo_root()
-    claude_root = Path(args.claude_root).expanduser()
-    opencode_root = Path(args.opencode_root).expanduser()
-    targets: list[Target]
+
+def selected_targets(args: argparse.Namespace) -> list[Target]:
     if args.target == "both":
-        targets = ["claude", "opencode"]
+        return ["claude", "opencode"]
+    return [cast(Target, args.target)]
+
+
+def check_source(e: Entry, src: Path, snapshot: LibrarySnapshot) -> None:
+    # One scandir per (author, category) dir, not a walk of the whole library.
+    kind = snapshot.sources.kind(src)
+    if e.category in ("skills", "skills-user-only"):
+        if kind != "dir":
+            prompt_and_abort(
+                "Missing skill source directory",
+                f"Expected directory: {src}\nFrom: {e.category}:{e.id} (author {e.author})",
+            )
     else:
-        targets = [args.target]  # type: ignore[assignment]
+        if kind != "file":
+            prompt_and_abort(
+                "Missing source file",
+                f"Expected file: {src}\nFrom: {e.category}:{e.id} (author {e.author})",
+            )
+
+
+def resolve_dependencies(
+    label: str, enabled: list[Entry], snapshot: LibrarySnapshot, install: bool
+) -> Tuple[list[Entry], list[str]]:
+    # Everything the enabled tools need, transitively, in one graph lookup. With install
+    # (--with-deps): script entries to install next to them and extra ids to report, and
+    # dangling references abort. Without it nothing is added; dangling references only warn.
+    keys = {(e.category, e.author, e.id) for e in enabled}
+    extras, scripts, missing = snapshot.deps(keys).requirements(keys)
+    problems = [f"{dep_label(key)}: {field} references non-existent '{ref}'" for key, field, ref in missing]
+    if not install:
+        for line in problems:
+            print(f"Warning: {label}: {line}", file=sys.stderr)
+        return [], []
+    if problems:
+        prompt_and_abort(
+            "Missing dependency",
+            f"Profile: {label}\n"
+            + "\n".join(problems)
+            + "\n\nFix: add the missing extra/script to library/ or drop the reference (see `make validate`), "
+            "or re-run without --with-deps.",
+        )
+    entries = [Entry(category="scripts", id=s.name, author=s.author, enabled=True) for s in scripts]
+    dup = detect_duplicates(entries)
+    if dup is not None:
+        _category, name, group = dup
+        authors = ", ".join(sorted(e.author for e in group))
+        prompt_and_abort(
+            "Duplicate script name in dependencies",
+            f"Profile: {label}\nScript: {name}\nAuthors: {authors}\n\n"
+            f"Both would be installed as scripts/{name}; rename one of them, then re-run.",
+        )
+    return entries, extras
+
+
+def check_destination(
+    label: str,
+    t: Target,
+    e: Entry,
+    source: str,
+    dest: Path,
+    state: StateStore,
+    dest_listing: DirListing,
+    claimed: Dict[Path, str],
+) -> None:
+    # Preflight for one planned write; claims dest for `label` (profile, or profile @ home).
+    if dest_listing.lexists(dest) and not is_owned(state, t, e, dest):
+        owner = state.owner_of(dest)
+        prompt_and_abort(
+            "Destination conflict (not adapter-owned)",
+            f"Profile: {label}\nTool: {e.category}:{e.id} (author {e.author})\n"
+            f"Source: {source}\nDestination: {dest}\n"
+            + (f"Owned by this adapter as: {owner}\n" if owner else "")
+            + "\nThe destination exists but was not created by this adapter for this tool, so it will not be overwritten.\n"
+            "Resolution: rename/move/delete the existing destination path OR change this tool's id to avoid collision.\n"
+            "Then re-run sync.",
+        )
+    if claimed.get(dest, label) != label:
+        prompt_and_abort(
+            "Destination conflict (another profile in this run)",
+            f"Profile: {label}\nTool: {e.category}:{e.id} (author {e.author})\n"
+            f"Destination: {dest}\nAlso written by profile: {claimed[dest]}\n\n"
+            "Resolution: give each profile/home its own roots (e.g. --claude-root '/home/{profile}/.claude').",
+        )
+    claimed[dest] = label
+
+
+def plan_profile(
+    profile_name: str,
+    args: argparse.Namespace,
+    snapshot: LibrarySnapshot,
+    claimed: Dict[Path, str],
+    only: Optional[set[Tuple[str, str, str]]] = None,
+    home: Optional[Path] = None,
+) -> SyncPlan:
+    # only: restrict the plan to these (category, id, author) keys (watch mode).
+    # home: fan-out target; fills {home} in the roots and state path.
+    label = profile_name if home is None else f"{profile_name} @ {home}"
+    entries, enabled_extras = load_profile_entries(profile_name, snapshot)
+
+    state_path = (
+        expand_profile_path(args.state_file, profile_name, home) if args.state_file else default_state_file(profile_name)
+    )
+    # --plan-out is read-only like --dry-run (no state database is created or migrated).
+    state = open_state(state_path, args.state_backend, args.dry_run or bool(args.plan_out))
 
+    claude_root = expand_profile_path(args.claude_root, profile_name, home)
+    opencode_root = expand_profile_path(args.opencode_root, profile_name, home)
+    targets = selected_targets(args)
+
+    if only is not None:
+        entries = [e for e in entries if (e.category, e.id, e.author) in only]
     enabled = [e for e in entries if e.enabled]
     disabled = [e for e in entries if not e.enabled]
+    scripts, required_extras = resolve_dependencies(label, enabled, snapshot, args.with_deps)
+    enabled_extras = enabled_extras + [x for x in required_extras if x not in enabled_extras]
 
     # Preflight: sources exist; writes do not conflict with non-owned destinations.
+    # Destination category dirs are listed once per plan (all plans run before any write).
+    dest_listing = DirListing()
     planned_writes: list[Tuple[Target, Entry, Path, Path]] = []
     planned_deletes: list[Tuple[Target, Entry, Path]] = []
 
-    for e in enabled:
-        src = src_path(e, root)
-        if e.category in ("skills", "skills-user-only"):
-            if not src.exists() or not src.is_dir():
-                prompt_and_abort(
-                    "Missing skill source directory",
-                    f"Expected directory: {src}\nFrom: {e.category}:{e.id} (author {e.author})",
-                )
-        else:
-            if not src.exists() or not src.is_file():
-                prompt_and_abort(
-                    "Missing source file",
-                    f"Expected file: {src}\nFrom: {e.category}:{e.id} (author {e.author})",
-                )
-
-        for t in targets:
-            dest = claude_dest(e, claude_root) if t == "claude" else opencode_dest(e, opencode_root)
-            if dest.exists() and not is_owned(state, t, e, dest):
-                prompt_and_abort(
-                    "Destination conflict (not adapter-owned)",
-                    f"Tool: {e.category}:{e.id} (author {e.author})\n"
-                    f"Source: {src}\nDestination: {dest}\n\n"
-                    "The destination exists but was not created by this adapter, so it will not be overwritten.\n"
-                    "Resolution: rename/move/delete the existing destination path OR change this tool's id to avoid collision.\n"
-                    "Then re-run sync.",
-                )
-            planned_writes.append((t, e, src, dest))
-
-    if not args.no_prune:
-        for e in disabled:
+    with devkit_trace.phase("preflight"):
+        for e in enabled + scripts:
+            src = src_path(e, snapshot.root)
+            check_source(e, src, snapshot)
             for t in targets:
                 dest = claude_dest(e, claude_root) if t == "claude" else opencode_dest(e, opencode_root)
-                if is_owned(state, t, e, dest):
-                    planned_deletes.append((t, e, dest))
+                check_destination(label, t, e, str(src), dest, state, dest_listing, claimed)
+                planned_writes.append((t, e, src, dest))
+
+        if not args.no_prune:
+            for e in disabled:
+                for t in targets:
+                    dest = claude_dest(e, claude_root) if t == "claude" else opencode_dest(e, opencode_root)
+                    if is_owned(state, t, e, dest):
+                        planned_deletes.append((t, e, dest))
+
+        # Owned scripts no enabled tool needs any more (--with-deps full plans only: a
+        # watch-mode plan does not see every enabled tool).
+        if not args.no_prune and args.with_deps and only is None:
+            needed = {e.id for e in scripts}
+            for t in targets:
+                for name in sorted(state.owned_ids(t, "scripts")):
+                    if name in needed:
+                        continue
+                    e = Entry(category="scripts", id=name, author="", enabled=False)
+                    dest = claude_dest(e, claude_root) if t == "claude" else opencode_dest(e, opencode_root)
+                    if is_owned(state, t, e, dest):
+                        planned_deletes.append((t, e, dest))
+
+    return SyncPlan(
+        profile=profile_name,
+        state_path=state_path,
+        state=state,
+        roots={"claude": claude_root, "opencode": opencode_root},
+        writes=planned_writes,
+        deletes=planned_deletes,
+        enabled_extras=enabled_extras,
+        home=home,
+    )
+
+
+def execute_plan(
+    plan: SyncPlan,
+    args: argparse.Namespace,
+    snapshot: LibrarySnapshot,
+    show_extras: bool = True,
+    probes: Optional[ProbeCache] = None,
+) -> None:
+    state = plan.state
 
-    # Execute
     def say(line: str) -> None:
         print(line)
 
-    if args.dry_run:
-        say("DRY RUN: no filesystem changes")
+    for note in state.notes():
+        say(note)
+
+    # Workers only touch the filesystem; state updates and output happen here, in plan order.
+    origins = snapshot.origins if args.install_mode in ("copy", "reflink", "auto") else None
+    write_jobs: list[Callable[[], Tuple[str, Optional[Dict[str, Any]]]]] = []
+    for t, e, src, dest in plan.writes:
+        write_jobs.append(
+            functools.partial(
+                execute_write,
+                e,
+                src,
+                dest,
+                is_owned(state, t, e, dest),
+                get_fingerprint(state, t, e),
+                snapshot.fingerprints,
+                args.install_mode,
+                args.dry_run,
+                origins,
+            )
+        )
+    prune_jobs = [functools.partial(execute_prune, dest, args.dry_run) for _t, _e, dest in plan.deletes]
+
+    try:
+        if not args.dry_run:
+            stale = remove_stale_staging(plan.roots[t] for t in selected_targets(args))
+            if stale:
+                say(f"Removed {stale} stale staging entr{'y' if stale == 1 else 'ies'} from an interrupted run")
+            state.begin([(t, e, dest) for t, e, _src, dest in plan.writes])
+
+        with devkit_trace.phase("copy"):
+            for (t, e, src, dest), (action, record) in zip(plan.writes, run_ordered(write_jobs, args.jobs)):
+                say(f"{t}: {action} {e.category}:{e.id} -> {dest}")
+                if not args.dry_run:
+                    state.record_write(t, e, dest, action, record)
+
+        with devkit_trace.phase("prune"):
+            for (t, e, dest), (action, _record) in zip(plan.deletes, run_ordered(prune_jobs, args.jobs)):
+                say(f"{t}: {action} {e.category}:{e.id} -> {dest}")
+                if not args.dry_run:
+                    state.record_prune(t, e)
+
+        if not args.dry_run:
+            with devkit_trace.phase("state-save"):
+                written = state.commit()
+            say(f"State updated: {state.path}" if written else f"State unchanged: {state.path}")
+    finally:
+        state.close()
+
+    if show_extras and plan.enabled_extras:
+        say("")
+        say("Enabled extras")
+        say("----------------------------------------")
+        with devkit_trace.phase("extras-probes"):
+            lines = extras_install_hints(plan.enabled_extras, probes, snapshot.loaded_index)
+        for line in lines:
+            say(line)
+
+
+# Plan files (--plan-out / --apply): a plan is computed once and applied later, possibly on
+# other machines. Sources are stored relative to the repo root, destinations relative to
+# their target root, and roots/state paths under $HOME as "~/...".
+PLAN_FILE_VERSION = 1
 
-    for t, e, src, dest in planned_writes:
-        owned = is_owned(state, t, e, dest)
-        action = "update" if owned and dest.exists() else "install"
-        say(f"{t}: {action} {e.category}:{e.id} -> {dest}")
-        if args.dry_run:
+
+def portable_path(path: Path, root: Path) -> str:
+    for base, prefix in ((root, ""), (Path.home(), "~/")):
+        try:
+            return prefix + path.relative_to(base).as_posix()
+        except ValueError:
             continue
-        if e.category in ("skills", "skills-user-only"):
-            copy_skill_dir(src, dest)
+    return str(path)
+
+
+def local_path(value: str, root: Path) -> Path:
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else root / path
+
+
+def plan_to_json(plans: list[SyncPlan], args: argparse.Namespace, snapshot: LibrarySnapshot) -> Dict[str, Any]:
+    root = snapshot.root
+    fingerprints = snapshot.fingerprints
+    out_profiles = []
+    for plan in plans:
+        writes = []
+        for t, e, src, dest in plan.writes:
+            writes.append(
+                {
+                    "target": t,
+                    "category": e.category,
+                    "id": e.id,
+                    "author": e.author,
+                    "src": portable_path(src, root),
+                    "dest": dest.relative_to(plan.roots[t]).as_posix(),
+                    "source": {"signature": fingerprints.signature(src), "content": fingerprints.content(src)},
+                    "expect": {"exists": os.path.lexists(dest), "owned": is_owned(plan.state, t, e, dest)},
+                }
+            )
+        deletes = [
+            {
+                "target": t,
+                "category": e.category,
+                "id": e.id,
+                "author": e.author,
+                "dest": dest.relative_to(plan.roots[t]).as_posix(),
+                "expect": {"exists": os.path.lexists(dest), "owned": True},
+            }
+            for t, e, dest in plan.deletes
+        ]
+        out_profiles.append(
+            {
+                "profile": plan.profile,
+                "state": portable_path(plan.state_path, root),
+                "roots": {t: portable_path(r, root) for t, r in plan.roots.items()},
+                "writes": writes,
+                "deletes": deletes,
+                "enabledExtras": plan.enabled_extras,
+                **({"home": portable_path(plan.home, root)} if plan.home is not None else {}),
+            }
+        )
+    return {
+        "version": PLAN_FILE_VERSION,
+        "createdAt": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "installMode": args.install_mode,
+        "stateBackend": args.state_backend,
+        "profiles": out_profiles,
+    }
+
+
+def load_plan_file(
+    path: Path, args: argparse.Namespace, parser: argparse.ArgumentParser, snapshot: LibrarySnapshot
+) -> list[SyncPlan]:
+    # No profile parsing and no library scan: only the planned sources are stat'ed (and
+    # hashed when their stat signature differs, e.g. on another machine).
+    data: Any = None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        prompt_and_abort("Failed to read plan file", f"Plan: {path}\nError: {e}")
+    if not isinstance(data, dict) or data.get("version") != PLAN_FILE_VERSION:
+        prompt_and_abort("Invalid plan file", f"Expected a version {PLAN_FILE_VERSION} plan: {path}")
+    # The plan was computed for one install mode + state backend; an explicit flag may only repeat it.
+    for option, attr, key, default in (
+        ("--install-mode", "install_mode", "installMode", "copy"),
+        ("--state-backend", "state_backend", "stateBackend", "json"),
+    ):
+        planned = data.get(key, default)
+        if getattr(args, attr) not in (None, planned):
+            parser.error(f"{option} {getattr(args, attr)} conflicts with the plan ({planned}); drop {option} or re-plan")
+        setattr(args, attr, planned)
+
+    root = snapshot.root
+    plans: list[SyncPlan] = []
+    drift: list[str] = []
+    try:
+        for p in data["profiles"]:
+            roots = {cast(Target, t): local_path(r, root) for t, r in p["roots"].items()}
+            state_path = local_path(p["state"], root)
+            state = open_state(state_path, args.state_backend, args.dry_run)
+            writes: list[Tuple[Target, Entry, Path, Path]] = []
+            deletes: list[Tuple[Target, Entry, Path]] = []
+            for w in p["writes"]:
+                t = cast(Target, w["target"])
+                e = Entry(category=cast(Category, w["category"]), id=w["id"], author=w["author"], enabled=True)
+                src = local_path(w["src"], root)
+                dest = roots[t] / w["dest"]
+                where = f"{p['profile']} {t} {e.category}:{e.id}"
+                signature = snapshot.fingerprints.signature(src)
+                if signature is None:
+                    drift.append(f"{where}: source missing ({src})")
+                elif signature != w["source"]["signature"] and snapshot.fingerprints.content(src) != w["source"]["content"]:
+                    drift.append(f"{where}: source changed ({src})")
+                owned = is_owned(state, t, e, dest)
+                if os.path.lexists(dest) and not owned:
+                    drift.append(f"{where}: destination exists and is not adapter-owned ({dest})")
+                elif owned != w["expect"]["owned"] and not (
+                    # Already applied: owned since, and still exactly what this plan installs.
+                    owned and recorded_unchanged(state, t, e, dest, w["source"]["content"], args.install_mode)
+                ):
+                    drift.append(f"{where}: ownership changed since planning ({dest})")
+                writes.append((t, e, src, dest))
+            for d in p["deletes"]:
+                t = cast(Target, d["target"])
+                e = Entry(category=cast(Category, d["category"]), id=d["id"], author=d["author"], enabled=False)
+                dest = roots[t] / d["dest"]
+                if not is_owned(state, t, e, dest):
+                    if os.path.lexists(dest):
+                        drift.append(f"{p['profile']} {t} {e.category}:{e.id}: no longer adapter-owned ({dest})")
+                    continue  # already pruned (plan applied before)
+                deletes.append((t, e, dest))
+            plans.append(
+                SyncPlan(
+                    profile=p["profile"],
+                    state_path=state_path,
+                    state=state,
+                    roots=roots,
+                    writes=writes,
+                    deletes=deletes,
+                    enabled_extras=list(p.get("enabledExtras", [])),
+                    home=local_path(p["home"], root) if p.get("home") else None,
+                )
+            )
+    except (KeyError, TypeError, AttributeError) as e:
+        prompt_and_abort("Invalid plan file", f"Plan: {path}\nMissing/invalid field: {e}")
+    if drift:
+        prompt_and_abort(
+            "Plan is stale (drift since planning)",
+            f"Plan: {path}\n" + "\n".join(drift) + "\n\nRe-run with --plan-out to compute a fresh plan.",
+        )
+    return plans
+
+
+# Bundles (--export-bundle / --install-bundle): one profile's enabled entries packed into a
+# single tar, installed later with no repo checkout, PyYAML or library scan. Layout:
+# - manifest.json (first member): per entry its identity, kind, source fingerprints and the
+#   destination path relative to each target root; disabled entries (prune candidates);
+#   enabled extras with their probe specs.
+# - payload/<n>[/...]: the files of manifest entry n, in manifest order, so install is one
+#   sequential read (stdin / pipes work).
+BUNDLE_VERSION = 1
+BUNDLE_MANIFEST = "manifest.json"
+
+
+def bundle_write_mode(path: Path) -> str:
+    name = path.name
+    if name.endswith((".tar.gz", ".tgz")):
+        return "w:gz"
+    if name.endswith(".tar.xz"):
+        return "w:xz"
+    if name.endswith(".tar.bz2"):
+        return "w:bz2"
+    return "w"
+
+
+def bundle_dests(e: Entry, targets: list[Target]) -> Dict[str, str]:
+    return {t: (claude_dest(e, Path()) if t == "claude" else opencode_dest(e, Path())).as_posix() for t in targets}
+
+
+def export_bundle(profile_name: str, args: argparse.Namespace, snapshot: LibrarySnapshot, out: Path) -> Tuple[int, int]:
+    # Returns (entries packed, prune candidates).
+    entries, enabled_extras = load_profile_entries(profile_name, snapshot)
+    targets = selected_targets(args)
+    enabled = [e for e in entries if e.enabled]
+    scripts, required_extras = resolve_dependencies(profile_name, enabled, snapshot, args.with_deps)
+    enabled = enabled + scripts
+    enabled_extras = enabled_extras + [x for x in required_extras if x not in enabled_extras]
+    fingerprints = snapshot.fingerprints
+
+    items: list[Dict[str, Any]] = []
+    for e in enabled:
+        src = src_path(e, snapshot.root)
+        check_source(e, src, snapshot)
+        items.append(
+            {
+                "category": e.category,
+                "id": e.id,
+                "author": e.author,
+                "kind": "dir" if e.category in ("skills", "skills-user-only") else "file",
+                "source": {"signature": fingerprints.signature(src), "content": fingerprints.content(src)},
+                "dests": bundle_dests(e, targets),
+            }
+        )
+    disabled = [
+        {"category": e.category, "id": e.id, "author": e.author, "dests": bundle_dests(e, targets)}
+        for e in entries
+        if not e.enabled
+    ]
+    registry = load_extras_registry(snapshot.root / "library", snapshot.loaded_index) if enabled_extras else {}
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "createdAt": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "profile": profile_name,
+        "entries": items,
+        "disabled": disabled,
+        "enabledExtras": enabled_extras,
+        "extras": {i: spec_to_dict(registry[i]) for i in enabled_extras if i in registry},
+    }
+
+    def add(tar: tarfile.TarFile, path: Path, arcname: str) -> None:
+        info = tar.gettarinfo(str(path), arcname)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        if info.isreg():
+            with open(path, "rb") as f:
+                tar.addfile(info, f)
+            devkit_trace.count("files-copied")
+            devkit_trace.count("bytes-copied", info.size)
+        else:
+            tar.addfile(info)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = staging_path(out)
+    data = (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    with devkit_trace.phase("bundle-pack"):
+        # dereference: symlinks inside a skill dir are packed as the files they point to.
+        with tarfile.open(tmp, bundle_write_mode(out), dereference=True) as tar:
+            info = tarfile.TarInfo(BUNDLE_MANIFEST)
+            info.size, info.mtime, info.mode = len(data), int(time.time()), 0o644
+            tar.addfile(info, io.BytesIO(data))
+            for n, e in enumerate(enabled):
+                src = src_path(e, snapshot.root)
+                add(tar, src, f"payload/{n}")
+                if src.is_dir():
+                    for rel, _st in iter_tree(src):
+                        add(tar, src / rel, f"payload/{n}/{rel.rstrip('/')}")
+    os.replace(tmp, out)
+    return len(items), len(disabled)
+
+
+def bundle_entry(item: Dict[str, Any], enabled: bool) -> Entry:
+    category = item["category"]
+    if category not in STATE_CATEGORIES or not isinstance(item["id"], str):
+        raise ValueError(f"entry {item.get('category')}:{item.get('id')}")
+    return Entry(category=cast(Category, category), id=item["id"], author=str(item["author"]), enabled=enabled)
+
+
+def bundle_dest(root: Path, rel: Any) -> Path:
+    # Manifest paths are untrusted: relative, no "..", no empty parts.
+    parts = rel.split("/") if isinstance(rel, str) else []
+    if not parts or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"destination {rel!r}")
+    return root.joinpath(*parts)
+
+
+def plan_bundle(manifest: Dict[str, Any], args: argparse.Namespace) -> list[SyncPlan]:
+    # Same preflight as plan_profile (ownership conflicts, one claim per destination), with
+    # "payload/<n>" standing in for the library source.
+    profile_name = manifest["profile"]
+    targets = selected_targets(args)
+    dest_listing = DirListing()
+    claimed: Dict[Path, str] = {}
+    plans: list[SyncPlan] = []
+    for home in args.home_paths:
+        label = profile_name if home is None else f"{profile_name} @ {home}"
+        state_path = expand_profile_path(args.state_file, profile_name, home)
+        state = open_state(state_path, args.state_backend, args.dry_run)
+        roots: Dict[Target, Path] = {
+            "claude": expand_profile_path(args.claude_root, profile_name, home),
+            "opencode": expand_profile_path(args.opencode_root, profile_name, home),
+        }
+        writes: list[Tuple[Target, Entry, Path, Path]] = []
+        deletes: list[Tuple[Target, Entry, Path]] = []
+        with devkit_trace.phase("preflight"):
+            for n, item in enumerate(manifest["entries"]):
+                e = bundle_entry(item, True)
+                for t in targets:
+                    if t not in item["dests"]:
+                        continue
+                    dest = bundle_dest(roots[t], item["dests"][t])
+                    check_destination(label, t, e, f"bundle payload/{n}", dest, state, dest_listing, claimed)
+                    writes.append((t, e, Path("payload", str(n)), dest))
+            if not args.no_prune:
+                for item in manifest["disabled"]:
+                    e = bundle_entry(item, False)
+                    for t in targets:
+                        if t in item["dests"]:
+                            dest = bundle_dest(roots[t], item["dests"][t])
+                            if is_owned(state, t, e, dest):
+                                deletes.append((t, e, dest))
+        plans.append(
+            SyncPlan(
+                profile=profile_name,
+                state_path=state_path,
+                state=state,
+                roots=roots,
+                writes=writes,
+                deletes=deletes,
+                enabled_extras=list(manifest.get("enabledExtras", [])),
+                home=home,
+            )
+        )
+    return plans
+
+
+def bundle_unchanged(state: StateStore, t: Target, e: Entry, dest: Path, item: Dict[str, Any]) -> bool:
+    # The manifest's content hash stands in for the source.
+    return recorded_unchanged(state, t, e, dest, item["source"]["content"], "copy")
+
+
+def install_bundle(bundle: str, args: argparse.Namespace) -> None:
+    # Streams the archive once: each payload entry is unpacked into a scratch copy next to
+    # its first destination and checked against the manifest hash. Only then are ownership
+    # intents journaled and the copy renamed into that destination; other destinations get
+    # the regular staged writes from it (CoW-cloned when possible).
+    source = "stdin" if bundle == "-" else bundle
+    try:
+        if bundle == "-":
+            tar = tarfile.open(fileobj=sys.stdin.buffer, mode="r|*")
         else:
-            copy_file(src, dest)
-        set_owned(state, t, e, dest)
+            tar = tarfile.open(Path(bundle).expanduser(), mode="r|*")
+    except (OSError, tarfile.TarError) as e:
+        prompt_and_abort("Failed to read bundle", f"Bundle: {source}\nError: {e}")
 
-    for t, e, dest in planned_deletes:
-        say(f"{t}: prune {e.category}:{e.id} -> {dest}")
-        if args.dry_run:
+    plans: list[SyncPlan] = []
+    try:
+        with tar:
+            member = tar.next()
+            manifest: Any = None
+            if member is not None and member.name == BUNDLE_MANIFEST and member.isreg():
+                f = tar.extractfile(member)
+                manifest = json.loads(f.read().decode("utf-8")) if f is not None else None
+            if not isinstance(manifest, dict) or manifest.get("version") != BUNDLE_VERSION:
+                prompt_and_abort("Invalid bundle", f"Expected a version {BUNDLE_VERSION} {BUNDLE_MANIFEST} first: {source}")
+            items: list[Dict[str, Any]] = manifest["entries"]
+            plans = plan_bundle(manifest, args)
+            print(f"Installing bundle: {source} (profile {manifest['profile']}, {len(items)} entries)")
+            if args.dry_run:
+                print("DRY RUN: no filesystem changes")
+
+            # (plan index, write index) -> action; writes grouped by payload entry.
+            actions: Dict[Tuple[int, int], str] = {}
+            todo: Dict[int, list[Tuple[int, int, str]]] = {}
+            for pi, plan in enumerate(plans):
+                for wi, (t, e, src, dest) in enumerate(plan.writes):
+                    n = int(src.name)
+                    if bundle_unchanged(plan.state, t, e, dest, items[n]):
+                        actions[(pi, wi)] = "unchanged"
+                        continue
+                    action = "update" if is_owned(plan.state, t, e, dest) and os.path.lexists(dest) else "install"
+                    actions[(pi, wi)] = action
+                    todo.setdefault(n, []).append((pi, wi, action))
+                if not args.dry_run:
+                    for note in plan.state.notes():
+                        print(note)
+                    stale = remove_stale_staging(plan.roots[t] for t in selected_targets(args))
+                    if stale:
+                        print(f"Removed {stale} stale staging entr{'y' if stale == 1 else 'ies'} from an interrupted run")
+
+            if todo and not args.dry_run:
+                with devkit_trace.phase("copy"):
+                    stream_bundle_payload(tar, source, items, plans, todo)
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        for plan in plans:
+            plan.state.close()
+        prompt_and_abort("Invalid bundle", f"Bundle: {source}\nMissing/invalid field: {e}")
+    except (OSError, tarfile.TarError) as e:
+        for plan in plans:
+            plan.state.close()
+        prompt_and_abort("Failed to read bundle", f"Bundle: {source}\nError: {e}")
+
+    for pi, plan in enumerate(plans):
+        if len(plans) > 1:
+            print(f"\n== profile: {plan.label}")
+        try:
+            for wi, (t, e, _src, dest) in enumerate(plan.writes):
+                print(f"{t}: {actions[(pi, wi)]} {e.category}:{e.id} -> {dest}")
+            with devkit_trace.phase("prune"):
+                for t, e, dest in plan.deletes:
+                    execute_prune(dest, args.dry_run)
+                    print(f"{t}: prune {e.category}:{e.id} -> {dest}")
+                    if not args.dry_run:
+                        plan.state.record_prune(t, e)
+            if not args.dry_run:
+                with devkit_trace.phase("state-save"):
+                    written = plan.state.commit()
+                print(f"State updated: {plan.state.path}" if written else f"State unchanged: {plan.state.path}")
+        finally:
+            plan.state.close()
+
+    enabled_extras = list(manifest.get("enabledExtras", []))
+    if enabled_extras:
+        # Probe specs travel in the manifest; no library/ needed (and no probe cache file).
+        registry = {i: spec_from_dict(spec) for i, spec in manifest.get("extras", {}).items()}
+        print("")
+        print("Enabled extras")
+        print("----------------------------------------")
+        with devkit_trace.phase("extras-probes"):
+            lines = probe_extras_install_hints(enabled_extras, registry, None)
+        for line in lines:
+            print(line)
+
+
+def stream_bundle_payload(
+    tar: tarfile.TarFile,
+    source: str,
+    items: list[Dict[str, Any]],
+    plans: list[SyncPlan],
+    todo: Dict[int, list[Tuple[int, int, str]]],
+) -> None:
+    origins = CopyOrigins()
+    seen: set[int] = set()
+    current: Optional[int] = None
+    scratch: Optional[Path] = None
+
+    def finish(n: int, scratch: Path) -> None:
+        item = items[n]
+        if content_fingerprint(scratch) != item["source"]["content"]:
+            remove_entry(scratch)
+            prompt_and_abort("Corrupt bundle", f"Bundle: {source}\nPayload {n} ({item['category']}:{item['id']}) does not match its manifest hash.")
+        # Verified: a corrupt payload aborts above with no intents for what it never wrote.
+        intents: Dict[int, list[Tuple[Target, Entry, Path]]] = {}
+        for pi, wi, _action in todo[n]:
+            t, e, _src, dest = plans[pi].writes[wi]
+            intents.setdefault(pi, []).append((t, e, dest))
+        for pi, writes in intents.items():
+            plans[pi].state.begin(writes)
+        src = scratch
+        for pi, wi, action in todo[n]:
+            plan = plans[pi]
+            t, e, _src, dest = plan.writes[wi]
+            if src == scratch and (item["kind"] != "dir" or not os.path.lexists(dest)):
+                # The first destination takes the scratch copy itself (an existing skill dir
+                # is updated as a per-file delta instead).
+                if dest.is_dir() and not dest.is_symlink():
+                    shutil.rmtree(dest)
+                os.replace(scratch, dest)
+                src = dest
+            elif item["kind"] == "dir":
+                copy_skill_dir(src, dest, "copy", origins)
+            else:
+                copy_file(src, dest, "copy", origins)
+            origins.add(src, dest)
+            record = {
+                "mode": "copy",
+                "src": item["source"]["signature"],
+                "dest": stat_signature(dest),
+                "content": item["source"]["content"],
+            }
+            plan.state.record_write(t, e, dest, action, record)
+        if src == scratch:
+            remove_entry(scratch)
+
+    # tar.next(), not iteration: iterating a stream restarts from the cached manifest member.
+    while True:
+        member = tar.next()
+        if member is None:
+            break
+        parts = member.name.split("/")
+        if len(parts) < 2 or parts[0] != "payload" or not parts[1].isdigit() or int(parts[1]) >= len(items):
+            raise ValueError(f"member {member.name!r}")
+        if any(part in ("", ".", "..") for part in parts[2:]) or not (member.isreg() or member.isdir()):
+            raise ValueError(f"member {member.name!r}")
+        n = int(parts[1])
+        if n != current:
+            if current is not None and scratch is not None:
+                finish(current, scratch)
+            if n in seen:
+                raise ValueError(f"member {member.name!r} out of order")
+            seen.add(n)
+            current, scratch = n, None
+            if n in todo:
+                pi, wi, _action = todo[n][0]
+                first_dest = plans[pi].writes[wi][3]
+                ensure_parent(first_dest)
+                scratch = first_dest.with_name(f".{first_dest.name}.devkit-bundle")
+                if os.path.lexists(scratch):
+                    remove_entry(scratch)
+        if scratch is None:
             continue
-        delete_path(dest)
-        clear_owned(state, t, e)
+        path = scratch.joinpath(*parts[2:])
+        if member.isdir():
+            path.mkdir(parents=True, exist_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fsrc = tar.extractfile(member)
+        if fsrc is None:
+            raise ValueError(f"member {member.name!r}")
+        with fsrc, open(path, "wb") as fdst:
+            shutil.copyfileobj(fsrc, fdst, 1 << 20)
+        os.chmod(path, member.mode & 0o777)
+        os.utime(path, (member.mtime, member.mtime))
+    if current is not None and scratch is not None:
+        finish(current, scratch)
+    missing = [f"{items[n]['category']}:{items[n]['id']}" for n in todo if n not in seen]
+    if missing:
+        prompt_and_abort("Corrupt bundle", f"Bundle: {source}\nMissing payload for: {', '.join(missing)}")
+
+
+class PollingWatcher:
+    # Portable fallback: rescans (mtime, size) of every dir/file under the watched roots.
+    name = "polling"
+
+    def __init__(self, roots: list[Path]) -> None:
+        self.roots = roots
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        out: Dict[Path, Tuple[int, int]] = {}
+        stack = [r for r in self.roots if r.is_dir()]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except FileNotFoundError:
+                            continue
+                        out[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+            except FileNotFoundError:
+                continue
+        return out
+
+    def poll(self, timeout: float) -> set[Path]:
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
 
+class InotifyWatcher:
+    # Linux inotify via ctypes (no extra dependency); one watch per directory.
+    name = "inotify"
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800  # modify/attrib/close_write/moves/create/delete
+    IN_ISDIR = 0x40000000
+    IN_CREATE = 0x100
+    IN_MOVED_TO = 0x80
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+
+    def __init__(self, roots: list[Path]) -> None:
+        import ctypes
+
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = roots
+        self._dirs: Dict[int, Path] = {}
+        for r in roots:
+            self._add_tree(r)
+
+    def _add_tree(self, top: Path) -> None:
+        for dirpath, _dirnames, _filenames in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+
+    def _forget_tree(self, top: Path) -> None:
+        # A directory moved out of the watched roots: its watches follow the inodes away.
+        for wd, path in list(self._dirs.items()):
+            if path == top or top in path.parents:
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def poll(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            off = 0
+            while off < len(buf):
+                wd, mask, _cookie, length = struct.unpack_from("iIII", buf, off)
+                name = buf[off + 16 : off + 16 + length].rstrip(b"\0")
+                off += 16 + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.update(self.roots)
+                    continue
+                base = self._dirs.get(wd)
+                if base is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    # The kernel dropped the watch (directory deleted, filesystem unmounted).
+                    del self._dirs[wd]
+                    continue
+                path = base / os.fsdecode(name) if name else base
+                changed.add(path)
+                if mask & self.IN_DELETE_SELF:
+                    del self._dirs[wd]  # IN_IGNORED follows
+                elif mask & self.IN_MOVE_SELF and not base.is_dir():
+                    # A move inside the roots already re-mapped this wd (IN_MOVED_TO comes first).
+                    self._forget_tree(base)
+                elif mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(roots: list[Path]) -> Any:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots)
+
+
+def classify_change(path: Path, root: Path, profile_names: list[str]) -> Tuple[str, Any]:
+    # ("profile", name) | ("entry", (category, id, author)) | ("full", None) | ("ignore", None)
+    profiles_dir = root / "profiles"
+    if path.parent == profiles_dir:
+        name = path.name[: -len(".yml")] if path.name.endswith(".yml") else None
+        return ("profile", name) if name in profile_names else ("ignore", None)
+    try:
+        parts = path.relative_to(root / "library").parts
+    except ValueError:
+        return "ignore", None
+    if len(parts) < 2:
+        return "full", None
+    author, category_dir = parts[0], parts[1]
+    category = "commands" if category_dir == ".commands" else category_dir
+    if category in ("extras", "scripts"):
+        return "full", None  # dependencies of any enabled tool may have changed
+    if category not in ("agents", "commands", "skills", "skills-user-only"):
+        return "ignore", None
+    if len(parts) < 3:
+        return "full", None
+    name = parts[2]
+    tool_id = name if category in ("skills", "skills-user-only") else Path(name).stem
+    return "entry", (category, tool_id, author)
+
+
+def sync_changes(changed: set[Path], args: argparse.Namespace, profile_names: list[str], root: Path) -> None:
+    full_profiles: set[str] = set()
+    only: Optional[set[Tuple[str, str, str]]] = set()
+    for path in changed:
+        kind, value = classify_change(path, root, profile_names)
+        if kind == "profile":
+            full_profiles.add(value)
+        elif kind == "full":
+            only = None
+        elif kind == "entry" and only is not None:
+            only.add(value)
+
+    snapshot = LibrarySnapshot(root)
+    claimed: Dict[Path, str] = {}
+    plans: list[SyncPlan] = []
+    for home in args.home_paths:
+        for name in profile_names:
+            scope = None if (name in full_profiles or only is None) else only
+            if scope is not None and not scope:
+                continue
+            plans.append(plan_profile(name, args, snapshot, claimed, only=scope, home=home))
+    for plan in plans:
+        if len(profile_names) > 1 or len(args.home_paths) > 1:
+            print(f"== profile: {plan.label}")
+        execute_plan(plan, args, snapshot, show_extras=False)
+
+
+def watch(args: argparse.Namespace, profile_names: list[str], root: Path) -> int:
+    watcher = make_watcher([root / "library", root / "profiles"])
+    print(f"\nWatching library/ + profiles ({watcher.name}); Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.poll(args.watch_interval)
+            if not changed:
+                continue
+            # Debounce: keep collecting until the burst of edits goes quiet.
+            while True:
+                more = watcher.poll(args.watch_debounce)
+                if not more:
+                    break
+                changed |= more
+            print(f"\n[{dt.datetime.now().strftime('%H:%M:%S')}] {len(changed)} changed path(s)")
+            try:
+                sync_changes(changed, args, profile_names, root)
+            except SystemExit:
+                # Keep watching after a conflict/invalid profile; the next edit retries.
+                print("Sync aborted; waiting for further changes", file=sys.stderr)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+def run_plans(plans: list[SyncPlan], args: argparse.Namespace, snapshot: LibrarySnapshot) -> None:
+    if args.dry_run:
+        print("DRY RUN: no filesystem changes")
+
+    probes = ProbeCache(default_probe_cache_file(), refresh=args.refresh_extras)
+    hinted: set[str] = set()
+    for plan in plans:
+        if len(plans) > 1:
+            print(f"\n== profile: {plan.label}")
+        # Extras are per machine, not per home: report them once per profile.
+        execute_plan(plan, args, snapshot, show_extras=plan.profile not in hinted, probes=probes)
+        hinted.add(plan.profile)
     if not args.dry_run:
-        save_state(state_path, state)
-        say(f"State updated: {state_path}")
+        probes.save()
+
+
+def resolve_homes(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    # Fills args.home_paths ([None] without --homes) and the root/state defaults; the
+    # per-home defaults keep every home self-contained.
+    homes = read_homes(args)
+    if (args.homes or args.homes_file) and not homes:
+        prompt_and_abort("No homes to sync", f"--homes: {args.homes or ''}\n--homes-file: {args.homes_file or ''}")
+    if homes:
+        args.claude_root = args.claude_root or "{home}/.claude"
+        args.opencode_root = args.opencode_root or "{home}/.config/opencode"
+        args.state_file = args.state_file or "{home}/.devkit-sync-state-{profile}.json"
+    home_options = (("--claude-root", args.claude_root), ("--opencode-root", args.opencode_root), ("--state-file", args.state_file))
+    for option, value in home_options:
+        if value and "{home}" in value and not homes:
+            parser.error(f"{option} uses {{home}}; give --homes or --homes-file")
+        if value and "{home}" not in value and len(homes) > 1:
+            parser.error(f"{option} must contain {{home}} when syncing several homes")
+    args.claude_root = args.claude_root or str(Path.home() / ".claude")
+    args.opencode_root = args.opencode_root or str(Path.home() / ".config" / "opencode")
+    args.home_paths = homes or [None]
 
-    if enabled_extras:
-        say("")
-        say("Enabled extras")
-        say("----------------------------------------")
-        for line in extras_install_hints(enabled_extras):
-            say(line)
 
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Sync DevKit profile to Claude Code and OpenCode")
+    parser.add_argument("profile", nargs="?", help="Profile name (e.g. xapids)")
+    parser.add_argument(
+        "--profiles",
+        default=None,
+        help="Comma-separated profiles to sync in one run (e.g. xapids,tihany7)",
+    )
+    parser.add_argument(
+        "--all-profiles",
+        action="store_true",
+        help="Sync every schema author that has a profiles/<id>.yml",
+    )
+    parser.add_argument(
+        "--target",
+        choices=["both", "claude", "opencode"],
+        default="both",
+        help="Where to sync (default: both)",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Disable pruning of adapter-owned disabled entries",
+    )
+    parser.add_argument(
+        "--with-deps",
+        action="store_true",
+        help="Also install the scripts enabled tools require (requires_scripts, transitively) and report "
+        "required extras; a dangling reference aborts (default: sync only the profile's entries, warn about "
+        "dangling references)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Override state file path; may contain {profile} and {home} (default: .sync-state-<profile>.json "
+        "in repo root; {home}/.devkit-sync-state-<profile>.json with --homes)",
+    )
+    parser.add_argument(
+        "--state-backend",
+        choices=["json", "sqlite"],
+        default=None,
+        help="Ownership state store: json, or sqlite (indexed, transactional; <state>.sqlite, "
+        "migrated automatically from the JSON state file) (default: json)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print actions without changing filesystem",
+    )
+    parser.add_argument(
+        "--claude-root",
+        default=None,
+        help="Claude config root; may contain {profile} and {home} (default: ~/.claude, {home}/.claude with --homes)",
+    )
+    parser.add_argument(
+        "--opencode-root",
+        default=None,
+        help="OpenCode config root; may contain {profile} and {home} "
+        "(default: ~/.config/opencode, {home}/.config/opencode with --homes)",
+    )
+    parser.add_argument(
+        "--homes",
+        default=None,
+        help="Comma-separated home dirs to fan out to in one pass; each gets its own roots + state",
+    )
+    parser.add_argument(
+        "--homes-file",
+        default=None,
+        metavar="FILE",
+        help="Like --homes, one home dir per line ('#' comments allowed)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=devkit_trace.positive_int,
+        default=1,
+        help="Run copy/prune operations on N parallel workers (default: 1)",
+    )
+    parser.add_argument(
+        "--install-mode",
+        choices=["copy", "reflink", "hardlink", "symlink", "auto"],
+        default=None,
+        help="How files are materialized: copy, reflink (CoW clone), hardlink, symlink, "
+        "or auto (clone/copy_file_range, else copy) (default: copy)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After syncing, keep running and re-sync entries whose library files or profile change",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between polls when inotify is unavailable (default: 1.0)",
+    )
+    parser.add_argument(
+        "--watch-debounce",
+        type=float,
+        default=0.3,
+        help="Quiet period in seconds that ends a burst of edits (default: 0.3)",
+    )
+    parser.add_argument(
+        "--plan-out",
+        default=None,
+        metavar="FILE",
+        help="Write the computed plan (writes, prunes, source fingerprints, expected destination state) "
+        "to FILE as JSON and exit without changing anything",
+    )
+    parser.add_argument(
+        "--apply",
+        default=None,
+        metavar="FILE",
+        help="Execute a plan written by --plan-out after checking sources and ownership have not drifted "
+        "(no profile parsing or library scan)",
+    )
+    parser.add_argument(
+        "--export-bundle",
+        default=None,
+        metavar="FILE",
+        help="Pack the profile's enabled entries, destination layout and fingerprint manifest into one tar "
+        "(.tar, .tar.gz/.tgz, .tar.xz) and exit",
+    )
+    parser.add_argument(
+        "--install-bundle",
+        default=None,
+        metavar="FILE",
+        help="Install a bundle written by --export-bundle ('-' reads stdin) into the target roots and update "
+        "state; needs no repo checkout, PyYAML or library scan",
+    )
+    parser.add_argument(
+        "--refresh-extras",
+        action="store_true",
+        help="Ignore cached extras probe results and re-run every probe",
+    )
+    devkit_trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+    devkit_trace.start("devkit-sync-adapter.py", args)
+
+    root = repo_root()
+    if not args.apply:
+        # None = not given: --apply takes both from the plan file.
+        args.install_mode = args.install_mode or "copy"
+        args.state_backend = args.state_backend or "json"
+    selectors = sum([args.profile is not None, args.profiles is not None, args.all_profiles])
+    if args.install_bundle:
+        if selectors or args.apply or args.plan_out or args.export_bundle or args.watch:
+            parser.error(
+                "--install-bundle takes the profile from the bundle; "
+                "drop <profile>/--profiles/--all-profiles/--apply/--plan-out/--export-bundle/--watch"
+            )
+        if args.install_mode != "copy":
+            parser.error("--install-bundle always installs copies; drop --install-mode")
+        resolve_homes(args, parser)
+        # No repo needed: without --homes/--state-file, state lives in $HOME.
+        args.state_file = args.state_file or str(Path.home() / ".devkit-sync-state-{profile}.json")
+        install_bundle(args.install_bundle, args)
+        return 0
+    if args.apply:
+        if selectors or args.plan_out or args.watch or args.homes or args.homes_file:
+            parser.error(
+                "--apply takes the profiles from the plan file; drop <profile>/--profiles/--all-profiles/--homes/--plan-out/--watch"
+            )
+        snapshot = LibrarySnapshot(root)
+        plans = load_plan_file(Path(args.apply).expanduser(), args, parser, snapshot)
+        print(f"Applying plan: {args.apply}")
+        run_plans(plans, args, snapshot)
+        return 0
+    if selectors != 1:
+        parser.error("give exactly one of: <profile>, --profiles a,b,c, --all-profiles")
+    if args.plan_out and args.watch:
+        parser.error("--plan-out cannot be combined with --watch")
+    if args.all_profiles:
+        profile_names = profile_names_from_schema(root)
+    elif args.profiles is not None:
+        profile_names = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    else:
+        profile_names = [args.profile]
+    if not profile_names:
+        prompt_and_abort("No profiles to sync", f"Looked in: {root / 'profiles'}")
+    if len(profile_names) > 1 and args.state_file and "{profile}" not in args.state_file:
+        parser.error("--state-file must contain {profile} when syncing several profiles")
+
+    if args.export_bundle:
+        if len(profile_names) != 1 or args.plan_out or args.watch or args.homes or args.homes_file:
+            parser.error("--export-bundle packs exactly one profile; drop --plan-out/--watch/--homes")
+        snapshot = LibrarySnapshot(root)
+        out = Path(args.export_bundle).expanduser()
+        packed, prunable = export_bundle(profile_names[0], args, snapshot, out)
+        print(f"Bundle written: {out} (profile {profile_names[0]}, {packed} entries, {prunable} prune candidates)")
+        return 0
+    resolve_homes(args, parser)
+
+    # Plan every profile (and home) before touching any target root, so a conflict in one
+    # profile aborts the whole run without partial changes.
+    snapshot = LibrarySnapshot(root)
+    claimed: Dict[Path, str] = {}
+    plans = [plan_profile(name, args, snapshot, claimed, home=home) for home in args.home_paths for name in profile_names]
+
+    if args.plan_out:
+        plan_file = Path(args.plan_out).expanduser()
+        plan_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(plan_file, json.dumps(plan_to_json(plans, args, snapshot), indent=2, sort_keys=True) + "\n")
+        for plan in plans:
+            plan.state.close()
+            print(f"{plan.label}: {len(plan.writes)} write(s), {len(plan.deletes)} prune(s)")
+        print(f"Plan written: {plan_file}")
+        return 0
+
+    run_plans(plans, args, snapshot)
+
+    if args.watch:
+        return watch(args, profile_names, root)
     return 0
 
 
@@ -6,135 +6,80 @@ Adds new tools with enabled: false
 Removes tools that no longer exist
 """
 
+import argparse
+import difflib
 import os
 import sys
-import yaml
-import re
 from pathlib import Path
 from collections import OrderedDict
 
+import devkit_trace
+import devkit_yaml_cache
+from devkit_library_index import SKILL_CATEGORIES, load_index
+
 def load_schema(repo_root):
     """Load schema from config/schema.yml"""
     schema_path = repo_root / "config" / "schema.yml"
-    with open(schema_path, 'r') as f:
-        return yaml.safe_load(f)
+    with devkit_trace.phase("yaml-load"):
+        return devkit_yaml_cache.load_yaml(schema_path)
 
-def parse_frontmatter(file_path):
-    """Extract YAML frontmatter from markdown file"""
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        # Check for YAML frontmatter (between --- markers)
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            frontmatter_text = match.group(1)
-            metadata = yaml.safe_load(frontmatter_text) or {}
-            
-            # Parse backtick-separated dependencies from strings
-            for key in ['requires_extras', 'requires_scripts']:
-                if key in metadata and isinstance(metadata[key], str):
-                    # Extract items between backticks
-                    items = re.findall(r'`([^`]+)`', metadata[key])
-                    metadata[key] = items
-            
-            return metadata
-        return {}
-    except Exception:
+def tool_metadata(entry):
+    """Frontmatter metadata of an indexed tool ({} when missing or invalid).
+
+    requires_extras / requires_scripts are always lists (backticked names in prose strings).
+    """
+    fm = entry.frontmatter
+    if fm is None or fm.error is not None:
         return {}
+    metadata = dict(fm.data)
+    for key, items in (('requires_extras', fm.requires_extras), ('requires_scripts', fm.requires_scripts)):
+        if key in metadata:
+            metadata[key] = items
+    return metadata
 
-def find_tools_in_library(repo_root):
-    """Scan library and return all tools organized by category"""
-    schema = load_schema(repo_root)
-    categories = [c for c in schema["categories"].keys() if c != "scripts"]
+def profile_categories(schema):
+    """Categories listed in profiles (every schema category but scripts)"""
+    return [c for c in schema["categories"].keys() if c != "scripts"]
+
+def find_tools_in_library(repo_root, schema):
+    """Collect all tools from the library index, organized by category"""
+    categories = profile_categories(schema)
     scopes = [a["id"] for a in schema["authors"]]
+    index = load_index(repo_root, schema)
 
     tools = {cat: [] for cat in categories}
 
-    def category_path(scope, category):
-        if category == "commands":
-            return repo_root / "library" / scope / ".commands"
-        return repo_root / "library" / scope / category
-    
+    def tool(entry):
+        # Parse frontmatter for dependencies
+        metadata = tool_metadata(entry)
+        return {
+            'id': entry.id,
+            'author': entry.author,
+            'file': str(entry.main.relative_to(repo_root)),
+            'requires_extras': metadata.get('requires_extras', []),
+            'requires_scripts': metadata.get('requires_scripts', [])
+        }
+
     for category in categories:
         for scope in scopes:
-            lib_path = category_path(scope, category)
-            if not lib_path.exists():
-                continue
+            entries = index.category(category, scope)
 
             # Most categories use a flat file structure:
             #   library/{author}/{category}/{tool-id}.md
             # Skills use a folder structure:
             #   library/{author}/skills/{skill-id}/SKILL.md
-            if category in ("skills", "skills-user-only"):
-                seen_ids = set()
-
+            if category in SKILL_CATEGORIES:
                 # Preferred structure: one folder per skill
-                for skill_dir in sorted(lib_path.glob("*")):
-                    if not skill_dir.is_dir() or skill_dir.name.startswith('.') or skill_dir.name.startswith('_'):
-                        continue
-
-                    skill_file = skill_dir / "SKILL.md"
-                    if not skill_file.exists() or not skill_file.is_file():
-                        continue
-
-                    tool_id = skill_dir.name
-                    seen_ids.add(tool_id)
-                    
-                    # Parse frontmatter for dependencies
-                    metadata = parse_frontmatter(skill_file)
-                    
-                    tools[category].append({
-                        'id': tool_id,
-                        'author': scope,
-                        'file': str(skill_file.relative_to(repo_root)),
-                        'requires_extras': metadata.get('requires_extras', []),
-                        'requires_scripts': metadata.get('requires_scripts', [])
-                    })
+                skills = [e for e in entries if e.kind == "skill" and e.main is not None]
+                seen_ids = {e.id for e in skills}
+                tools[category].extend(tool(e) for e in skills)
 
                 # Back-compat: legacy flat skills in library/{author}/skills/{id}.md
-                for file_path in sorted(lib_path.glob("*")):
-                    if (
-                        file_path.is_file()
-                        and not file_path.name.startswith('.')
-                        and not file_path.name.startswith('_')
-                        and file_path.name != '.gitkeep'
-                    ):
-                        tool_id = file_path.stem
-                        if tool_id in seen_ids:
-                            continue
-                        
-                        # Parse frontmatter for dependencies
-                        metadata = parse_frontmatter(file_path)
-                        
-                        tools[category].append({
-                            'id': tool_id,
-                            'author': scope,
-                            'file': str(file_path.relative_to(repo_root)),
-                            'requires_extras': metadata.get('requires_extras', []),
-                            'requires_scripts': metadata.get('requires_scripts', [])
-                        })
+                tools[category].extend(
+                    tool(e) for e in entries if e.kind == "legacy-skill" and e.id not in seen_ids
+                )
             else:
-                # Find all files (excluding hidden and .gitkeep)
-                for file_path in sorted(lib_path.glob("*")):
-                    if (
-                        file_path.is_file()
-                        and not file_path.name.startswith('.')
-                        and not file_path.name.startswith('_')
-                        and file_path.name != '.gitkeep'
-                    ):
-                        tool_id = file_path.stem  # filename without extension
-                        
-                        # Parse frontmatter for dependencies
-                        metadata = parse_frontmatter(file_path)
-                        
-                        tools[category].append({
-                            'id': tool_id,
-                            'author': scope,
-                            'file': str(file_path.relative_to(repo_root)),
-                            'requires_extras': metadata.get('requires_extras', []),
-                            'requires_scripts': metadata.get('requires_scripts', [])
-                        })
+                tools[category].extend(tool(e) for e in entries if e.kind == "file")
 
     # Match README catalogue grouping for extras: -cli, then -gui, then other.
     def _extras_sort_key(tool):
@@ -151,18 +96,15 @@ def find_tools_in_library(repo_root):
     
     return tools
 
-def load_profile(profile_path, repo_root):
+def load_profile(profile_path, categories):
     """Load existing profile and extract enabled states"""
     if not profile_path.exists():
         return {}
 
-    with open(profile_path, 'r') as f:
-        profile = yaml.safe_load(f) or {}
+    with devkit_trace.phase("yaml-load"):
+        profile = devkit_yaml_cache.load_yaml(profile_path) or {}
 
     # Build map of tool_id -> enabled state for each category
-    schema = load_schema(repo_root)
-    categories = [c for c in schema["categories"].keys() if c != "scripts"]
-
     enabled_states = {}
     for category in categories:
         enabled_states[category] = {}
@@ -173,11 +115,8 @@ def load_profile(profile_path, repo_root):
 
     return enabled_states
 
-def write_profile(profile_path, profile_name, library_tools, existing_enabled, repo_root):
-    """Write updated profile preserving enabled states"""
-
-    schema = load_schema(repo_root)
-    categories = [c for c in schema["categories"].keys() if c != "scripts"]
+def render_profile(profile_name, library_tools, existing_enabled, categories):
+    """Profile text preserving enabled states"""
 
     lines = []
     lines.append(f"# {profile_name}'s DevKit Profile")
@@ -234,43 +173,109 @@ def write_profile(profile_path, profile_name, library_tools, existing_enabled, r
                 lines.append("")
         
         lines.append("")
-    
-    with open(profile_path, 'w') as f:
-        f.write('\n'.join(lines))
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: update-profile.sh <profile-name>")
-        print("Example: update-profile.sh xapids")
-        sys.exit(1)
-    
-    profile_name = sys.argv[1]
-    
-    # Get repo root (script is in repo-library/scripts/ subdirectory)
-    script_dir = Path(__file__).parent
-    repo_root = script_dir.parent.parent
-    
-    profile_path = repo_root / "profiles" / f"{profile_name}.yml"
-    
-    if not profile_path.exists():
-        print(f"Error: Profile not found: {profile_path}")
-        sys.exit(1)
-    
+    return '\n'.join(lines)
+
+def read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def write_profile(profile_path, profile_name, library_tools, existing_enabled, categories):
+    """Write updated profile preserving enabled states; returns False when already current.
+
+    Unchanged content is not rewritten, so the file's mtime only moves on real changes.
+    """
+    text = render_profile(profile_name, library_tools, existing_enabled, categories)
+    if read_text(profile_path) == text:
+        return False
+    with devkit_trace.phase("write"), open(profile_path, 'w') as f:
+        f.write(text)
+    return True
+
+def check_profile(profile_path, profile_name, library_tools, categories):
+    """Compare the rendered profile with the file on disk; print a diff when they differ."""
+    existing_enabled = load_profile(profile_path, categories)
+    text = render_profile(profile_name, library_tools, existing_enabled, categories)
+    current = read_text(profile_path) or ""
+    if current == text:
+        print(f"✓ Profile up to date: {profile_path}")
+        return True
+    print(f"❌ Profile out of date: {profile_path}")
+    rel = profile_path.name
+    sys.stdout.writelines(difflib.unified_diff(
+        current.splitlines(keepends=True), text.splitlines(keepends=True),
+        fromfile=f"a/profiles/{rel}", tofile=f"b/profiles/{rel}",
+    ))
+    if not text.endswith("\n"):
+        print()
+    return False
+
+def update_profile(profile_path, profile_name, library_tools, categories):
     print(f"Updating profile: {profile_path}")
-    
-    # Load existing enabled states
-    existing_enabled = load_profile(profile_path, repo_root)
 
-    # Scan library for all available tools
-    library_tools = find_tools_in_library(repo_root)
+    # Load existing enabled states
+    existing_enabled = load_profile(profile_path, categories)
 
     # Write updated profile
-    write_profile(profile_path, profile_name, library_tools, existing_enabled, repo_root)
-    
+    if not write_profile(profile_path, profile_name, library_tools, existing_enabled, categories):
+        print(f"✓ Profile unchanged: {profile_path}")
+        return
+
     print(f"✓ Profile updated: {profile_path}")
     print("  - Preserved all existing enabled/disabled settings")
     print("  - Added new tools with enabled: false")
     print("  - Removed tools no longer in library")
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update a profile with all available tools from library/",
+        usage="update-profile.sh (<profile-name> | --all) [--check] [--timings] [--trace FILE]",
+        epilog="Example: update-profile.sh xapids",
+    )
+    parser.add_argument("profile", nargs="?", help="Profile name (profiles/<name>.yml)")
+    parser.add_argument("--all", action="store_true",
+                        help="Update every schema author's existing profiles/<id>.yml from one library scan")
+    parser.add_argument("--check", action="store_true",
+                        help="Write nothing; print a diff and exit 1 if any profile is out of date")
+    devkit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    if bool(args.profile) == args.all:
+        parser.error("give a profile name or --all")
+    devkit_trace.start("devkit-update-profile.py", args)
+
+    # Get repo root (script is in repo-library/scripts/ subdirectory)
+    script_dir = Path(__file__).parent
+    repo_root = script_dir.parent.parent
+
+    schema = load_schema(repo_root)
+    categories = profile_categories(schema)
+
+    if args.all:
+        # Same rule as the sync adapter's --all-profiles: schema authors with a profile file.
+        names = [a["id"] for a in schema["authors"]]
+        profile_paths = [(n, repo_root / "profiles" / f"{n}.yml") for n in names]
+        profile_paths = [(n, p) for n, p in profile_paths if p.exists()]
+    else:
+        profile_paths = [(args.profile, repo_root / "profiles" / f"{args.profile}.yml")]
+        if not profile_paths[0][1].exists():
+            print(f"Error: Profile not found: {profile_paths[0][1]}")
+            sys.exit(1)
+
+    # Scan library for all available tools (once, shared by every profile)
+    library_tools = find_tools_in_library(repo_root, schema)
+
+    if args.check:
+        results = [check_profile(path, name, library_tools, categories) for name, path in profile_paths]
+        if not all(results):
+            print("Run 'make generate' and commit the changes.")
+            sys.exit(1)
+        return
+
+    for profile_name, profile_path in profile_paths:
+        update_profile(profile_path, profile_name, library_tools, categories)
+
 if __name__ == "__main__":
     main()
@@ -4,173 +4,193 @@ Validate all library files against config/schema.yml rules.
 Exit 0 if valid, exit 1 if errors found.
 """
 
-import os
+import argparse
+import subprocess
 import sys
-import yaml
-import re
 from pathlib import Path
 
+import devkit_trace
+import devkit_yaml_cache
+from devkit_deps import SCRIPT_SUFFIXES, DependencyGraph, label
+from devkit_library_index import SKILL_CATEGORIES, load_index
+from devkit_probe import parse_timeout
+
 def load_schema(repo_root):
     schema_path = repo_root / "config" / "schema.yml"
-    with open(schema_path, 'r') as f:
-        return yaml.safe_load(f)
-
-def parse_frontmatter(file_path):
-    """Extract YAML frontmatter from markdown file"""
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            return yaml.safe_load(match.group(1)) or {}
-        return None  # No frontmatter found
-    except Exception as e:
-        return {'_error': str(e)}
-
-def validate_library(repo_root):
+    with devkit_trace.phase("yaml-load"):
+        return devkit_yaml_cache.load_yaml(schema_path)
+
+def changed_paths(repo_root, ref):
+    """Paths under library/ and config/ that differ from ref (worktree + index + untracked).
+
+    Repo-relative, deletions included. Raises ValueError when git fails (bad ref, no repo).
+    """
+    paths = set()
+    for cmd in (
+        ["git", "diff", "--name-only", "--no-renames", "--relative", "-z", ref, "--", "library", "config"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z", "--", "library", "config"],
+    ):
+        devkit_trace.count("subprocesses")
+        result = subprocess.run(cmd, cwd=repo_root, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ValueError(result.stderr.strip() or f"{' '.join(cmd[:2])} exited {result.returncode}")
+        paths.update(p for p in result.stdout.split("\0") if p)
+    return paths
+
+def validate_library(repo_root, use_cache=True, jobs=1, changed=None):
+    """Errors for the whole library, or with `changed` (repo-relative paths) only the
+    per-file checks of tools touched by those paths; dependency references and examples
+    are always checked library-wide from the index."""
     schema = load_schema(repo_root)
+    # One pass over library/ (cached in .devkit-cache/library-index.json): the checks below
+    # only read index entries, so they are redone cheaply on every run.
+    index = load_index(repo_root, schema, use_cache=use_cache, jobs=jobs)
     errors = []
 
-    authors = [a['id'] for a in schema['authors']]
-    categories = schema['categories']
-
-    def category_path(author, cat_name):
-        if cat_name == "commands":
-            return repo_root / "library" / author / ".commands"
-        return repo_root / "library" / author / cat_name
+    # A tool is touched when its path, or a path inside it (skill folders), changed.
+    touched = None
+    if changed is not None:
+        touched = set(changed)
+        for path in changed:
+            parts = path.split("/")
+            touched.update("/".join(parts[:i]) for i in range(1, len(parts)))
 
-    # Collect all extras and scripts for dependency validation
-    all_extras = set()
-    all_scripts = set()
+    def selected(entry):
+        return touched is None or entry.path.relative_to(repo_root).as_posix() in touched
 
-    for author in authors:
-        extras_path = repo_root / "library" / author / "extras"
-        if extras_path.exists():
-            for f in extras_path.glob("*.md"):
-                all_extras.add(f.stem)
+    categories = schema['categories']
 
-        scripts_path = repo_root / "library" / author / "scripts"
-        if scripts_path.exists():
-            for f in scripts_path.glob("*"):
-                if f.is_file() and f.suffix in ['.py', '.sh']:
-                    all_scripts.add(f.name)
+    # Resolves requires_extras / requires_scripts references (and finds cycles)
+    graph = DependencyGraph(index)
+    # ids present per category (for the example check)
+    present = {cat_name: set() for cat_name in categories}
 
     # Validate each category
     for cat_name, cat_config in categories.items():
-        if cat_name == "scripts":
-            # Validate scripts separately
-            for author in authors:
-                scripts_path = repo_root / "library" / author / "scripts"
-                if not scripts_path.exists():
+        for entry in index.category(cat_name):
+            if cat_name == "scripts":
+                if entry.path.suffix not in SCRIPT_SUFFIXES:
+                    continue
+                present[cat_name].add(entry.id)
+                if selected(entry):
+                    errors.extend(validate_script(entry))
+            elif cat_name in SKILL_CATEGORIES:
+                if entry.kind != "skill":
                     continue
-                for script in scripts_path.glob("*"):
-                    if not script.is_file() or script.suffix not in ['.py', '.sh']:
-                        continue
-                    # Check executable
-                    if not os.access(script, os.X_OK):
-                        errors.append(f"{script}: not executable (run chmod +x)")
-                    # Check shebang
-                    with open(script, 'r') as f:
-                        first_line = f.readline().strip()
-                    if not first_line.startswith('#!'):
-                        errors.append(f"{script}: missing shebang line")
-            continue
-
-        for author in authors:
-            if cat_name in ("skills", "skills-user-only"):
-                cat_path = category_path(author, cat_name)
-                if not cat_path.exists():
+                if entry.main is None:
+                    if selected(entry):
+                        errors.append(f"{entry.path}: missing SKILL.md")
                     continue
-                for skill_dir in cat_path.iterdir():
-                    if not skill_dir.is_dir() or skill_dir.name.startswith('.'):
-                        continue
-                    skill_file = skill_dir / "SKILL.md"
-                    if not skill_file.exists():
-                        errors.append(f"{skill_dir}: missing SKILL.md")
-                        continue
+                present[cat_name].add(entry.id)
+                if selected(entry):
                     for subfolder in cat_config.get('required_subfolders', []):
-                        subfolder_path = skill_dir / subfolder
-                        if not subfolder_path.exists() or not subfolder_path.is_dir():
-                            errors.append(f"{skill_dir}: missing required folder '{subfolder}'")
-                    errors.extend(validate_file(skill_file, cat_config, all_extras, all_scripts))
+                        if subfolder not in entry.subdirs:
+                            errors.append(f"{entry.path}: missing required folder '{subfolder}'")
+                errors.extend(validate_file(entry, cat_config, graph, selected(entry)))
             else:
-                cat_path = category_path(author, cat_name)
-                if not cat_path.exists():
+                if entry.path.suffix != '.md':
                     continue
-                for file in cat_path.glob("*.md"):
-                    if file.name.startswith('.') or file.name.startswith('_'):
-                        continue
-                    errors.extend(validate_file(file, cat_config, all_extras, all_scripts))
+                present[cat_name].add(entry.id)
+                errors.extend(validate_file(entry, cat_config, graph, selected(entry)))
 
-    # Validate examples exist
+    # Validate examples exist (from the ids seen above; no extra filesystem checks)
     for cat_name, cat_config in categories.items():
         if 'example' in cat_config:
             example_id = cat_config['example']
-            found = False
-            for author in authors:
-                if cat_name in ("skills", "skills-user-only"):
-                    if (category_path(author, cat_name) / example_id / "SKILL.md").exists():
-                        found = True
-                        break
-                elif cat_name == "scripts":
-                    for ext in ['.py', '.sh']:
-                        if (repo_root / "library" / author / "scripts" / f"{example_id}{ext}").exists():
-                            found = True
-                            break
-                else:
-                    if (category_path(author, cat_name) / f"{example_id}.md").exists():
-                        found = True
-                        break
-            if not found:
+            if example_id not in present[cat_name]:
                 errors.append(f"Example '{example_id}' for category '{cat_name}' not found")
 
+    for cycle in graph.cycles():
+        errors.append(f"dependency cycle: {' <-> '.join(label(key) for key in cycle)}")
+
     return errors
 
-def validate_file(file_path, cat_config, all_extras, all_scripts):
+def validate_script(entry):
     errors = []
+    # Check executable
+    if not entry.executable:
+        errors.append(f"{entry.path}: not executable (run chmod +x)")
+    # Check shebang
+    if not entry.shebang:
+        errors.append(f"{entry.path}: missing shebang line")
+    return errors
 
-    if cat_config.get('requires_frontmatter', False):
-        fm = parse_frontmatter(file_path)
-        if fm is None:
+def validate_file(entry, cat_config, graph, own_checks=True):
+    """Frontmatter checks of one file; own_checks=False keeps only the dependency references."""
+    errors = []
+    if not cat_config.get('requires_frontmatter', False):
+        return errors
+    file_path = entry.main
+    fm = entry.frontmatter
+
+    if fm.error is not None:
+        if own_checks:
+            errors.append(f"{file_path}: frontmatter parse error: {fm.error}")
+        return errors
+    if not fm.found:
+        if own_checks:
             errors.append(f"{file_path}: missing required frontmatter")
-            return errors
-        if '_error' in fm:
-            errors.append(f"{file_path}: frontmatter parse error: {fm['_error']}")
-            return errors
+        return errors
 
+    if own_checks:
         for field in cat_config.get('required_fields', []):
-            if field not in fm or not fm[field]:
+            if field not in fm.data or not fm.data[field]:
                 errors.append(f"{file_path}: missing required field '{field}'")
 
         for field, required_value in cat_config.get('required_values', {}).items():
-            if fm.get(field) != required_value:
+            if fm.data.get(field) != required_value:
                 errors.append(f"{file_path}: field '{field}' must be {required_value}")
 
-        # Validate dependency references
-        if 'requires_extras' in fm:
-            extras = fm['requires_extras']
-            if isinstance(extras, str):
-                extras = re.findall(r'`([^`]+)`', extras)
-            for extra in extras:
-                if extra not in all_extras:
-                    errors.append(f"{file_path}: requires_extras references non-existent '{extra}'")
-
-        if 'requires_scripts' in fm:
-            scripts = fm['requires_scripts']
-            if isinstance(scripts, str):
-                scripts = re.findall(r'`([^`]+)`', scripts)
-            for script in scripts:
-                if script not in all_scripts:
-                    errors.append(f"{file_path}: requires_scripts references non-existent '{script}'")
+        # Probe specs (extras) are read by devkit_probe.py; a bad value would only warn there
+        probe = fm.data.get('probe')
+        if probe is not None and not isinstance(probe, dict):
+            errors.append(f"{file_path}: field 'probe' must be a mapping")
+        elif isinstance(probe, dict) and 'timeout' in probe and parse_timeout(probe['timeout']) is None:
+            errors.append(f"{file_path}: probe timeout must be a positive number of seconds, got {probe['timeout']!r}")
+
+    # Validate dependency references (library-wide: a change may delete what others require)
+    for extra in fm.requires_extras:
+        if graph.resolve_extra(extra) is None:
+            errors.append(f"{file_path}: requires_extras references non-existent '{extra}'")
+    for script in fm.requires_scripts:
+        if graph.resolve_script(script) is None:
+            errors.append(f"{file_path}: requires_scripts references non-existent '{script}'")
 
     return errors
 
 def main():
+    parser = argparse.ArgumentParser(description="Validate library files against config/schema.yml")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-read every file (ignore and do not update .devkit-cache/library-index.json)")
+    parser.add_argument("--jobs", type=devkit_trace.positive_int, default=1,
+                        help="Parse changed files on N worker processes (default: 1); error order is unchanged")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only run per-file checks on tools changed since git REF (worktree, staged and "
+                             "untracked); references and examples are still checked library-wide")
+    devkit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    devkit_trace.start("devkit-validate-library.py", args)
+
     script_dir = Path(__file__).parent
     repo_root = script_dir.parent.parent
 
-    print("Validating library against schema...")
-    errors = validate_library(repo_root)
+    changed = None
+    if args.changed_since:
+        try:
+            changed = changed_paths(repo_root, args.changed_since)
+        except (OSError, ValueError) as e:
+            parser.error(f"--changed-since {args.changed_since}: {e}")
+        if any(p.startswith("config/") for p in changed):
+            # Schema rules changed: every file may now pass or fail differently.
+            print(f"config/ changed since {args.changed_since}; checking every file")
+            changed = None
+
+    if changed is None:
+        print("Validating library against schema...")
+    else:
+        print(f"Validating library against schema ({len(changed)} path(s) changed since {args.changed_since})...")
+    with devkit_trace.phase("validate"):
+        errors = validate_library(repo_root, use_cache=not args.no_cache, jobs=args.jobs, changed=changed)
 
     if errors:
         print(f"\n❌ Validation failed: {len(errors)} error(s)\n")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Dependency graph over `requires_extras` / `requires_scripts`, built from the library index.
+
+Nodes are `(category, author, id)` keys: tools, extras, and scripts (id = file name). Edges
+come from each tool's frontmatter; extras may require other extras or scripts, scripts
+are leaves. Transitive closures are computed once for the whole graph (strongly connected
+components in dependency order), so a closure lookup is a dict access. Cycles are
+reported, not fatal: every member of a cycle requires all the others.
+
+References:
+- extras: `<id>`; first author wins on duplicate ids (sorted paths, like the extras registry).
+- scripts: `<name>` (first schema author that has it) or `<author>/scripts/<name>`.
+
+Used by devkit-validate-library.py (missing references, cycles) and devkit-sync-adapter.py
+(warns about missing references; with --with-deps installs required scripts and reports
+required extras).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from devkit_library_index import IndexEntry, LibraryIndex
+
+SCRIPT_SUFFIXES = (".py", ".sh")
+
+Key = Tuple[str, str, str]  # (category, author, id); scripts use the file name as id
+
+
+def node_key(e: IndexEntry) -> Key:
+    return (e.category, e.author, e.name if e.category == "scripts" else e.id)
+
+
+def label(key: Key) -> str:
+    category, author, tool_id = key
+    if category == "extras":
+        return f"extras:{tool_id}"
+    return f"{category}:{author}/{tool_id}"
+
+
+class DependencyGraph:
+    def __init__(self, index: LibraryIndex) -> None:
+        self.extras: Dict[str, IndexEntry] = {}
+        for e in sorted(index.category("extras"), key=lambda e: e.path):
+            if e.path.suffix == ".md":
+                self.extras.setdefault(e.id, e)
+        self.scripts: Dict[Tuple[str, str], IndexEntry] = {}
+        self._script_names: Dict[str, IndexEntry] = {}
+        for e in index.category("scripts"):
+            if e.path.suffix in SCRIPT_SUFFIXES:
+                self.scripts[(e.author, e.name)] = e
+                self._script_names.setdefault(e.name, e)
+
+        self.edges: Dict[Key, List[Key]] = {}
+        self.missing: Dict[Key, List[Tuple[str, str]]] = {}  # key -> [(field, reference)]
+        for e in index.entries:
+            fm = e.frontmatter
+            if fm is None or fm.error is not None or index.get(e.category, e.author, e.id) is not e:
+                continue  # no frontmatter, or a legacy flat skill shadowed by its folder
+            key = node_key(e)
+            deps: List[Key] = []
+            for field, refs, resolve in (
+                ("requires_extras", fm.requires_extras, self.resolve_extra),
+                ("requires_scripts", fm.requires_scripts, self.resolve_script),
+            ):
+                for ref in refs:
+                    found = resolve(ref)
+                    if found is None:
+                        self.missing.setdefault(key, []).append((field, ref))
+                    elif node_key(found) not in deps:
+                        deps.append(node_key(found))
+            if deps:
+                self.edges[key] = deps
+
+        self._closures: Dict[Key, FrozenSet[Key]] = {}
+        self._cycles: List[List[Key]] = []
+        self._solve()
+
+    def resolve_extra(self, ref: str) -> Optional[IndexEntry]:
+        return self.extras.get(ref)
+
+    def resolve_script(self, ref: str) -> Optional[IndexEntry]:
+        parts = ref.split("/")
+        if len(parts) == 1:
+            return self._script_names.get(ref)
+        if len(parts) == 3 and parts[1] == "scripts":
+            return self.scripts.get((parts[0], parts[2]))
+        return None
+
+    def closure(self, key: Key) -> FrozenSet[Key]:
+        # Everything `key` needs, directly or transitively (never itself).
+        return self._closures.get(key, frozenset())
+
+    def cycles(self) -> List[List[Key]]:
+        # Each cycle once, members sorted; in a stable order.
+        return self._cycles
+
+    def requirements(self, keys: Iterable[Key]) -> Tuple[List[str], List[IndexEntry], List[Tuple[Key, str, str]]]:
+        # For a set of enabled tools: (extra ids, script entries, missing references), each
+        # sorted and deduplicated; missing references include those of transitive deps.
+        needed = set()
+        wanted = list(keys)
+        for key in wanted:
+            needed |= self.closure(key)
+        extras = sorted(k[2] for k in needed if k[0] == "extras")
+        scripts = [self.scripts[(k[1], k[2])] for k in sorted(needed) if k[0] == "scripts"]
+        missing = [
+            (key, field, ref)
+            for key in sorted(set(wanted) | needed)
+            for field, ref in self.missing.get(key, [])
+        ]
+        return extras, scripts, missing
+
+    def _solve(self) -> None:
+        # Tarjan's SCC algorithm (iterative); components come out dependencies-first, so
+        # each closure is built from closures that are already final.
+        index_of: Dict[Key, int] = {}
+        low: Dict[Key, int] = {}
+        stack: List[Key] = []
+        on_stack = set()
+        components: List[List[Key]] = []
+
+        def visit(node: Key) -> None:
+            index_of[node] = low[node] = len(index_of)
+            stack.append(node)
+            on_stack.add(node)
+
+        for root in sorted(self.edges):
+            if root in index_of:
+                continue
+            visit(root)
+            work = [(root, iter(self.edges.get(root, ())))]
+            while work:
+                node, it = work[-1]
+                for nxt in it:
+                    if nxt not in index_of:
+                        visit(nxt)
+                        work.append((nxt, iter(self.edges.get(nxt, ()))))
+                        break
+                    if nxt in on_stack:
+                        low[node] = min(low[node], index_of[nxt])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+
+        for component in components:
+            members = set(component)
+            reach = set()
+            for node in component:
+                for nxt in self.edges.get(node, ()):
+                    if nxt not in members:
+                        reach.add(nxt)
+                        reach |= self._closures.get(nxt, frozenset())
+            cyclic = len(component) > 1 or component[0] in self.edges.get(component[0], ())
+            if cyclic:
+                reach |= members
+                self._cycles.append(sorted(component))
+            for node in component:
+                self._closures[node] = frozenset(reach - {node})
+        self._cycles.sort()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Header-only frontmatter reader shared by the DevKit scripts.
+
+`read_frontmatter(path)` reads a markdown file line by line up to the closing `---` and
+stops there, so a skill with a long body costs one buffered read, not the whole file.
+The header is parsed with the C-accelerated SafeLoader when PyYAML has it, and
+`requires_extras` / `requires_scripts` come back as lists (a string value is read as prose
+with `backticked` names).
+
+Used by devkit_library_index.py (and through it every script that reads library/) and
+devkit_probe.py.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import devkit_trace
+
+
+@dataclass(frozen=True)
+class Frontmatter:
+    found: bool  # file starts with a `---` block closed by `---`
+    data: Dict[str, Any] = field(default_factory=dict)  # {} when missing, empty or invalid
+    error: Optional[str] = None  # unreadable file, YAML error, or a header that is not a mapping
+    requires_extras: List[str] = field(default_factory=list)
+    requires_scripts: List[str] = field(default_factory=list)
+
+
+def dependency_refs(value: Any) -> List[str]:
+    # requires_* may be a list or prose with `backticked` names; an empty key means none.
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return re.findall(r"`([^`]+)`", value)
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+def read_header(path: Path) -> Optional[str]:
+    # Text between the opening and closing `---` lines, or None without frontmatter.
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+        if first.rstrip() != "---" or not first.endswith("\n"):
+            return None
+        lines: List[str] = []
+        for line in f:
+            if line.rstrip() == "---" and line.endswith("\n"):
+                return "".join(lines)
+            lines.append(line)
+    return None
+
+
+def parse_header(text: str) -> Any:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+def read_frontmatter(path: Path) -> Frontmatter:
+    devkit_trace.count("files-scanned")
+    try:
+        header = read_header(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return Frontmatter(found=False, error=str(e))
+    if header is None:
+        return Frontmatter(found=False)
+    try:
+        with devkit_trace.phase("frontmatter-parse"):
+            data = parse_header(header) or {}
+    except ImportError:
+        raise
+    except Exception as e:  # yaml.YAMLError and friends; PyYAML is imported lazily
+        return Frontmatter(found=True, error=str(e))
+    if not isinstance(data, dict):
+        return Frontmatter(found=True, error=f"expected a mapping, got {type(data).__name__}")
+    return Frontmatter(
+        found=True,
+        data=data,
+        requires_extras=dependency_refs(data["requires_extras"]) if "requires_extras" in data else [],
+        requires_scripts=dependency_refs(data["requires_scripts"]) if "requires_scripts" in data else [],
+    )
+
+
+def description(fm: Frontmatter) -> str:
+    # Catalogue text: like yq's `.description // ""` (null/false -> ""), on one line.
+    value = fm.data.get("description")
+    if value is None or value is False:
+        return ""
+    if value is True:
+        return "true"
+    return " ".join(str(value).splitlines())
+
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Single-pass library index shared by the DevKit scripts.
+
+`load_index(repo_root, schema)` lists every `library/<author>/<category>/` dir once and
+returns one `IndexEntry` per tool: id, author, category, path, stat fingerprint and the
+parsed frontmatter (scripts: executable bit + shebang instead). The skip rules live here:
+names starting with `.` or `_` are not tools; skill categories hold `<id>/SKILL.md` dirs
+plus legacy flat `<id>.md` files.
+
+Kept in `.devkit-cache/library-index.json` and updated incrementally:
+- a directory whose mtime is unchanged reuses its cached listing (no readdir);
+- a file whose (mtime, size, mode) is unchanged reuses its cached facts (no read);
+- a file whose mtime alone changed (touch, checkout) is hashed; a matching sha256 reuses
+  its cached facts (no parse) and refreshes the stamp;
+- dirs/files modified within the last 2 seconds are not cached, so an edit racing a scan
+  within the same mtime tick is picked up on the next run;
+- frontmatter that JSON cannot hold exactly (dates, non-string keys) is re-read every run.
+
+`load_index(..., tools=keys)` indexes only those `(category, author, id)` tools plus every
+extra and script (what dependency closures can reach); the cache keeps the other entries.
+
+Used by:
+- devkit-validate-library.py, devkit-update-profile.py, devkit-sync-adapter.py (import)
+- devkit-gen-catalogue.sh -> `python3 devkit_library_index.py catalogue`
+  (prints `category|id|author|relpath|description` per tool)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import devkit_trace
+from devkit_frontmatter import Frontmatter, description, read_frontmatter
+from devkit_yaml_cache import json_exact, store_json
+
+INDEX_VERSION = 2  # 2: empty requires_* keys are [] (was ["None"])
+SKILL_CATEGORIES = ("skills", "skills-user-only")
+RACY_NS = 2_000_000_000  # entries younger than this are not cached
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    category: str
+    author: str
+    id: str
+    kind: str  # "file", "skill" (folder) or "legacy-skill" (flat file in a skills dir)
+    path: Path  # the tool: file or skill folder
+    main: Optional[Path]  # file with the frontmatter (skill: SKILL.md, None when missing)
+    fingerprint: Optional[Tuple[int, int, int]]  # (mtime_ns, size, mode) of main
+    frontmatter: Optional[Frontmatter] = None  # not for scripts
+    executable: bool = False  # scripts only
+    shebang: bool = False  # scripts only
+    subdirs: Tuple[str, ...] = ()  # skill folders: names of subdirectories
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+class LibraryIndex:
+    def __init__(self, root: Path, entries: List[IndexEntry]) -> None:
+        self.root = root
+        self.entries = entries
+        self._by_key: Dict[Tuple[str, str, str], IndexEntry] = {}
+        self._by_path: Dict[Path, IndexEntry] = {}
+        for e in entries:
+            self._by_key.setdefault((e.category, e.author, e.id), e)
+            self._by_path[e.path] = e
+
+    def category(self, category: str, author: Optional[str] = None) -> List[IndexEntry]:
+        # Schema author order, then sorted by name within each author.
+        return [e for e in self.entries if e.category == category and (author is None or e.author == author)]
+
+    def get(self, category: str, author: str, tool_id: str) -> Optional[IndexEntry]:
+        # A skill folder wins over a legacy flat file with the same id ("x" < "x.md").
+        return self._by_key.get((category, author, tool_id))
+
+    def at(self, path: Path) -> Optional[IndexEntry]:
+        # The tool whose file or skill folder is exactly `path`.
+        return self._by_path.get(path)
+
+
+def category_dir(repo_root: Path, author: str, category: str) -> Path:
+    if category == "commands":
+        return repo_root / "library" / author / ".commands"
+    return repo_root / "library" / author / category
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def same_content(cached: Dict[str, Any], fingerprint: Tuple[int, int, int], path: Path) -> bool:
+    # Stamp miss, same bytes (touch, checkout, copy): hashing is far cheaper than a YAML
+    # parse. The mode must still match, since scripts' facts include the executable bit.
+    stamp = cached.get("stamp")
+    digest = cached.get("sha256")
+    if not isinstance(stamp, list) or len(stamp) != 3 or stamp[1:] != list(fingerprint[1:]) or not digest:
+        return False
+    return file_sha256(path) == digest
+
+
+def scan_file(task: Tuple[str, str]) -> Dict[str, Any]:
+    # Facts for one file plus its "sha256" (top-level so it pickles for the process pool).
+    kind, name = task
+    path = Path(name)
+    if kind == "script":
+        try:
+            with open(path, "rb") as f:
+                shebang = f.readline().strip().startswith(b"#!")
+        except OSError:
+            shebang = False
+        return {"executable": os.access(path, os.X_OK), "shebang": shebang, "sha256": file_sha256(path)}
+    fm = read_frontmatter(path)
+    return {
+        "found": fm.found,
+        "data": fm.data,
+        "error": fm.error,
+        "requires_extras": fm.requires_extras,
+        "requires_scripts": fm.requires_scripts,
+        "sha256": file_sha256(path),
+    }
+
+
+def scan_all(tasks: List[Tuple[str, str]], jobs: int) -> List[Dict[str, Any]]:
+    # Results in task order; small batches are not worth a process pool. When tracing, each
+    # worker's phases/counters (frontmatter-parse, files-scanned) travel back with its results.
+    if jobs <= 1 or len(tasks) < 2 * jobs:
+        return [scan_file(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if not devkit_trace.TRACER.enabled:
+            return list(pool.map(scan_file, tasks, chunksize=chunksize))
+        results = []
+        for result, trace in pool.map(devkit_trace.call_traced, [(scan_file, task) for task in tasks], chunksize=chunksize):
+            devkit_trace.merge(trace)
+            results.append(result)
+        return results
+
+
+def _read_cache(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    return data
+
+
+def load_index(
+    repo_root: Path,
+    schema: Dict[str, Any],
+    use_cache: bool = True,
+    jobs: int = 1,
+    tools: Optional[Set[Tuple[str, str, str]]] = None,
+) -> LibraryIndex:
+    cache_path = repo_root / ".devkit-cache" / "library-index.json"
+    old = _read_cache(cache_path) if use_cache else {}
+    old_dirs: Dict[str, Any] = old.get("dirs") or {}
+    old_files: Dict[str, Any] = old.get("files") or {}
+    # A partial index updates the cached entries it visits and keeps the rest.
+    new_dirs: Dict[str, Any] = dict(old_dirs) if tools is not None else {}
+    new_files: Dict[str, Any] = dict(old_files) if tools is not None else {}
+    wanted_dirs = {(author, category) for category, author, _id in tools or ()}
+    racy = time.time_ns() - RACY_NS
+
+    def rel(path: Path) -> str:
+        return path.relative_to(repo_root).as_posix()
+
+    def listing(d: Path) -> Dict[str, str]:
+        # name -> "dir" | "file" | "other" (symlinks followed), {} for a missing dir.
+        try:
+            st = os.stat(d)
+        except OSError:
+            return {}
+        if not stat.S_ISDIR(st.st_mode):
+            return {}
+        key = rel(d)
+        cached = old_dirs.get(key)
+        if cached is not None and cached.get("mtime") == st.st_mtime_ns:
+            devkit_trace.count("index-dir-hits")
+            names = cached["names"]
+        else:
+            devkit_trace.count("index-dir-scans")
+            names = {}
+            with os.scandir(d) as it:
+                for de in it:
+                    try:
+                        names[de.name] = "dir" if de.is_dir() else "file" if de.is_file() else "other"
+                    except OSError:
+                        names[de.name] = "other"
+        if st.st_mtime_ns < racy:
+            new_dirs[key] = {"mtime": st.st_mtime_ns, "names": names}
+        else:
+            new_dirs.pop(key, None)
+        return names
+
+    # (entry fields, facts key) in walk order; facts filled from the cache or scan_all.
+    found: List[Tuple[Dict[str, Any], Optional[str]]] = []
+    facts: Dict[str, Dict[str, Any]] = {}
+    pending: List[Tuple[str, Tuple[int, int, int], Tuple[str, str]]] = []
+
+    def add(fields: Dict[str, Any], main: Optional[Path], scan_kind: str) -> None:
+        fingerprint = None
+        key = None
+        if main is not None:
+            try:
+                st = os.stat(main)
+            except OSError:
+                main = None
+            else:
+                fingerprint = (st.st_mtime_ns, st.st_size, st.st_mode)
+                key = rel(main)
+                cached = old_files.get(key)
+                if cached is not None and cached.get("kind") != scan_kind:
+                    cached = None
+                if cached is not None and cached.get("stamp") == list(fingerprint):
+                    devkit_trace.count("index-file-hits")
+                    facts[key] = cached["facts"]
+                    if fingerprint[0] < racy:
+                        new_files[key] = cached
+                    else:
+                        new_files.pop(key, None)
+                elif cached is not None and same_content(cached, fingerprint, main):
+                    devkit_trace.count("index-file-hash-hits")
+                    facts[key] = cached["facts"]
+                    # A racy file keeps its old stamp: only the hash can vouch for it.
+                    new_files[key] = dict(cached, stamp=list(fingerprint)) if fingerprint[0] < racy else cached
+                else:
+                    pending.append((key, fingerprint, (scan_kind, str(main))))
+        fields.update(main=main, fingerprint=fingerprint)
+        found.append((fields, key))
+
+    with devkit_trace.phase("library-scan"):
+        for author in [a["id"] for a in schema["authors"]]:
+            for category in schema["categories"]:
+                every = tools is None or category in ("extras", "scripts")
+                if not every and (author, category) not in wanted_dirs:
+                    continue
+                d = category_dir(repo_root, author, category)
+                names = listing(d)
+                scan_kind = "script" if category == "scripts" else "frontmatter"
+                for name in sorted(names):
+                    if name.startswith((".", "_")):
+                        continue
+                    kind = names[name]
+                    if not every and (category, author, name if kind == "dir" else Path(name).stem) not in tools:
+                        continue
+                    path = d / name
+                    base = {"category": category, "author": author, "path": path}
+                    if category in SKILL_CATEGORIES and kind == "dir":
+                        sub = listing(path)
+                        main = path / "SKILL.md" if sub.get("SKILL.md") == "file" else None
+                        subdirs = tuple(sorted(n for n, k in sub.items() if k == "dir"))
+                        add(dict(base, id=name, kind="skill", subdirs=subdirs), main, scan_kind)
+                    elif kind == "file":
+                        entry_kind = "legacy-skill" if category in SKILL_CATEGORIES else "file"
+                        add(dict(base, id=Path(name).stem, kind=entry_kind), path, scan_kind)
+
+    if pending:
+        devkit_trace.count("index-file-scans", len(pending))
+        with devkit_trace.phase("index-parse"):
+            results = scan_all([task for _key, _fp, task in pending], jobs)
+        for (key, fingerprint, task), result in zip(pending, results):
+            digest = result.pop("sha256")
+            facts[key] = result
+            if fingerprint[0] < racy and json_exact(result):
+                new_files[key] = {"stamp": list(fingerprint), "kind": task[0], "sha256": digest, "facts": result}
+            else:
+                new_files.pop(key, None)
+
+    entries = []
+    for fields, key in found:
+        result = facts.get(key) if key is not None else None
+        if result is not None and "executable" in result:
+            fields.update(executable=result["executable"], shebang=result["shebang"])
+        elif result is not None:
+            fields["frontmatter"] = Frontmatter(
+                found=result["found"],
+                data=result["data"],
+                error=result["error"],
+                requires_extras=result["requires_extras"],
+                requires_scripts=result["requires_scripts"],
+            )
+        entries.append(IndexEntry(**fields))
+
+    if use_cache and (new_dirs != old_dirs or new_files != old_files):
+        store_json(cache_path, {"version": INDEX_VERSION, "dirs": new_dirs, "files": new_files})
+    return LibraryIndex(repo_root, entries)
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    import devkit_yaml_cache
+
+    parser = argparse.ArgumentParser(description="DevKit library index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("catalogue", help="Print category|id|author|relpath|description per tool (no scripts)")
+    args = parser.parse_args(argv)
+
+    repo_root = Path(__file__).resolve().parent.parent.parent
+    schema = devkit_yaml_cache.load_yaml(repo_root / "config" / "schema.yml")
+    index = load_index(repo_root, schema)
+    out = []
+    if args.command == "catalogue":
+        for e in index.entries:
+            # Catalogue lists skill folders with a SKILL.md and every file elsewhere.
+            if e.category == "scripts" or e.main is None or e.kind == "legacy-skill":
+                continue
+            desc = description(e.frontmatter) if e.frontmatter is not None else ""
+            out.append(f"{e.category}|{e.id}|{e.author}|{e.main.relative_to(repo_root).as_posix()}|{desc}\n")
+    sys.stdout.write("".join(out))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
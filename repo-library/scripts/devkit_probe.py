@@ -0,0 +1,733 @@
+#!/usr/bin/env python3
+"""Concurrent tool probe engine shared by the DevKit scripts.
+
+One table-driven registry, one probe runner:
+- Repo prerequisites (git, gh, python3, pip, pyyaml, yq, rg, ...) live in REPO_TOOLS below.
+- Extras are read from the `probe:` frontmatter of `library/*/extras/*.md`.
+- Every `which`/version/cask/app check runs concurrently with a per-probe timeout, so the
+  probe phase takes about as long as the slowest probe.
+
+Used by:
+- devkit-check-tools.sh       -> `python3 devkit_probe.py check-tools [--strict]`
+- devkit-install-required.sh  -> `python3 devkit_probe.py install-required`
+- devkit-sync-adapter.py      -> `extras_install_hints()` (enabled extras report)
+
+Pure diagnostics: never installs anything.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
+
+import devkit_trace
+from devkit_frontmatter import Frontmatter, read_frontmatter
+from devkit_library_index import LibraryIndex
+
+DEFAULT_TIMEOUT = 5.0
+EXTRAS_CACHE_TTL = 24 * 60 * 60
+HOMEBREW_SUGGESTION = "(xapids suggestion) install Homebrew: https://brew.sh/"
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    id: str
+    label: str = ""
+    bin: Optional[str] = None  # found when on PATH (unless `check` is set)
+    check: Tuple[str, ...] = ()  # found when this command exits 0
+    version: Tuple[str, ...] = ()  # command whose output contains X.Y.Z
+    min_version: Optional[str] = None
+    mac_app: Optional[str] = None  # GUI: /Applications/<mac_app>.app
+    brew: Optional[str] = None  # formula: brew install/upgrade <brew>
+    brew_cask: Optional[str] = None  # cask: brew install --cask <brew_cask>
+    brew_note: str = ""  # appended to the brew hint, e.g. "(if published)"
+    macos_steps: Tuple[str, ...] = ()  # extra macOS steps after the brew hint
+    url: Optional[str] = None
+    timeout: float = DEFAULT_TIMEOUT
+    # Repo prerequisites only (devkit-check-tools.sh / devkit-install-required.sh).
+    tier: Optional[str] = None  # "required" | "optional"
+    install_required: bool = False
+    hints: Dict[str, str] = field(default_factory=dict)  # one-line hint per OS
+    install: Dict[str, Tuple[str, ...]] = field(default_factory=dict)  # commands per OS
+    upgrade: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    @property
+    def title(self) -> str:
+        return self.label or self.id
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    id: str
+    found: bool
+    path: Optional[str] = None
+    version: Optional[Tuple[int, int, int]] = None
+    outdated: bool = False
+    timed_out: bool = False
+
+    @property
+    def version_str(self) -> str:
+        return ".".join(str(n) for n in self.version) if self.version else ""
+
+
+def _apt(*packages: str) -> Tuple[str, ...]:
+    return ("sudo apt-get update", "sudo apt-get install -y " + " ".join(packages))
+
+
+_PY_VERSION = 'import sys; print("%d.%d.%d" % sys.version_info[:3])'
+
+# Repo prerequisites. Order is output order; tier drives devkit-check-tools.sh,
+# install_required drives devkit-install-required.sh.
+REPO_TOOLS: List[ToolSpec] = [
+    ToolSpec(
+        id="git",
+        bin="git",
+        version=("git", "--version"),
+        min_version="2.30.0",
+        tier="required",
+        install_required=True,
+        hints={
+            "Darwin": "xcode-select --install",
+            "Linux": "sudo apt-get update && sudo apt-get install -y git",
+            "other": "https://git-scm.com/downloads",
+        },
+        install={"Darwin": ("xcode-select --install", "# or: brew install git"), "Linux": _apt("git"), "other": ("https://git-scm.com/downloads",)},
+        upgrade={"Darwin": ("brew upgrade git",), "Linux": _apt("git"), "other": ("https://git-scm.com/downloads",)},
+    ),
+    ToolSpec(
+        id="gh",
+        bin="gh",
+        tier="required",
+        install_required=True,
+        hints={
+            "Darwin": "brew install gh",
+            "Linux": "sudo apt-get update && sudo apt-get install -y gh",
+            "other": "https://cli.github.com/",
+        },
+        install={
+            "Darwin": ("brew install gh",),
+            "Linux": _apt("gh") + ("# or: https://cli.github.com/",),
+            "other": ("https://cli.github.com/",),
+        },
+    ),
+    ToolSpec(
+        id="python3",
+        bin="python3",
+        version=("python3", "-c", _PY_VERSION),
+        min_version="3.9.0",
+        tier="required",
+        install_required=True,
+        hints={
+            "Darwin": "brew install python",
+            "Linux": "sudo apt-get update && sudo apt-get install -y python3 python3-pip",
+            "other": "https://www.python.org/downloads/",
+        },
+        install={"Darwin": ("brew install python",), "Linux": _apt("python3", "python3-pip"), "other": ("https://www.python.org/downloads/",)},
+        upgrade={"Darwin": ("brew upgrade python",), "Linux": _apt("python3", "python3-pip"), "other": ("https://www.python.org/downloads/",)},
+    ),
+    ToolSpec(
+        id="pip",
+        label="pip (python3 -m pip)",
+        check=("python3", "-m", "pip", "--version"),
+        tier="required",
+        install_required=True,
+        hints={
+            "Darwin": "python3 -m ensurepip --upgrade",
+            "Linux": "sudo apt-get update && sudo apt-get install -y python3-pip",
+            "other": "https://pip.pypa.io/en/stable/installation/",
+        },
+        install={
+            "Darwin": ("python3 -m ensurepip --upgrade",),
+            "Linux": _apt("python3-pip"),
+            "other": ("https://pip.pypa.io/en/stable/installation/",),
+        },
+    ),
+    ToolSpec(
+        id="pyyaml",
+        check=("python3", "-c", "import yaml"),
+        version=("python3", "-c", 'import yaml; print(getattr(yaml, "__version__", "0.0.0"))'),
+        min_version="6.0.0",
+        tier="required",
+        install_required=True,
+        hints={
+            "Darwin": "python3 -m pip install --upgrade pyyaml",
+            "Linux": "python3 -m pip install --upgrade pyyaml",
+            "other": "https://pypi.org/project/PyYAML/",
+        },
+        install={os_name: ("python3 -m pip install --upgrade pyyaml",) for os_name in ("Darwin", "Linux", "other")},
+        upgrade={os_name: ("python3 -m pip install --upgrade pyyaml",) for os_name in ("Darwin", "Linux", "other")},
+    ),
+    ToolSpec(
+        id="rg",
+        label="rg (ripgrep)",
+        bin="rg",
+        tier="optional",
+        hints={
+            "Darwin": "brew install ripgrep",
+            "Linux": "sudo apt-get update && sudo apt-get install -y ripgrep",
+            "other": "Install ripgrep: https://github.com/BurntSushi/ripgrep#installation",
+        },
+    ),
+    ToolSpec(
+        id="fzf",
+        bin="fzf",
+        tier="optional",
+        hints={
+            "Darwin": "brew install fzf",
+            "Linux": "sudo apt-get update && sudo apt-get install -y fzf",
+            "other": "Install fzf: https://github.com/junegunn/fzf#installation",
+        },
+    ),
+    ToolSpec(
+        id="bat",
+        bin="bat",
+        tier="optional",
+        hints={
+            "Darwin": "brew install bat",
+            "Linux": "sudo apt-get update && sudo apt-get install -y bat",
+            "other": "Install bat: https://github.com/sharkdp/bat#installation",
+        },
+    ),
+    # yq must be mikefarah/yq, not the Python yq wrapper.
+    ToolSpec(
+        id="yq",
+        bin="yq",
+        tier="optional",
+        install_required=True,
+        hints={
+            "Darwin": "brew install yq",
+            "Linux": "sudo apt-get update && sudo apt-get install -y yq",
+            "other": "Install yq: https://github.com/mikefarah/yq#install",
+        },
+        install={
+            "Darwin": ("brew install yq",),
+            "Linux": ("# See: https://github.com/mikefarah/yq#install",),
+            "other": ("# See: https://github.com/mikefarah/yq#install",),
+        },
+    ),
+    ToolSpec(
+        id="shellcheck",
+        bin="shellcheck",
+        tier="optional",
+        hints={
+            "Darwin": "brew install shellcheck",
+            "Linux": "sudo apt-get update && sudo apt-get install -y shellcheck",
+            "other": "Install shellcheck: https://www.shellcheck.net/",
+        },
+    ),
+    ToolSpec(
+        id="shfmt",
+        bin="shfmt",
+        tier="optional",
+        hints={
+            "Darwin": "brew install shfmt",
+            "Linux": "sudo apt-get update && sudo apt-get install -y shfmt",
+            "other": "Install shfmt: https://github.com/mvdan/sh#shfmt",
+        },
+    ),
+    ToolSpec(
+        id="claude",
+        label="claude (Claude Code CLI)",
+        bin="claude",
+        tier="optional",
+        hints={os_name: "Install Claude Code: https://code.claude.com/" for os_name in ("Darwin", "Linux", "other")},
+    ),
+    ToolSpec(
+        id="opencode",
+        bin="opencode",
+        tier="optional",
+        hints={os_name: "Install Opencode: https://opencode.ai/" for os_name in ("Darwin", "Linux", "other")},
+    ),
+]
+
+
+def os_key(sysname: str) -> str:
+    return sysname if sysname in ("Darwin", "Linux") else "other"
+
+
+def parse_semver(text: str) -> Optional[Tuple[int, int, int]]:
+    m = re.search(r"(\d+)\.(\d+)\.(\d+)", text)
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2)), int(m.group(3))
+
+
+# ---------------------------------------------------------------------------
+# Extras registry (library/*/extras/*.md frontmatter `probe:`)
+# ---------------------------------------------------------------------------
+
+
+def _str_tuple(value: Any) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        return tuple(value.split())
+    if isinstance(value, list):
+        return tuple(str(v) for v in value)
+    return ()
+
+
+def parse_timeout(value: Any) -> Optional[float]:
+    # A positive, finite number of seconds; None for anything else ("5s", lists, booleans).
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value) or value <= 0:
+        return None
+    return float(value)
+
+
+def spec_from_frontmatter(tool_id: str, probe: Dict[str, Any]) -> ToolSpec:
+    timeout = DEFAULT_TIMEOUT
+    if "timeout" in probe:
+        parsed = parse_timeout(probe["timeout"])
+        if parsed is None:
+            print(
+                f"Warning: extras:{tool_id}: probe timeout {probe['timeout']!r} is not a positive number of seconds; "
+                f"using {DEFAULT_TIMEOUT:g}",
+                file=sys.stderr,
+            )
+        else:
+            timeout = parsed
+    return ToolSpec(
+        id=tool_id,
+        bin=probe.get("bin"),
+        check=_str_tuple(probe.get("check")),
+        version=_str_tuple(probe.get("version")),
+        min_version=str(probe["min_version"]) if probe.get("min_version") is not None else None,
+        mac_app=probe.get("mac_app"),
+        brew=probe.get("brew"),
+        brew_cask=probe.get("brew_cask"),
+        brew_note=probe.get("brew_note", "") or "",
+        macos_steps=tuple(str(step) for step in probe.get("macos_steps") or []),
+        url=probe.get("url"),
+        timeout=timeout,
+    )
+
+
+def spec_to_dict(spec: ToolSpec) -> Dict[str, Any]:
+    # JSON-safe form for sync bundles (tuples become lists); spec_from_dict() restores it.
+    return asdict(spec)
+
+
+def spec_from_dict(data: Dict[str, Any]) -> ToolSpec:
+    known = {f.name for f in fields(ToolSpec)}
+    values = {k: v for k, v in data.items() if k in known}
+    for key in ("check", "version", "macos_steps"):
+        if key in values:
+            values[key] = tuple(values[key])
+    for key in ("install", "upgrade"):
+        if key in values:
+            values[key] = {os_name: tuple(cmd) for os_name, cmd in values[key].items()}
+    return ToolSpec(**values)
+
+
+def load_extras_registry(library_root: Path, index: Optional[LibraryIndex] = None) -> Dict[str, ToolSpec]:
+    # First author (sorted path) wins on duplicate ids, with or without a probe (as in the
+    # dependency graph); extras without `probe:` are "unknown". Only needs PyYAML for
+    # extras; check-tools/install-required never get here. With a library index the
+    # frontmatter comes from there (parsed once, cached on disk).
+    registry: Dict[str, ToolSpec] = {}
+    seen: Set[str] = set()
+
+    def add(tool_id: str, fm: Optional[Frontmatter]) -> None:
+        if tool_id in seen:
+            return
+        seen.add(tool_id)
+        probe = fm.data.get("probe") if fm is not None else None
+        if isinstance(probe, dict):
+            registry[tool_id] = spec_from_frontmatter(tool_id, probe)
+
+    if index is not None:
+        for e in sorted(index.category("extras"), key=lambda e: e.path):
+            if e.path.suffix == ".md":
+                add(e.id, e.frontmatter)
+        return registry
+    for md in sorted(library_root.glob("*/extras/*.md")):
+        if not md.name.startswith((".", "_")):
+            add(md.stem, read_frontmatter(md))
+    return registry
+
+
+# ---------------------------------------------------------------------------
+# Probe cache
+# ---------------------------------------------------------------------------
+
+
+class ProbeCache:
+    # On-disk memo of probe results (version output, cask/app checks). Keys embed the
+    # resolved binary path + its mtime/size (or the app / Caskroom dirs' mtimes), so
+    # upgrading or installing a tool invalidates its entry; everything else expires after
+    # the TTL.
+
+    def __init__(self, path: Path, ttl: float = EXTRAS_CACHE_TTL, refresh: bool = False) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.dirty = False
+        self._entries: Dict[str, Any] = {}
+        if not refresh and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    self._entries = data
+            except (OSError, ValueError):
+                pass
+
+    def binary_key(self, kind: str, argv: Iterable[str]) -> Optional[str]:
+        argv = list(argv)
+        binary = shutil.which(argv[0])
+        if binary is None:
+            return None
+        real = os.path.realpath(binary)
+        try:
+            st = os.stat(real)
+        except OSError:
+            return None
+        return json.dumps([kind, argv, real, st.st_mtime_ns, st.st_size])
+
+    def get(self, key: Optional[str]) -> Any:
+        if key is None:
+            return None
+        hit = self._entries.get(key)
+        if not isinstance(hit, dict) or time.time() - hit.get("at", 0) > self.ttl:
+            return None
+        return hit.get("value")
+
+    def put(self, key: Optional[str], value: Any) -> None:
+        if key is None:
+            return
+        self._entries[key] = {"at": time.time(), "value": value}
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        now = time.time()
+        live = {k: v for k, v in self._entries.items() if isinstance(v, dict) and now - v.get("at", 0) <= self.ttl}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(live, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+# ---------------------------------------------------------------------------
+# Probes
+# ---------------------------------------------------------------------------
+
+
+class ProbeTimeout(Exception):
+    pass
+
+
+def _run(argv: Tuple[str, ...], timeout: float, cache: Optional[ProbeCache], capture: bool) -> Any:
+    # capture=True -> stripped stdout+stderr; False -> exit code. Timeouts are not cached.
+    key = cache.binary_key("output" if capture else "exit", argv) if cache else None
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        return hit
+    devkit_trace.count("subprocesses")
+    try:
+        p = subprocess.run(
+            list(argv),
+            check=False,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.STDOUT if capture else subprocess.DEVNULL,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired as e:
+        raise ProbeTimeout(" ".join(argv)) from e
+    except OSError:
+        return "" if capture else 127
+    value = (p.stdout or "").strip() if capture else p.returncode
+    if cache:
+        cache.put(key, value)
+    return value
+
+
+def _macos_app_exists(app_name: str, cache: Optional[ProbeCache]) -> bool:
+    candidates = [
+        Path("/Applications") / f"{app_name}.app",
+        Path.home() / "Applications" / f"{app_name}.app",
+    ]
+    key = None
+    if cache:
+        # Installing/removing an app bundle bumps its parent dir's mtime.
+        mtimes = [p.parent.stat().st_mtime_ns if p.parent.exists() else None for p in candidates]
+        key = json.dumps(["app", app_name, mtimes])
+        hit = cache.get(key)
+        if hit is not None:
+            return cast(bool, hit)
+    found = any(path.exists() for path in candidates)
+    if cache:
+        cache.put(key, found)
+    return found
+
+
+def _brew_caskroom() -> Optional[Path]:
+    prefix = os.environ.get("HOMEBREW_PREFIX")
+    if not prefix:
+        brew = shutil.which("brew")
+        if brew is None:
+            return None
+        prefix = str(Path(brew).parent.parent)  # <prefix>/bin/brew, not the resolved Homebrew/ checkout
+    return Path(prefix) / "Caskroom"
+
+
+def _brew_cask_installed(cask: str, timeout: float, cache: Optional[ProbeCache]) -> bool:
+    key = None
+    if cache:
+        # Not binary_key: `brew` itself does not change when a cask is installed, but
+        # Caskroom/<cask> is added or removed, which bumps the Caskroom dir's mtime.
+        caskroom = _brew_caskroom()
+        if caskroom is not None:
+            try:
+                mtime: Optional[int] = caskroom.stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            key = json.dumps(["cask", cask, str(caskroom), mtime])
+            hit = cache.get(key)
+            if hit is not None:
+                return cast(bool, hit)
+    found = _run(("brew", "list", "--cask", cask), timeout, None, capture=False) == 0
+    if cache:
+        cache.put(key, found)
+    return found
+
+
+def probe(spec: ToolSpec, sysname: str, have_brew: bool, cache: Optional[ProbeCache] = None) -> ProbeResult:
+    try:
+        path = shutil.which(spec.bin) if spec.bin else None
+        if spec.check:
+            found = _run(spec.check, spec.timeout, cache, capture=False) == 0
+        else:
+            found = path is not None
+        if not found and sysname == "Darwin" and spec.mac_app:
+            found = _macos_app_exists(spec.mac_app, cache) or (
+                have_brew
+                and spec.brew_cask is not None
+                and _brew_cask_installed(spec.brew_cask, max(spec.timeout, 15.0), cache)
+            )
+        version = None
+        outdated = False
+        if found and spec.version:
+            version = parse_semver(cast(str, _run(spec.version, spec.timeout, cache, capture=True)))
+            want = parse_semver(spec.min_version) if spec.min_version else None
+            outdated = bool(version and want and version < want)
+        return ProbeResult(id=spec.id, found=found, path=path, version=version, outdated=outdated)
+    except ProbeTimeout:
+        return ProbeResult(id=spec.id, found=False, timed_out=True)
+
+
+def probe_all(
+    specs: List[ToolSpec],
+    sysname: Optional[str] = None,
+    cache: Optional[ProbeCache] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, ProbeResult]:
+    # All probes run at once (threads: each one waits on a subprocess or a stat).
+    sysname = sysname or platform.system()
+    have_brew = shutil.which("brew") is not None
+    if not specs:
+        return {}
+    with ThreadPoolExecutor(max_workers=workers or min(32, len(specs))) as pool:
+        results = list(pool.map(lambda s: probe(s, sysname, have_brew, cache), specs))
+    return {r.id: r for r in results}
+
+
+# ---------------------------------------------------------------------------
+# Renderers
+# ---------------------------------------------------------------------------
+
+
+def _numbered(steps: List[str]) -> List[str]:
+    return [f"{i}) {step}" for i, step in enumerate(steps, start=1)]
+
+
+def extra_hint_lines(spec: ToolSpec, result: ProbeResult, sysname: str, have_brew: bool) -> List[str]:
+    if result.timed_out:
+        return ["unknown (probe timed out)"]
+    if result.found and not result.outdated:
+        return ["ok"]
+    url = [spec.url] if spec.url else []
+    if spec.brew_cask and not spec.brew:
+        brew_cmd = f"brew install --cask {spec.brew_cask}"
+    elif spec.brew:
+        brew_cmd = f"brew {'upgrade' if result.outdated else 'install'} {spec.brew}"
+    else:
+        brew_cmd = ""
+    if brew_cmd and spec.brew_note:
+        brew_cmd += f" {spec.brew_note}"
+    # Homebrew is only suggested for published formulae; casks and anything "(if published)"
+    # just point at the URL.
+    suggest_brew = bool(spec.brew) and not spec.brew_note
+
+    if result.outdated:
+        head = f"outdated ({result.version_str})"
+        if sysname != "Darwin":
+            return [head]
+        if have_brew:
+            return [head] + _numbered([brew_cmd] + url)
+        return [head] + _numbered(([HOMEBREW_SUGGESTION, brew_cmd] if suggest_brew else []) + url)
+
+    if sysname == "Darwin":
+        if have_brew and brew_cmd:
+            steps = [brew_cmd] + list(spec.macos_steps) + url
+        elif suggest_brew:
+            steps = [HOMEBREW_SUGGESTION, brew_cmd] + list(spec.macos_steps) + url
+        else:
+            steps = url
+    elif spec.mac_app:
+        steps = url  # GUIs: the download page
+    elif sysname == "Linux" or suggest_brew:
+        steps = []  # CLIs: the distro / OS package manager is the install path
+    else:
+        return ["missing"] + url  # bare URL, not a numbered step
+    return ["missing"] + _numbered(steps)
+
+
+def extras_install_hints(
+    extra_ids: List[str],
+    registry: Dict[str, ToolSpec],
+    cache: Optional[ProbeCache] = None,
+    sysname: Optional[str] = None,
+) -> List[str]:
+    # Prints actions; does not install.
+    sysname = sysname or platform.system()
+    have_brew = shutil.which("brew") is not None
+    out: List[str] = []
+
+    def add_block(title: str, lines: List[str]) -> None:
+        out.append(f"extras: {title}")
+        out.extend([f"  {ln}" for ln in lines])
+
+    if sysname == "Darwin" and not have_brew:
+        add_block(
+            "(xapids suggestion) homebrew",
+            [
+                "Install Homebrew first, install everything through homebrew. simplifies management and update processes",
+                "https://brew.sh/",
+            ],
+        )
+
+    specs = [registry[i] for i in extra_ids if i in registry]
+    results = probe_all(specs, sysname, cache)
+    for tool_id in extra_ids:
+        spec = registry.get(tool_id)
+        if spec is None:
+            add_block(tool_id, ["unknown", "1) see library/shared/extras/"])
+            continue
+        add_block(tool_id, extra_hint_lines(spec, results[tool_id], sysname, have_brew))
+    return out
+
+
+def _brew_banner(sysname: str, have_brew: bool) -> List[str]:
+    if sysname != "Darwin":
+        return []
+    if have_brew:
+        return ["", "(xapids suggestion) Install everything through homebrew. simplifies management and update processes", "https://brew.sh/"]
+    return ["", "(xapids suggestion) Install Homebrew first, install everything through homebrew. simplifies management and update processes", "https://brew.sh/"]
+
+
+def render_check_tools(results: Dict[str, ProbeResult], sysname: str, have_brew: bool) -> Tuple[List[str], int]:
+    # Output of devkit-check-tools.sh; returns (lines, missing_required).
+    key = os_key(sysname)
+    prefix = {"Darwin": "macOS: ", "Linux": "Linux: ", "other": ""}[key]
+    lines = _brew_banner(sysname, have_brew)
+    missing_required = 0
+    for tier, header in (("required", "Required"), ("optional", "Optional")):
+        lines += ["", header, "----------------------------------------"]
+        if tier == "optional":
+            lines.append("Optional apps are listed in the catalogue under library/shared/extras/.")
+        for spec in REPO_TOOLS:
+            if spec.tier != tier:
+                continue
+            r = results[spec.id]
+            if r.found:
+                lines.append(f"[ok]  {spec.title}")
+                continue
+            lines.append(f"[miss] {spec.title}" + (" (probe timed out)" if r.timed_out else ""))
+            if spec.hints.get(key):
+                lines.append(f"      {prefix}{spec.hints[key]}")
+            if tier == "required":
+                missing_required += 1
+    lines.append("")
+    if missing_required == 0:
+        lines.append("Check result: OK (required present)")
+    else:
+        lines.append(f"Check result: missing {missing_required} required item(s)")
+    return lines, missing_required
+
+
+def render_install_required(results: Dict[str, ProbeResult], sysname: str, have_brew: bool) -> List[str]:
+    # Output of devkit-install-required.sh.
+    key = os_key(sysname)
+    lines: List[str] = []
+    if sysname == "Darwin":
+        banner = _brew_banner(sysname, have_brew)
+        lines += ["", "(xapids suggestion) homebrew (recommended)"] + [f"  {ln}" for ln in banner[1:]]
+    missing = 0
+    for spec in REPO_TOOLS:
+        if not spec.install_required:
+            continue
+        r = results[spec.id]
+        if r.found and not r.outdated:
+            continue
+        missing += 1
+        if r.found and spec.upgrade:
+            title, cmds = f"{spec.id} (upgrade)", spec.upgrade.get(key, ())
+        else:
+            title, cmds = f"{spec.id} (install)", spec.install.get(key, ())
+        lines += ["", title] + [f"  {c}" for c in cmds]
+    if missing == 0:
+        lines.append("All required dependencies present; nothing to install.")
+    return lines
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DevKit tool probes (diagnostics only; installs nothing)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check-tools", help="Check required/optional CLIs (devkit-check-tools.sh)")
+    check.add_argument("--strict", action="store_true", help="Exit non-zero if required items are missing")
+    install = sub.add_parser("install-required", help="Print install/upgrade commands (devkit-install-required.sh)")
+    extras = sub.add_parser("extras", help="Install status for extras ids")
+    extras.add_argument("ids", nargs="*", help="Extras ids (default: every extra with a probe)")
+    for command in (check, install, extras):
+        devkit_trace.add_arguments(command)
+    args = parser.parse_args(argv)
+    devkit_trace.start(f"devkit_probe.py {args.command}", args)
+
+    sysname = platform.system()
+    have_brew = shutil.which("brew") is not None
+    if args.command == "extras":
+        library = Path(__file__).resolve().parent.parent.parent / "library"
+        registry = load_extras_registry(library)
+        with devkit_trace.phase("extras-probes"):
+            lines = extras_install_hints(args.ids or sorted(registry), registry, sysname=sysname)
+        print("\n".join(lines))
+        return 0
+
+    wanted = [s for s in REPO_TOOLS if (s.tier if args.command == "check-tools" else s.install_required)]
+    with devkit_trace.phase("probes"):
+        results = probe_all(wanted, sysname)
+    if args.command == "check-tools":
+        lines, missing_required = render_check_tools(results, sysname, have_brew)
+        print("\n".join(lines))
+        return 1 if missing_required and args.strict else 0
+    print("\n".join(render_install_required(results, sysname, have_brew)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
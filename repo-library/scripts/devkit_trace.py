@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Phase timings + counters shared by the DevKit entry points.
+
+Every entry point accepts the same two options (and `--jobs N` parses with `positive_int`):
+- `--timings`     print a summary table (phases, counters) to stderr when the script exits.
+- `--trace FILE`  append the same data as JSON lines to FILE; several scripts (e.g. a whole
+                  `make generate`) can share one trace file, rows are tagged with run + script.
+
+Phases record inclusive wall time per name (nested phases overlap); counters record work done
+(files scanned/copied, bytes copied, subprocesses spawned). When neither option is given the
+tracer is disabled and `phase()` / `count()` are near no-ops.
+
+Used by:
+- devkit-sync-adapter.py, devkit-validate-library.py, devkit-update-profile.py (import)
+- devkit-gen-catalogue.sh -> `python3 devkit_trace.py report ...` (events logged by the shell)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.script = ""
+        self.show = False
+        self.trace_file: Optional[Path] = None
+        self.phases: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def configure(self, script: str, show: bool, trace_file: Optional[Path]) -> None:
+        self.script = script
+        self.show = show
+        self.trace_file = trace_file
+        self.enabled = show or trace_file is not None
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - t0)
+
+    def add_phase(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            slot = self.phases.setdefault(name, [0.0, 0])
+            slot[0] += seconds
+            slot[1] += calls
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def take(self) -> Dict[str, Any]:
+        # Everything recorded so far, then start over (worker processes hand this to the parent).
+        with self._lock:
+            data = {"phases": self.phases, "counters": self.counters}
+            self.phases, self.counters = {}, {}
+        return data
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        # Adds a worker's take() to this tracer; phase seconds are summed across workers.
+        for name, (seconds, calls) in data["phases"].items():
+            self.add_phase(name, seconds, int(calls))
+        for name, value in data["counters"].items():
+            self.count(name, value)
+
+    def report(self, total: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False  # report once (atexit after an explicit call)
+        total = time.perf_counter() - self._start if total is None else total
+        if self.show:
+            print("\n".join(render_table(self.script, total, self.phases, self.counters)), file=sys.stderr)
+        if self.trace_file is not None:
+            append_trace(self.trace_file, self.script, total, self.phases, self.counters)
+
+
+def render_table(script: str, total: float, phases: Dict[str, List[float]], counters: Dict[str, int]) -> List[str]:
+    lines = [f"Timings: {script} ({total:.3f}s total)"]
+    if phases:
+        width = max(len("phase"), *(len(n) for n in phases))
+        lines.append(f"  {'phase':<{width}}  {'calls':>7}  {'seconds':>9}  {'%':>5}")
+        for name, (seconds, calls) in sorted(phases.items(), key=lambda kv: -kv[1][0]):
+            share = 100.0 * seconds / total if total > 0 else 0.0
+            lines.append(f"  {name:<{width}}  {int(calls):>7}  {seconds:>9.3f}  {share:>5.1f}")
+    if counters:
+        width = max(len("counter"), *(len(n) for n in counters))
+        lines.append(f"  {'counter':<{width}}  {'value':>7}")
+        for name, value in sorted(counters.items()):
+            lines.append(f"  {name:<{width}}  {value:>7}")
+    return lines
+
+
+def append_trace(
+    path: Path, script: str, total: float, phases: Dict[str, List[float]], counters: Dict[str, int]
+) -> None:
+    run = f"{int(time.time() * 1000)}-{os.getpid()}"
+    base: Dict[str, Any] = {"run": run, "script": script}
+    rows: List[Dict[str, Any]] = []
+    for name, (seconds, calls) in sorted(phases.items()):
+        rows.append({**base, "type": "phase", "phase": name, "seconds": round(seconds, 6), "calls": int(calls)})
+    for name, value in sorted(counters.items()):
+        rows.append({**base, "type": "counter", "counter": name, "value": value})
+    rows.append({**base, "type": "run", "seconds": round(total, 6), "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r, sort_keys=True) + "\n" for r in rows))
+
+
+TRACER = Tracer()
+phase = TRACER.phase
+count = TRACER.count
+merge = TRACER.merge
+
+
+def call_traced(job: Tuple[Callable[[Any], Any], Any]) -> Tuple[Any, Dict[str, Any]]:
+    # Process-pool side of a traced job: runs fn(arg) with tracing on and returns its result
+    # with what it recorded, for merge() in the parent. A worker never reports by itself:
+    # spawned workers were never configured and forked ones do not run atexit handlers.
+    fn, arg = job
+    TRACER.enabled = True
+    TRACER.take()  # drop anything inherited from a forked parent
+    result = fn(arg)
+    return result, TRACER.take()
+
+
+def add_arguments(parser: Any) -> None:
+    parser.add_argument("--timings", action="store_true", help="Print per-phase wall time + counters to stderr on exit")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="Append phase/counter results to FILE as JSON lines")
+
+
+def positive_int(value: str) -> int:
+    # argparse type for the entry points' `--jobs N`.
+    import argparse
+
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError("must be >= 1")
+    return n
+
+
+def start(script: str, args: Any) -> None:
+    # Call right after argument parsing; the report is emitted at interpreter exit
+    # (including SystemExit from an abort), so callers need no extra plumbing.
+    trace_file = Path(args.trace).expanduser() if args.trace else None
+    TRACER.configure(script, args.timings, trace_file)
+    if TRACER.enabled:
+        atexit.register(TRACER.report)
+
+
+def main(argv: List[str]) -> int:
+    # Shell entry points log "phase <name> <seconds>" / "count <name> <n>" lines to a file
+    # and hand it to `report` on exit, so both languages share one output format.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DevKit timings/trace formatter")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Aggregate an event log written by a shell script")
+    report.add_argument("events", help="Event log file")
+    report.add_argument("--script", required=True, help="Script name for the report")
+    report.add_argument("--seconds", type=float, required=True, help="Total wall time")
+    add_arguments(report)
+    args = parser.parse_args(argv)
+
+    tracer = Tracer()
+    tracer.configure(args.script, args.timings, Path(args.trace).expanduser() if args.trace else None)
+    for line in Path(args.events).read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if len(parts) != 3:
+            continue
+        kind, name, value = parts
+        try:
+            if kind == "phase":
+                tracer.add_phase(name, float(value))
+            elif kind == "count":
+                tracer.count(name, int(value))
+        except ValueError:
+            continue
+    tracer.report(args.seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
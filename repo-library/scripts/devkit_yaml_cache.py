@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Parsed-YAML cache shared by the DevKit scripts (schema, profiles).
+
+`load_yaml(path)` returns the same value as `yaml.safe_load(path.read_text())`, but keeps
+the parsed document in `.devkit-cache/yaml/<sha1 of path>.json`:
+- Hit on matching (mtime_ns, size) without reading the source; on a stat mismatch the
+  source is hashed and a matching sha256 is still a hit (touch, checkout, copy).
+- PyYAML is imported only on a miss (C loader when available).
+- Documents that JSON cannot represent exactly (non-string keys, dates, sets) are parsed
+  but never cached.
+- Results are memoized per process too; treat them as read-only.
+
+Used by devkit-sync-adapter.py, devkit-validate-library.py, devkit-update-profile.py;
+devkit_library_index.py shares `json_exact` and `store_json`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import devkit_trace
+
+CACHE_VERSION = 1
+
+_memo: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+
+def default_cache_dir() -> Path:
+    return Path(__file__).resolve().parent.parent.parent / ".devkit-cache" / "yaml"
+
+
+def json_exact(value: Any) -> bool:
+    # True when a JSON round trip returns an equal value of the same types.
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(json_exact(v) for v in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and json_exact(v) for k, v in value.items())
+    return False
+
+
+def parse_yaml(text: str) -> Any:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+def load_yaml(path: Path, cache_dir: Optional[Path] = None) -> Any:
+    # Raises OSError for unreadable files, ImportError when PyYAML is needed but missing,
+    # and yaml.YAMLError for invalid documents (never cached).
+    path = Path(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    memo = _memo.get(path)
+    if memo is not None and memo[0] == stamp:
+        return memo[1]
+
+    cache_file = (cache_dir or default_cache_dir()) / (hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest() + ".json")
+    entry: Any = None
+    try:
+        entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        entry = None
+
+    if entry is not None and entry.get("stamp") == list(stamp):
+        devkit_trace.count("yaml-cache-hits")
+        _memo[path] = (stamp, entry["data"])
+        return entry["data"]
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if entry is not None and entry.get("sha256") == digest:
+        devkit_trace.count("yaml-cache-hits")
+        data = entry["data"]
+    else:
+        devkit_trace.count("yaml-cache-misses")
+        data = parse_yaml(raw.decode("utf-8"))
+        if not json_exact(data):
+            _memo[path] = (stamp, data)
+            return data
+    store_json(cache_file, {"version": CACHE_VERSION, "path": str(path), "stamp": list(stamp), "sha256": digest, "data": data})
+    _memo[path] = (stamp, data)
+    return data
+
+
+def store_json(cache_file: Path, entry: Dict[str, Any]) -> None:
+    # Atomic write of a .devkit-cache file (also the library index). Best effort: a
+    # read-only checkout simply runs uncached.
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
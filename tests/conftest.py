@@ -0,0 +1,151 @@
+"""Shared fixtures: the DevKit scripts on sys.path and a throwaway mini repo.
+
+The scripts locate the repo from their own path (`repo-library/scripts/` -> repo root),
+so end-to-end tests copy them into `tmp_path` next to a tiny schema, library and profile.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = REPO_ROOT / "repo-library" / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+SCHEMA = """\
+authors:
+  - id: alice
+categories:
+  agents:
+    file_pattern: "{author}/agents/{id}.md"
+    requires_frontmatter: true
+    required_fields: [description]
+  commands:
+    file_pattern: "{author}/.commands/{id}.md"
+    requires_frontmatter: true
+    required_fields: [description]
+  skills:
+    file_pattern: "{author}/skills/{id}/SKILL.md"
+    requires_frontmatter: true
+    required_fields: [description]
+  extras:
+    file_pattern: "{author}/extras/{id}.md"
+    requires_frontmatter: true
+    required_fields: [description]
+    optional_fields: [probe]
+  scripts:
+    file_patterns:
+      - "{author}/scripts/{id}.py"
+      - "{author}/scripts/{id}.sh"
+    requires_frontmatter: false
+"""
+
+LIBRARY: Dict[str, str] = {
+    "alice/agents/helper.md": "---\ndescription: Helper agent\n---\n\n# Helper\n",
+    "alice/.commands/build.md": "---\ndescription: Build command\n---\n\n# Build\n",
+    "alice/skills/tidy/SKILL.md": "---\ndescription: Tidy skill\n---\n\n# Tidy\n",
+    "alice/skills/tidy/reference/notes.md": "notes\n",
+}
+
+PROFILE = """\
+agents:
+  - {id: helper, author: alice, enabled: true}
+commands:
+  - {id: build, author: alice, enabled: true}
+skills:
+  - {id: tidy, author: alice, enabled: true}
+"""
+
+
+def load_script(name: str) -> ModuleType:
+    # Hyphenated entry points (devkit-sync-adapter.py) cannot be imported by name.
+    path = SCRIPTS / name
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses resolve annotations through sys.modules
+    spec.loader.exec_module(module)
+    return module
+
+
+def backdate(top: Path, seconds: float = 60) -> None:
+    # Out of the library index's racy window (files first, then their dirs).
+    when = time.time() - seconds
+    for dirpath, _dirnames, filenames in os.walk(top, topdown=False):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (when, when))
+        os.utime(dirpath, (when, when))
+
+
+@pytest.fixture(scope="session")
+def sync() -> ModuleType:
+    return load_script("devkit-sync-adapter.py")
+
+
+@pytest.fixture(autouse=True)
+def no_prompt(monkeypatch: pytest.MonkeyPatch) -> None:
+    # prompt_and_abort waits for Enter; under pytest that read must end like a closed stdin.
+    def eof(*_args: object) -> str:
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", eof)
+
+
+@pytest.fixture
+def mini_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    scripts = repo / "repo-library" / "scripts"
+    scripts.mkdir(parents=True)
+    for f in SCRIPTS.iterdir():
+        if f.is_file() and f.name.startswith("devkit") and f.suffix in (".py", ".sh"):
+            shutil.copy2(f, scripts / f.name)
+    (repo / "config").mkdir()
+    (repo / "config" / "schema.yml").write_text(SCHEMA, encoding="utf-8")
+    for rel, text in LIBRARY.items():
+        path = repo / "library" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    (repo / "profiles").mkdir()
+    (repo / "profiles" / "alice.yml").write_text(PROFILE, encoding="utf-8")
+    backdate(repo / "library")
+    return repo
+
+
+def run_script(repo: Path, script: str, *args: str) -> subprocess.CompletedProcess:
+    # Any script of the copied repo, from the repo root, never reading the real $HOME.
+    argv = [sys.executable, str(repo / "repo-library" / "scripts" / script), *args]
+    env = dict(os.environ, HOME=str(repo.parent / "home"), PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run(argv, cwd=repo, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+
+
+def run_sync(repo: Path, *args: str) -> subprocess.CompletedProcess:
+    # Targets + state next to the repo, never in the real $HOME.
+    out = repo.parent / "out"
+    roots = [] if "--apply" in args else [
+        "--claude-root",
+        str(out / "claude"),
+        "--opencode-root",
+        str(out / "opencode"),
+        "--state-file",
+        str(out / "state.json"),
+    ]
+    return run_script(repo, "devkit-sync-adapter.py", *args, *roots)
+
+
+def write_extra(repo: Path, author: str, tool_id: str, probe: str = "") -> Path:
+    # library/<author>/extras/<id>.md with the sections the schema requires; `probe` is YAML.
+    path = repo / "library" / author / "extras" / f"{tool_id}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = f"description: {tool_id}\n" + (f"probe:\n{probe}" if probe else "")
+    path.write_text(f"---\n{header}---\n\n## Why you might want it\n\n## Install\n", encoding="utf-8")
+    return path
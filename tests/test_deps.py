@@ -0,0 +1,98 @@
+"""Dependency graph: transitive closures, cycles, missing references; sync --with-deps."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from conftest import run_sync
+from devkit_deps import DependencyGraph
+from devkit_library_index import load_index
+from devkit_yaml_cache import load_yaml
+
+
+def write(repo: Path, files: Dict[str, str]) -> None:
+    for rel, text in files.items():
+        path = repo / "library" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        if rel.endswith(".sh"):
+            path.chmod(0o755)
+
+
+def graph(repo: Path) -> DependencyGraph:
+    return DependencyGraph(load_index(repo, load_yaml(repo / "config" / "schema.yml"), use_cache=False))
+
+
+@pytest.fixture
+def deps_repo(mini_repo: Path) -> Path:
+    # helper -> extra a -> extra b -> script fmt.sh; build -> alice/scripts/lint.sh
+    write(
+        mini_repo,
+        {
+            "alice/agents/helper.md": "---\ndescription: Helper\nrequires_extras: [a]\n---\n",
+            "alice/.commands/build.md": "---\ndescription: Build\nrequires_scripts: Runs `alice/scripts/lint.sh`.\n---\n",
+            "alice/extras/a.md": "---\ndescription: A\nrequires_extras: [b]\n---\n",
+            "alice/extras/b.md": "---\ndescription: B\nrequires_scripts: [fmt.sh]\n---\n",
+            "alice/scripts/fmt.sh": "#!/bin/sh\n",
+            "alice/scripts/lint.sh": "#!/bin/sh\n",
+        },
+    )
+    return mini_repo
+
+
+def test_closures_are_transitive(deps_repo: Path) -> None:
+    g = graph(deps_repo)
+    assert g.closure(("agents", "alice", "helper")) == {
+        ("extras", "alice", "a"),
+        ("extras", "alice", "b"),
+        ("scripts", "alice", "fmt.sh"),
+    }
+    extras, scripts, missing = g.requirements([("agents", "alice", "helper"), ("commands", "alice", "build")])
+    assert extras == ["a", "b"]
+    assert [s.name for s in scripts] == ["fmt.sh", "lint.sh"]
+    assert missing == [] and g.cycles() == []
+
+
+def test_cycles_are_reported_not_fatal(deps_repo: Path) -> None:
+    write(deps_repo, {"alice/extras/b.md": "---\ndescription: B\nrequires_extras: [a]\n---\n"})
+    g = graph(deps_repo)
+    assert g.cycles() == [[("extras", "alice", "a"), ("extras", "alice", "b")]]
+    assert g.closure(("extras", "alice", "a")) == {("extras", "alice", "b")}
+    assert g.closure(("agents", "alice", "helper")) == {("extras", "alice", "a"), ("extras", "alice", "b")}
+
+
+def test_missing_references_include_transitive_ones(deps_repo: Path) -> None:
+    write(deps_repo, {"alice/extras/b.md": "---\ndescription: B\nrequires_scripts: [gone.sh, bob/scripts/x.sh]\n---\n"})
+    _extras, _scripts, missing = graph(deps_repo).requirements([("agents", "alice", "helper")])
+    assert missing == [
+        (("extras", "alice", "b"), "requires_scripts", "gone.sh"),
+        (("extras", "alice", "b"), "requires_scripts", "bob/scripts/x.sh"),
+    ]
+
+
+def test_sync_with_deps_installs_required_scripts(deps_repo: Path, tmp_path: Path) -> None:
+    r = run_sync(deps_repo, "alice", "--with-deps")
+    assert r.returncode == 0, r.stderr
+    for target in ("claude", "opencode"):
+        assert (tmp_path / "out" / target / "scripts" / "fmt.sh").exists()
+        assert (tmp_path / "out" / target / "scripts" / "lint.sh").exists()
+
+    r = run_sync(deps_repo, "alice")  # without --with-deps: nothing added, nothing pruned
+    assert r.returncode == 0, r.stderr
+    assert "scripts" not in r.stdout
+    assert (tmp_path / "out" / "claude" / "scripts" / "fmt.sh").exists()
+
+
+def test_missing_dependency_warns_by_default_and_aborts_with_deps(deps_repo: Path, tmp_path: Path) -> None:
+    (deps_repo / "library" / "alice" / "scripts" / "fmt.sh").unlink()
+    r = run_sync(deps_repo, "alice")
+    assert r.returncode == 0, r.stderr
+    assert "requires_scripts references non-existent 'fmt.sh'" in r.stderr
+    assert not (tmp_path / "out" / "claude" / "scripts").exists()
+
+    r = run_sync(deps_repo, "alice", "--with-deps")
+    assert r.returncode == 1
+    assert "Missing dependency" in r.stderr
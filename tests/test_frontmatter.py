@@ -0,0 +1,45 @@
+"""Shared frontmatter reader: header-only reads and requires_* normalization."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from conftest import run_script
+from devkit_frontmatter import dependency_refs, read_frontmatter
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, []),
+        ([], []),
+        (["git-cli", None], ["git-cli"]),
+        ("Needs `git-cli` and `jq-cli`.", ["git-cli", "jq-cli"]),
+        ("", []),
+    ],
+)
+def test_dependency_refs(value, expected) -> None:
+    assert dependency_refs(value) == expected
+
+
+def test_header_with_a_long_body(tmp_path: Path) -> None:
+    path = tmp_path / "SKILL.md"
+    path.write_text("---\ndescription: Tidy\nrequires_scripts:\n---\n" + "---\nnot: frontmatter\n" * 10_000, encoding="utf-8")
+    fm = read_frontmatter(path)
+    assert fm.error is None and fm.data["description"] == "Tidy"
+    assert fm.requires_scripts == [] and fm.requires_extras == []
+
+
+def test_empty_requires_key_is_no_dependency(mini_repo: Path) -> None:
+    helper = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    helper.write_text("---\ndescription: Helper agent\nrequires_scripts:\nrequires_extras:\n---\n", encoding="utf-8")
+
+    r = run_script(mini_repo, "devkit-validate-library.py")
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert "None" not in r.stdout + r.stderr
+
+    r = run_script(mini_repo, "devkit-update-profile.py", "alice")
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert "None" not in (mini_repo / "profiles" / "alice.yml").read_text(encoding="utf-8")
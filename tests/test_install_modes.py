@@ -0,0 +1,77 @@
+"""--install-mode copy/reflink/hardlink/symlink/auto."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import run_sync
+
+
+def test_symlink_mode_links_files_inside_real_dirs(mini_repo: Path, tmp_path: Path) -> None:
+    r = run_sync(mini_repo, "alice", "--install-mode", "symlink")
+    assert r.returncode == 0, r.stderr
+    agent = tmp_path / "out" / "claude" / "agents" / "helper.md"
+    skill = tmp_path / "out" / "claude" / "skills" / "tidy"
+    assert agent.is_symlink()
+    assert agent.resolve() == (mini_repo / "library" / "alice" / "agents" / "helper.md").resolve()
+    assert skill.is_dir() and not skill.is_symlink()
+    assert (skill / "reference" / "notes.md").is_symlink()
+
+
+def test_hardlink_mode_shares_the_inode(mini_repo: Path, tmp_path: Path) -> None:
+    r = run_sync(mini_repo, "alice", "--install-mode", "hardlink")
+    assert r.returncode == 0, r.stderr
+    src = mini_repo / "library" / "alice" / ".commands" / "build.md"
+    dest = tmp_path / "out" / "opencode" / "commands" / "build.md"
+    assert os.path.samefile(src, dest)
+
+
+def test_auto_mode_writes_independent_copies(mini_repo: Path, tmp_path: Path) -> None:
+    r = run_sync(mini_repo, "alice", "--install-mode", "auto")
+    assert r.returncode == 0, r.stderr
+    src = mini_repo / "library" / "alice" / "skills" / "tidy" / "SKILL.md"
+    dest = tmp_path / "out" / "claude" / "skills" / "tidy" / "SKILL.md"
+    assert not dest.is_symlink() and not os.path.samefile(src, dest)
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_switching_back_to_copy_never_writes_through_a_link(mini_repo: Path, tmp_path: Path) -> None:
+    src = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    before = src.read_text(encoding="utf-8")
+    assert run_sync(mini_repo, "alice", "--install-mode", "symlink").returncode == 0
+
+    r = run_sync(mini_repo, "alice", "--install-mode", "copy")
+    assert r.returncode == 0, r.stderr
+    assert "claude: update agents:helper" in r.stdout  # the recorded mode differs
+    dest = tmp_path / "out" / "claude" / "agents" / "helper.md"
+    assert not dest.is_symlink()
+    dest.write_text("local edit\n", encoding="utf-8")
+    assert src.read_text(encoding="utf-8") == before
+
+
+def test_reflink_mode_aborts_without_cow_support(sync, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src = tmp_path / "src.md"
+    src.write_text("text\n", encoding="utf-8")
+    monkeypatch.setattr(sync, "clone_file", lambda s, d: False)
+    with pytest.raises(SystemExit):
+        sync.install_file(src, tmp_path / "dest.md", "reflink")
+    assert not (tmp_path / "dest.md").exists()
+
+
+def test_reflink_mode_installs_the_clone(sync, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src = tmp_path / "src.md"
+    src.write_text("text\n", encoding="utf-8")
+
+    def clone(s: Path, d: Path) -> bool:
+        shutil.copyfile(s, d)
+        return True
+
+    monkeypatch.setattr(sync, "clone_file", clone)
+    sync.install_file(src, tmp_path / "dest.md", "reflink")
+    assert (tmp_path / "dest.md").read_text(encoding="utf-8") == "text\n"
+    assert sync.files_match(src, tmp_path / "dest.md", "reflink")
+    assert not sync.staging_path(tmp_path / "dest.md").exists()
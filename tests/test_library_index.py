@@ -0,0 +1,153 @@
+"""Library index cache: stat stamps, content hashes, the racy window and directory invalidation."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+import devkit_trace
+from conftest import backdate
+from devkit_library_index import load_index
+
+SCHEMA: Dict[str, Any] = {
+    "authors": [{"id": "alice"}],
+    "categories": {"agents": {}, "commands": {}, "skills": {}},
+}
+
+
+@pytest.fixture
+def counters(monkeypatch: pytest.MonkeyPatch):
+    # Trace counters of the last load, e.g. counters()["index-file-hits"].
+    monkeypatch.setattr(devkit_trace.TRACER, "enabled", True)
+    devkit_trace.TRACER.take()
+
+    def read() -> Dict[str, int]:
+        return devkit_trace.TRACER.take()["counters"]
+
+    yield read
+    devkit_trace.TRACER.take()
+
+
+def cached_files(repo: Path) -> Dict[str, Any]:
+    cache = repo / ".devkit-cache" / "library-index.json"
+    return json.loads(cache.read_text(encoding="utf-8"))["files"]
+
+
+def description(repo: Path, category: str, tool_id: str) -> str:
+    entry = load_index(repo, SCHEMA).get(category, "alice", tool_id)
+    assert entry is not None and entry.frontmatter is not None
+    return entry.frontmatter.data["description"]
+
+
+def test_warm_load_reads_nothing(mini_repo: Path, counters) -> None:
+    load_index(mini_repo, SCHEMA)
+    assert counters()["index-file-scans"] == 3
+    assert sorted(cached_files(mini_repo)) == [
+        "library/alice/.commands/build.md",
+        "library/alice/agents/helper.md",
+        "library/alice/skills/tidy/SKILL.md",
+    ]
+
+    index = load_index(mini_repo, SCHEMA)
+    warm = counters()
+    assert warm["index-file-hits"] == 3
+    assert "index-file-scans" not in warm and "index-dir-scans" not in warm
+    assert index.get("skills", "alice", "tidy").subdirs == ("reference",)
+
+
+def test_changed_file_is_reparsed(mini_repo: Path, counters) -> None:
+    load_index(mini_repo, SCHEMA)
+    helper = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    helper.write_text("---\ndescription: Rewritten\n---\n", encoding="utf-8")
+    backdate(helper.parent, 30)
+    counters()
+
+    assert description(mini_repo, "agents", "helper") == "Rewritten"
+    assert counters()["index-file-scans"] == 1
+
+
+def test_racy_files_are_not_cached(mini_repo: Path, counters) -> None:
+    # Written just now: a same-size edit within the mtime granularity would be invisible
+    # to the stamp, so the entry must be rescanned until it is older than RACY_NS.
+    fresh = mini_repo / "library" / "alice" / "agents" / "fresh.md"
+    fresh.write_text("---\ndescription: One\n---\n", encoding="utf-8")
+    load_index(mini_repo, SCHEMA)
+    assert "library/alice/agents/fresh.md" not in cached_files(mini_repo)
+    counters()
+
+    fresh.write_text("---\ndescription: Two\n---\n", encoding="utf-8")
+    assert description(mini_repo, "agents", "fresh") == "Two"
+    seen = counters()
+    assert seen["index-file-scans"] == 1 and seen["index-dir-scans"] == 1
+
+
+def test_new_file_invalidates_its_directory(mini_repo: Path, counters) -> None:
+    load_index(mini_repo, SCHEMA)
+    commands = mini_repo / "library" / "alice" / ".commands"
+    lint = commands / "lint.md"
+    lint.write_text("---\ndescription: Lint\n---\n", encoding="utf-8")
+    when = time.time() - 30  # build.md keeps its cached stamp
+    os.utime(lint, (when, when))
+    os.utime(commands, (when, when))
+    counters()
+
+    index = load_index(mini_repo, SCHEMA)
+    assert [e.id for e in index.category("commands")] == ["build", "lint"]
+    seen = counters()
+    assert seen["index-dir-scans"] == 1 and seen["index-file-scans"] == 1
+
+
+def test_without_cache_nothing_is_written(mini_repo: Path) -> None:
+    load_index(mini_repo, SCHEMA, use_cache=False)
+    assert not (mini_repo / ".devkit-cache").exists()
+
+
+def test_touched_file_is_a_hash_hit(mini_repo: Path, counters) -> None:
+    # touch / git checkout: new mtime, same bytes -> hashed, not parsed; the stamp is refreshed.
+    load_index(mini_repo, SCHEMA)
+    helper = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    when = time.time() - 30
+    os.utime(helper, (when, when))
+    counters()
+
+    assert description(mini_repo, "agents", "helper") == "Helper agent"
+    seen = counters()
+    assert seen["index-file-hash-hits"] == 1 and "index-file-scans" not in seen
+    assert cached_files(mini_repo)["library/alice/agents/helper.md"]["stamp"][0] == helper.stat().st_mtime_ns
+
+    load_index(mini_repo, SCHEMA)
+    assert "index-file-hash-hits" not in counters()
+
+
+def test_same_size_edit_is_reparsed(mini_repo: Path, counters) -> None:
+    load_index(mini_repo, SCHEMA)
+    helper = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    text = helper.read_text(encoding="utf-8")
+    helper.write_text(text.replace("Helper", "Xelper"), encoding="utf-8")
+    backdate(helper.parent, 30)
+    counters()
+
+    assert description(mini_repo, "agents", "helper") == "Xelper agent"
+    seen = counters()
+    assert seen["index-file-scans"] == 1 and "index-file-hash-hits" not in seen
+
+
+def test_mode_change_is_not_a_hash_hit(mini_repo: Path, counters) -> None:
+    schema = dict(SCHEMA, categories={"scripts": {}})
+    script = mini_repo / "library" / "alice" / "scripts" / "run.sh"
+    script.parent.mkdir(parents=True)
+    script.write_text("#!/bin/sh\n", encoding="utf-8")
+    script.chmod(0o644)
+    backdate(script.parent, 30)
+    assert not load_index(mini_repo, schema).category("scripts")[0].executable
+
+    script.chmod(0o755)  # same bytes, but the executable bit is a cached fact
+    backdate(script.parent, 30)
+    counters()
+    assert load_index(mini_repo, schema).category("scripts")[0].executable
+    assert counters()["index-file-scans"] == 1
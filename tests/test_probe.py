@@ -0,0 +1,133 @@
+"""Probe engine: concurrent probes, timeouts, the extras registry and install hints."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import devkit_probe
+from conftest import REPO_ROOT, run_script, write_extra
+from devkit_probe import ProbeResult, ToolSpec
+
+
+@pytest.fixture
+def bin_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    d = tmp_path / "bin"
+    d.mkdir()
+    monkeypatch.setenv("PATH", f"{d}{os.pathsep}{os.environ['PATH']}")
+    return d
+
+
+def fake_tool(bin_dir: Path, name: str, body: str) -> None:
+    path = bin_dir / name
+    path.write_text(f"#!/bin/sh\n{body}\n", encoding="utf-8")
+    path.chmod(0o755)
+
+
+def test_probes_run_concurrently(bin_dir: Path) -> None:
+    for n in range(4):
+        fake_tool(bin_dir, f"slow{n}", "sleep 0.5")
+    specs = [ToolSpec(id=f"slow{n}", check=(f"slow{n}",)) for n in range(4)]
+    start = time.monotonic()
+    results = devkit_probe.probe_all(specs, "Linux")
+    assert time.monotonic() - start < 1.5  # four 0.5s probes, not 2s
+    assert all(r.found for r in results.values())
+
+
+def test_timeout_and_version_checks(bin_dir: Path) -> None:
+    fake_tool(bin_dir, "hangs", "sleep 3")
+    fake_tool(bin_dir, "oldtool", "echo oldtool version 2.20.1")
+    specs = [
+        ToolSpec(id="hangs", check=("hangs",), timeout=0.2),
+        ToolSpec(id="old", bin="oldtool", version=("oldtool",), min_version="2.30.0"),
+        ToolSpec(id="absent", bin="definitely-not-installed-devkit"),
+    ]
+    results = devkit_probe.probe_all(specs, "Linux")
+    assert results["hangs"].timed_out
+    assert results["old"].outdated and results["old"].version_str == "2.20.1"
+    assert not results["absent"].found and not results["absent"].timed_out
+    assert devkit_probe.extra_hint_lines(specs[0], results["hangs"], "Linux", False) == ["unknown (probe timed out)"]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(3, 3.0), (0.5, 0.5), ("5s", None), (0, None), (-1, None), (True, None), (float("inf"), None), ([5], None)],
+)
+def test_parse_timeout(value, expected) -> None:
+    assert devkit_probe.parse_timeout(value) == expected
+
+
+def test_bad_timeout_warns_and_falls_back(capsys: pytest.CaptureFixture) -> None:
+    spec = devkit_probe.spec_from_frontmatter("x", {"bin": "x", "timeout": "5s"})
+    assert spec.timeout == devkit_probe.DEFAULT_TIMEOUT
+    assert "probe timeout '5s' is not a positive number of seconds; using 5" in capsys.readouterr().err
+
+
+def test_registry_first_author_wins_with_or_without_probe(tmp_path: Path) -> None:
+    write_extra(tmp_path, "alice", "tool")  # no probe: "unknown", but still claims the id
+    write_extra(tmp_path, "bob", "tool", "  bin: tool\n")
+    write_extra(tmp_path, "bob", "other", "  bin: other\n  timeout: 2\n")
+    registry = devkit_probe.load_extras_registry(tmp_path / "library")
+    assert sorted(registry) == ["other"]
+    assert registry["other"].timeout == 2.0
+
+
+def test_validator_rejects_bad_probe_timeouts(mini_repo: Path) -> None:
+    write_extra(mini_repo, "alice", "good", "  bin: good\n  timeout: 2\n")
+    write_extra(mini_repo, "alice", "bad", "  bin: bad\n  timeout: 5s\n")
+    r = run_script(mini_repo, "devkit-validate-library.py", "--no-cache")
+    assert r.returncode == 1
+    assert "probe timeout must be a positive number of seconds, got '5s'" in r.stdout + r.stderr
+    assert "good.md" not in r.stdout + r.stderr
+
+
+# Install hints for the shipped extras, as printed before the registry existed.
+SHIPPED = devkit_probe.load_extras_registry(REPO_ROOT / "library")
+MISSING = ProbeResult(id="", found=False)
+
+
+@pytest.mark.parametrize(
+    "tool_id, sysname, have_brew, expected",
+    [
+        ("git-cli", "Darwin", True, ["missing", "1) brew install git", "2) if blocked: xcode-select --install", "3) https://git-scm.com/downloads"]),
+        (
+            "git-cli",
+            "Darwin",
+            False,
+            [
+                "missing",
+                "1) (xapids suggestion) install Homebrew: https://brew.sh/",
+                "2) brew install git",
+                "3) if blocked: xcode-select --install",
+                "4) https://git-scm.com/downloads",
+            ],
+        ),
+        ("git-cli", "Linux", False, ["missing"]),
+        ("git-cli", "Windows", False, ["missing"]),
+        ("claude-code-cli", "Darwin", True, ["missing", "1) brew install --cask <claude> (if published)", "2) https://code.claude.com/"]),
+        ("claude-code-cli", "Darwin", False, ["missing", "1) https://code.claude.com/"]),
+        ("claude-code-cli", "Windows", False, ["missing", "https://code.claude.com/"]),
+        ("opencode-cli", "Darwin", True, ["missing", "1) brew install opencode (if published)", "2) https://opencode.ai/"]),
+        ("opencode-cli", "Darwin", False, ["missing", "1) https://opencode.ai/"]),
+        ("opencode-cli", "Linux", False, ["missing"]),
+        ("vscode-gui", "Darwin", True, ["missing", "1) brew install --cask visual-studio-code", "2) https://code.visualstudio.com/"]),
+        ("vscode-gui", "Linux", False, ["missing", "1) https://code.visualstudio.com/"]),
+        ("codelayer-gui", "Windows", False, ["missing", "1) provider instructions"]),
+    ],
+)
+def test_shipped_hints(tool_id: str, sysname: str, have_brew: bool, expected: List[str]) -> None:
+    assert devkit_probe.extra_hint_lines(SHIPPED[tool_id], MISSING, sysname, have_brew) == expected
+
+
+def test_outdated_hint() -> None:
+    result = ProbeResult(id="git-cli", found=True, version=(2, 20, 0), outdated=True)
+    assert devkit_probe.extra_hint_lines(SHIPPED["git-cli"], result, "Darwin", True) == [
+        "outdated (2.20.0)",
+        "1) brew upgrade git",
+        "2) https://git-scm.com/downloads",
+    ]
+    assert devkit_probe.extra_hint_lines(SHIPPED["git-cli"], result, "Linux", False) == ["outdated (2.20.0)"]
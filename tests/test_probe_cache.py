@@ -0,0 +1,99 @@
+"""Extras probe cache: keys follow the probed binary / app / Caskroom, entries expire."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import devkit_probe
+from devkit_probe import ProbeCache, ToolSpec
+
+
+@pytest.fixture
+def bin_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Fake tools on PATH; each call appends its name to calls.log.
+    d = tmp_path / "bin"
+    d.mkdir()
+    monkeypatch.setenv("PATH", f"{d}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    return d
+
+
+def fake_tool(bin_dir: Path, name: str, body: str) -> Path:
+    path = bin_dir / name
+    path.write_text(f'#!/bin/sh\necho {name} >> "{bin_dir}/calls.log"\n{body}\n', encoding="utf-8")
+    path.chmod(0o755)
+    return path
+
+
+def calls(bin_dir: Path) -> int:
+    log = bin_dir / "calls.log"
+    return len(log.read_text(encoding="utf-8").splitlines()) if log.exists() else 0
+
+
+def test_entries_round_trip_and_expire(tmp_path: Path) -> None:
+    path = tmp_path / "probes.json"
+    cache = ProbeCache(path)
+    cache.put("k", "v")
+    cache.put(None, "ignored")
+    cache.save()
+    assert ProbeCache(path).get("k") == "v"
+    assert ProbeCache(path, refresh=True).get("k") is None
+    assert ProbeCache(path, ttl=-1).get("k") is None
+
+
+def test_version_output_is_cached_until_the_binary_changes(bin_dir: Path, tmp_path: Path) -> None:
+    tool = fake_tool(bin_dir, "faketool", "echo faketool 1.2.3")
+    cache = ProbeCache(tmp_path / "probes.json")
+    assert devkit_probe._run(("faketool", "--version"), 5, cache, capture=True) == "faketool 1.2.3"
+    assert devkit_probe._run(("faketool", "--version"), 5, cache, capture=True) == "faketool 1.2.3"
+    assert calls(bin_dir) == 1
+
+    tool.write_text(tool.read_text(encoding="utf-8").replace("1.2.3", "1.3.0"), encoding="utf-8")  # upgraded
+    assert devkit_probe._run(("faketool", "--version"), 5, cache, capture=True) == "faketool 1.3.0"
+    assert calls(bin_dir) == 2
+
+
+def test_timeouts_are_not_cached(bin_dir: Path, tmp_path: Path) -> None:
+    fake_tool(bin_dir, "slowtool", "sleep 2")
+    cache = ProbeCache(tmp_path / "probes.json")
+    with pytest.raises(devkit_probe.ProbeTimeout):
+        devkit_probe._run(("slowtool",), 0.2, cache, capture=False)
+    assert not cache.dirty
+
+
+def test_cask_install_invalidates_a_cached_miss(bin_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # `brew list --cask X` succeeds when Caskroom/X exists; the brew binary never changes.
+    prefix = tmp_path / "homebrew"
+    caskroom = prefix / "Caskroom"
+    caskroom.mkdir(parents=True)
+    monkeypatch.setenv("HOMEBREW_PREFIX", str(prefix))
+    fake_tool(bin_dir, "brew", f'test -d "{caskroom}/$3"')
+    spec = ToolSpec(id="fake-gui", mac_app="Fake App", brew_cask="fake-app")
+    cache = ProbeCache(tmp_path / "probes.json")
+
+    assert not devkit_probe.probe(spec, "Darwin", True, cache).found
+    assert not devkit_probe.probe(spec, "Darwin", True, cache).found
+    assert calls(bin_dir) == 1
+
+    (caskroom / "fake-app").mkdir()  # brew install --cask fake-app
+    later = time.time() + 5
+    os.utime(caskroom, (later, later))  # coarse-timestamp filesystems
+    assert devkit_probe.probe(spec, "Darwin", True, cache).found
+    assert calls(bin_dir) == 2
+
+
+def test_app_bundle_install_invalidates_a_cached_miss(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    apps = tmp_path / "Applications"
+    apps.mkdir()
+    cache = ProbeCache(tmp_path / "probes.json")
+    assert not devkit_probe._macos_app_exists("Fake App", cache)
+
+    (apps / "Fake App.app").mkdir()
+    later = time.time() + 5
+    os.utime(apps, (later, later))
+    assert devkit_probe._macos_app_exists("Fake App", cache)
@@ -0,0 +1,109 @@
+"""Bundle export/install and manifest validation (manifest paths and hashes are untrusted)."""
+
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from conftest import run_sync
+
+
+def rewrite_bundle(bundle: Path, edit: Callable[[str, bytes], bytes]) -> None:
+    # Re-pack member by member, passing each regular file's bytes through edit(name, data).
+    members: list[tuple[tarfile.TarInfo, bytes]] = []
+    with tarfile.open(bundle, "r") as tar:
+        for info in tar.getmembers():
+            f = tar.extractfile(info) if info.isreg() else None
+            members.append((info, f.read() if f is not None else b""))
+    with tarfile.open(bundle, "w") as tar:
+        for info, data in members:
+            if info.isreg():
+                data = edit(info.name, data)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+            else:
+                tar.addfile(info)
+
+
+def edit_manifest(fn: Callable[[Dict], None]) -> Callable[[str, bytes], bytes]:
+    def edit(name: str, data: bytes) -> bytes:
+        if name != "manifest.json":
+            return data
+        manifest = json.loads(data)
+        fn(manifest)
+        return json.dumps(manifest).encode("utf-8")
+
+    return edit
+
+
+@pytest.fixture
+def bundle(mini_repo: Path, tmp_path: Path) -> Path:
+    path = tmp_path / "alice.tar"
+    r = run_sync(mini_repo, "alice", "--export-bundle", str(path))
+    assert r.returncode == 0, r.stderr
+    return path
+
+
+def test_bundle_round_trip(mini_repo: Path, bundle: Path, tmp_path: Path) -> None:
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 0, r.stderr
+    out = tmp_path / "out"
+    assert (out / "claude" / "commands" / "build.md").read_text(encoding="utf-8") == (
+        mini_repo / "library" / "alice" / ".commands" / "build.md"
+    ).read_text(encoding="utf-8")
+    assert (out / "opencode" / "skills" / "tidy" / "reference" / "notes.md").exists()
+    # The verified scratch copy became the first destination; nothing is left behind.
+    assert not list(out.rglob("*.devkit-bundle"))
+    assert not (out / "claude" / "agents" / "helper.md").samefile(out / "opencode" / "agents" / "helper.md")
+
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 0, r.stderr
+    assert "State unchanged" in r.stdout
+
+
+@pytest.mark.parametrize("rel", ["../escape.md", "agents//helper.md", "/abs/helper.md"])
+def test_manifest_destination_must_stay_under_the_root(mini_repo: Path, bundle: Path, tmp_path: Path, rel: str) -> None:
+    def point_away(manifest: Dict) -> None:
+        manifest["entries"][0]["dests"]["claude"] = rel
+
+    rewrite_bundle(bundle, edit_manifest(point_away))
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 1
+    assert "Invalid bundle" in r.stderr
+    assert not (tmp_path / "out" / "claude").exists()
+
+
+def test_manifest_without_version_is_rejected(mini_repo: Path, bundle: Path) -> None:
+    rewrite_bundle(bundle, edit_manifest(lambda manifest: manifest.pop("version")))
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 1
+    assert "Invalid bundle" in r.stderr
+
+
+def test_payload_must_match_its_manifest_hash(mini_repo: Path, bundle: Path, tmp_path: Path) -> None:
+    rewrite_bundle(bundle, lambda name, data: b"tampered\n" if name == "payload/0" else data)
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 1
+    assert "Corrupt bundle" in r.stderr
+    out = tmp_path / "out"
+    assert not (out / "claude" / "agents" / "helper.md").exists()
+    assert not (out / "state.json.journal").exists()  # no intents for what was never written
+    assert not list(out.rglob("*.devkit-bundle"))
+
+
+def test_corrupt_payload_journals_only_what_was_installed(mini_repo: Path, bundle: Path, tmp_path: Path) -> None:
+    with tarfile.open(bundle, "r") as tar:
+        manifest = json.load(tar.extractfile("manifest.json"))
+    last = max(n for n, item in enumerate(manifest["entries"]) if item["kind"] == "file")
+    assert last > 0
+    rewrite_bundle(bundle, lambda name, data: b"tampered\n" if name == f"payload/{last}" else data)
+    r = run_sync(mini_repo, "--install-bundle", str(bundle))
+    assert r.returncode == 1
+    journal = [json.loads(line) for line in (tmp_path / "out" / "state.json.journal").read_text(encoding="utf-8").splitlines()]
+    assert manifest["entries"][last]["id"] not in {r["id"] for r in journal}
+    assert {r["op"] for r in journal} == {"own", "done"}
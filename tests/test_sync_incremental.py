@@ -0,0 +1,58 @@
+"""Incremental sync: entries whose recorded fingerprints still match are skipped."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict
+
+from conftest import backdate, run_sync
+
+
+def actions(stdout: str) -> Dict[str, str]:
+    # "claude: unchanged agents:helper -> ..." -> {"claude agents:helper": "unchanged"}
+    out = {}
+    for line in stdout.splitlines():
+        if " -> " not in line or ": " not in line:
+            continue
+        target, rest = line.split(": ", 1)
+        action, entry = rest.split(" -> ", 1)[0].split(" ", 1)
+        out[f"{target} {entry}"] = action
+    return out
+
+
+def test_second_run_skips_everything(mini_repo: Path) -> None:
+    first = run_sync(mini_repo, "alice")
+    assert first.returncode == 0, first.stderr
+    assert set(actions(first.stdout).values()) == {"install"}
+
+    second = run_sync(mini_repo, "alice")
+    assert second.returncode == 0, second.stderr
+    assert set(actions(second.stdout).values()) == {"unchanged"}
+    assert "State unchanged" in second.stdout
+
+
+def test_touched_source_with_same_bytes_stays_unchanged(mini_repo: Path) -> None:
+    assert run_sync(mini_repo, "alice").returncode == 0
+    backdate(mini_repo / "library", 10)  # every mtime moves, no content does (git checkout)
+
+    r = run_sync(mini_repo, "alice")
+    assert set(actions(r.stdout).values()) == {"unchanged"}
+    assert "State updated" in r.stdout  # refreshed stat signatures, back on the fast path
+
+
+def test_edited_source_and_edited_dest_are_rewritten(mini_repo: Path, tmp_path: Path) -> None:
+    assert run_sync(mini_repo, "alice").returncode == 0
+    (mini_repo / "library" / "alice" / "agents" / "helper.md").write_text(
+        "---\ndescription: Edited\n---\n", encoding="utf-8"
+    )
+    dest = tmp_path / "out" / "opencode" / "commands" / "build.md"
+    dest.write_text("local edit\n", encoding="utf-8")
+    os.utime(dest, (1, 1))
+
+    seen = actions(run_sync(mini_repo, "alice").stdout)
+    assert seen["claude agents:helper"] == "update"
+    assert seen["opencode commands:build"] == "update"
+    assert seen["claude commands:build"] == "unchanged"
+    assert "Edited" in (tmp_path / "out" / "claude" / "agents" / "helper.md").read_text(encoding="utf-8")
+    assert dest.read_text(encoding="utf-8").startswith("---")
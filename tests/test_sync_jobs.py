@@ -0,0 +1,62 @@
+"""--jobs N: copies and prunes on a worker pool, results reported in plan order."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import PROFILE, run_sync
+
+
+def test_run_ordered_keeps_submission_order(sync) -> None:
+    seen = []
+
+    def job(n: int):
+        def run() -> int:
+            time.sleep(0.02 * (5 - n))  # later jobs finish first
+            seen.append(threading.get_ident())
+            return n
+
+        return run
+
+    assert list(sync.run_ordered([job(n) for n in range(5)], 4)) == [0, 1, 2, 3, 4]
+    assert len(set(seen)) > 1
+
+
+def test_run_ordered_is_inline_with_one_worker(sync) -> None:
+    main = threading.get_ident()
+    assert list(sync.run_ordered([lambda: threading.get_ident()] * 3, 1)) == [main] * 3
+
+
+def test_run_ordered_raises_the_first_failure(sync) -> None:
+    def boom() -> int:
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        list(sync.run_ordered([lambda: 1, boom, lambda: 3], 2))
+
+
+def test_parallel_sync_matches_serial(mini_repo: Path, tmp_path: Path) -> None:
+    serial = run_sync(mini_repo, "alice", "--jobs", "1")
+    assert serial.returncode == 0, serial.stderr
+    (tmp_path / "out").rename(tmp_path / "serial")
+
+    parallel = run_sync(mini_repo, "alice", "--jobs", "4")
+    assert parallel.returncode == 0, parallel.stderr
+    assert parallel.stdout.replace("/out/", "/serial/") == serial.stdout.replace("/out/", "/serial/")
+
+    # Disable everything: the prunes run on the pool too.
+    (mini_repo / "profiles" / "alice.yml").write_text(PROFILE.replace("true", "false"), encoding="utf-8")
+    pruned = run_sync(mini_repo, "alice", "--jobs", "4")
+    assert pruned.returncode == 0, pruned.stderr
+    assert pruned.stdout.count(": prune ") == 6
+    assert not any(p.is_file() for p in (tmp_path / "out" / "claude").rglob("*"))
+
+
+def test_jobs_must_be_positive(mini_repo: Path) -> None:
+    r = run_sync(mini_repo, "alice", "--jobs", "0")
+    assert r.returncode == 2
+    assert "must be >= 1" in r.stderr
@@ -0,0 +1,57 @@
+"""--plan-out / --apply: a plan file is applied as written, once, and only while fresh."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from conftest import backdate, run_sync
+
+
+def test_plan_out_then_apply_twice(mini_repo: Path, tmp_path: Path) -> None:
+    plan = tmp_path / "plan.json"
+    out = tmp_path / "out"
+    r = run_sync(mini_repo, "alice", "--plan-out", str(plan))
+    assert r.returncode == 0, r.stderr
+    assert "6 write(s), 0 prune(s)" in r.stdout
+    assert not out.exists()  # planning changes nothing
+
+    r = run_sync(mini_repo, "--apply", str(plan))
+    assert r.returncode == 0, r.stderr
+    assert (out / "claude" / "agents" / "helper.md").read_text(encoding="utf-8").startswith("---")
+    assert (out / "opencode" / "skills" / "tidy" / "reference" / "notes.md").exists()
+    assert "State updated" in r.stdout
+
+    # Re-applying the same plan is a no-op, not drift.
+    r = run_sync(mini_repo, "--apply", str(plan))
+    assert r.returncode == 0, r.stderr
+    lines = [line for line in r.stdout.splitlines() if ": " in line and "->" in line]
+    assert len(lines) == 6 and all(": unchanged " in line for line in lines)
+    assert "State unchanged" in r.stdout
+
+
+def test_apply_refuses_a_stale_plan(mini_repo: Path, tmp_path: Path) -> None:
+    plan = tmp_path / "plan.json"
+    assert run_sync(mini_repo, "alice", "--plan-out", str(plan)).returncode == 0
+    helper = mini_repo / "library" / "alice" / "agents" / "helper.md"
+    helper.write_text("---\ndescription: Edited after planning\n---\n", encoding="utf-8")
+    backdate(mini_repo / "library", 30)
+
+    r = run_sync(mini_repo, "--apply", str(plan))
+    assert r.returncode == 1
+    assert "Plan is stale" in r.stderr
+    assert not (tmp_path / "out" / "claude").exists()
+
+
+def test_apply_rejects_options_that_contradict_the_plan(mini_repo: Path, tmp_path: Path) -> None:
+    plan = tmp_path / "plan.json"
+    assert run_sync(mini_repo, "alice", "--plan-out", str(plan)).returncode == 0
+    assert json.loads(plan.read_text(encoding="utf-8"))["installMode"] == "copy"
+
+    r = run_sync(mini_repo, "--apply", str(plan), "--install-mode", "symlink")
+    assert r.returncode == 2
+    assert "conflicts with the plan" in r.stderr
+    # Restating the planned value is fine.
+    assert run_sync(mini_repo, "--apply", str(plan), "--install-mode", "copy").returncode == 0
+
+
@@ -0,0 +1,53 @@
+"""Sync preflight: sources and destinations are answered from one listing per directory."""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict
+
+from conftest import PROFILE, run_sync
+
+
+def counters(trace: Path) -> Dict[str, int]:
+    rows = [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines()]
+    return {r["counter"]: r["value"] for r in rows if r["type"] == "counter"}
+
+
+def test_plan_parses_only_the_enabled_tools(mini_repo: Path, tmp_path: Path) -> None:
+    # Other tools are never listed or parsed; only extras/scripts are indexed for closures.
+    for n in range(20):
+        other = mini_repo / "library" / "alice" / "agents" / f"other{n}.md"
+        other.write_text("---\ndescription: [broken\n---\n", encoding="utf-8")
+    trace = tmp_path / "trace.jsonl"
+    r = run_sync(mini_repo, "alice", "--trace", str(trace))
+    assert r.returncode == 0, r.stderr
+    assert counters(trace)["index-file-scans"] == 3  # helper, build, tidy
+    cached = json.loads((mini_repo / ".devkit-cache" / "library-index.json").read_text(encoding="utf-8"))
+    assert not any("/other" in key for key in cached["files"])
+
+
+def test_missing_sources_abort_before_any_write(mini_repo: Path, tmp_path: Path) -> None:
+    shutil.rmtree(mini_repo / "library" / "alice" / "skills" / "tidy")
+    r = run_sync(mini_repo, "alice")
+    assert r.returncode == 1
+    assert "Missing skill source directory" in r.stderr
+    assert not (tmp_path / "out").exists()
+
+    profile = PROFILE.replace("{id: tidy, author: alice, enabled: true}", "{id: tidy, author: alice, enabled: false}")
+    (mini_repo / "profiles" / "alice.yml").write_text(profile + "  - {id: ghost, author: alice, enabled: false}\n", encoding="utf-8")
+    (mini_repo / "library" / "alice" / "agents" / "helper.md").rename(mini_repo / "library" / "alice" / "agents" / "helper")
+    r = run_sync(mini_repo, "alice")
+    assert r.returncode == 1
+    assert "Missing source file" in r.stderr  # a directory is not a source file
+
+
+def test_unowned_destination_conflict(mini_repo: Path, tmp_path: Path) -> None:
+    dest = tmp_path / "out" / "claude" / "commands" / "build.md"
+    dest.parent.mkdir(parents=True)
+    dest.write_text("mine\n", encoding="utf-8")
+    r = run_sync(mini_repo, "alice")
+    assert r.returncode == 1
+    assert "Destination conflict (not adapter-owned)" in r.stderr
+    assert dest.read_text(encoding="utf-8") == "mine\n"
@@ -0,0 +1,187 @@
+"""Ownership state: write-ahead journal recovery (json), pending rows (sqlite), staging cleanup."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from conftest import run_sync
+
+
+def entry(sync, tool_id: str = "helper"):
+    return sync.Entry(category="agents", id=tool_id, author="alice", enabled=True)
+
+
+RECORD = {"mode": "copy", "src": "s", "dest": "d", "content": "c"}
+
+
+def test_interrupted_run_is_recovered_from_the_journal(sync, tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    dest = tmp_path / "claude" / "agents" / "helper.md"
+    state = sync.JsonState(state_path)
+    state.begin([("claude", entry(sync), dest)])
+    # Crash: no record_write/commit. The intent alone must keep the dest owned.
+    assert not state_path.exists()
+
+    recovered = sync.JsonState(state_path)
+    assert recovered.recovered == 1
+    assert recovered.owned_path("claude", entry(sync)) == str(dest)
+    assert recovered.fingerprint("claude", entry(sync)) is None  # write may be partial
+    assert recovered.commit() is True
+    assert not sync.journal_path(state_path).exists()
+    assert sync.JsonState(state_path).owned_path("claude", entry(sync)) == str(dest)
+
+
+def test_completed_writes_and_prunes_replay_in_order(sync, tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    a, b = entry(sync, "a"), entry(sync, "b")
+    state = sync.JsonState(state_path)
+    state.begin([("claude", a, tmp_path / "a.md"), ("claude", b, tmp_path / "b.md")])
+    state.record_write("claude", a, tmp_path / "a.md", "install", RECORD)
+    state.record_write("claude", b, tmp_path / "b.md", "install", RECORD)
+    state.record_prune("claude", b)
+
+    recovered = sync.JsonState(state_path)
+    assert recovered.fingerprint("claude", a) == RECORD
+    assert recovered.owned_path("claude", b) is None
+
+
+def test_torn_journal_line_is_ignored(sync, tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    state = sync.JsonState(state_path)
+    state.begin([("claude", entry(sync), tmp_path / "helper.md")])
+    with open(sync.journal_path(state_path), "a", encoding="utf-8") as f:
+        f.write('{"op": "clear", "target": "cla')  # killed mid-append
+
+    recovered = sync.JsonState(state_path)
+    assert recovered.recovered == 1
+    assert recovered.owned_path("claude", entry(sync)) == str(tmp_path / "helper.md")
+
+
+def test_staged_install_leaves_no_temp_file(sync, tmp_path: Path) -> None:
+    src = tmp_path / "src.md"
+    src.write_text("new\n", encoding="utf-8")
+    dest = tmp_path / "dest.md"
+    dest.write_text("old\n", encoding="utf-8")
+    sync.install_file(src, dest, "copy")
+    assert dest.read_text(encoding="utf-8") == "new\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["dest.md", "src.md"]
+
+
+def test_stale_staging_is_removed_at_run_start(mini_repo: Path, tmp_path: Path) -> None:
+    agents = tmp_path / "out" / "claude" / "agents"
+    agents.mkdir(parents=True)
+    (agents / ".gone.md.devkit-tmp").write_text("partial", encoding="utf-8")
+    (agents / ".keep.md").write_text("user file", encoding="utf-8")
+    other = tmp_path / "out" / "opencode" / "agents"
+    other.mkdir(parents=True)
+    (other / ".gone.md.devkit-tmp").write_text("partial", encoding="utf-8")
+
+    r = run_sync(mini_repo, "alice", "--target", "claude")
+    assert r.returncode == 0, r.stderr
+    assert "Removed 1 stale staging entry" in r.stdout
+    assert sorted(p.name for p in agents.iterdir()) == [".keep.md", "helper.md"]
+    assert (other / ".gone.md.devkit-tmp").exists()  # target not selected
+
+
+def test_no_op_run_writes_no_state(sync, mini_repo: Path, tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    state = sync.JsonState(state_path)
+    state.record_write("claude", entry(sync), tmp_path / "helper.md", "unchanged", None)
+    assert state.commit() is False
+    assert not state_path.exists()
+
+    assert run_sync(mini_repo, "alice").returncode == 0
+    written = (tmp_path / "out" / "state.json").stat().st_mtime_ns
+    r = run_sync(mini_repo, "alice")
+    assert "State unchanged" in r.stdout
+    assert (tmp_path / "out" / "state.json").stat().st_mtime_ns == written
+
+
+def test_sqlite_pending_rows_survive_an_interrupted_run(sync, tmp_path: Path) -> None:
+    a, b = entry(sync, "a"), entry(sync, "b")
+    state = sync.SqliteState(tmp_path / "state.sqlite", tmp_path / "state.json", dry_run=False)
+    state.begin([("claude", a, tmp_path / "a.md"), ("claude", b, tmp_path / "b.md")])
+    state.record_write("claude", a, tmp_path / "a.md", "install", RECORD)
+    state.close()  # crash before b finished and before commit()
+
+    reopened = sync.SqliteState(tmp_path / "state.sqlite", tmp_path / "state.json", dry_run=False)
+    try:
+        assert reopened.recovered == 1
+        assert reopened.fingerprint("claude", a) == RECORD  # completed rows are kept
+        assert reopened.owned_path("claude", b) == str(tmp_path / "b.md")
+        assert reopened.fingerprint("claude", b) is None
+    finally:
+        reopened.close()
+
+
+def test_sqlite_write_lock_is_not_held_between_rows(sync, tmp_path: Path) -> None:
+    # Another run (other profile/home sharing the file) must not wait for our whole copy phase.
+    path = tmp_path / "state.sqlite"
+    state = sync.SqliteState(path, tmp_path / "state.json", dry_run=False)
+    other = sqlite3.connect(str(path), timeout=0, isolation_level=None)
+    try:
+        state.begin([("claude", entry(sync), tmp_path / "helper.md")])
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("COMMIT")
+        state.record_write("claude", entry(sync), tmp_path / "helper.md", "install", RECORD)
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("COMMIT")
+        assert other.execute("SELECT pending FROM owned").fetchall() == [(0,)]
+        assert state.commit() is True
+    finally:
+        other.close()
+        state.close()
+
+
+def test_migrated_state_refuses_the_json_backend(sync, tmp_path: Path) -> None:
+    state_path = tmp_path / "state.json"
+    legacy = sync.JsonState(state_path)
+    legacy.record_write("claude", entry(sync), tmp_path / "helper.md", "install", RECORD)
+    assert legacy.commit() is True
+
+    migrated = sync.open_state(state_path, "sqlite", dry_run=False)
+    assert migrated.migrated == 1
+    migrated.close()
+    assert not state_path.exists()
+    with pytest.raises(SystemExit):
+        sync.open_state(state_path, "json", dry_run=False)
+
+
+def test_migration_reads_the_state_file_given(sync, tmp_path: Path) -> None:
+    # --state-file foo.state: migrate foo.state itself, not a foo.json next to it.
+    state_path = tmp_path / "foo.state"
+    legacy = sync.JsonState(state_path)
+    legacy.record_write("claude", entry(sync), tmp_path / "helper.md", "install", RECORD)
+    legacy.commit()
+    (tmp_path / "foo.json").write_text("{}", encoding="utf-8")
+
+    migrated = sync.open_state(state_path, "sqlite", dry_run=False)
+    try:
+        assert migrated.path == tmp_path / "foo.sqlite"
+        assert migrated.migrated == 1
+        assert migrated.owned_path("claude", entry(sync)) == str(tmp_path / "helper.md")
+    finally:
+        migrated.close()
+    assert (tmp_path / "foo.state.migrated").exists() and (tmp_path / "foo.json").exists()
+
+
+def test_state_file_may_be_the_database(sync, tmp_path: Path) -> None:
+    state = sync.open_state(tmp_path / "state.sqlite", "sqlite", dry_run=False)
+    try:
+        assert state.migrated == 0
+    finally:
+        state.close()
+
+
+def test_sqlite_sync_end_to_end(mini_repo: Path, tmp_path: Path) -> None:
+    assert run_sync(mini_repo, "alice").returncode == 0
+    r = run_sync(mini_repo, "alice", "--state-backend", "sqlite")
+    assert r.returncode == 0, r.stderr
+    assert "Migrated 6 ownership record(s)" in r.stdout
+    assert "install" not in r.stdout.replace("unchanged", "")
+    r = run_sync(mini_repo, "alice")
+    assert r.returncode == 1
+    assert "--state-backend sqlite" in r.stderr
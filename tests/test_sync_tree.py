@@ -0,0 +1,50 @@
+"""Skill directories are updated with a per-file delta, not rmtree + copytree."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def make_skill(src: Path) -> None:
+    (src / "reference").mkdir(parents=True)
+    (src / "SKILL.md").write_text("skill\n", encoding="utf-8")
+    (src / "reference" / "notes.md").write_text("notes\n", encoding="utf-8")
+
+
+def test_only_what_differs_is_touched(sync, tmp_path: Path) -> None:
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    make_skill(src)
+    sync.sync_tree(src, dest)
+    (dest / "extra.md").write_text("not in the source\n", encoding="utf-8")
+    kept = (dest / "SKILL.md").stat().st_ino
+    kept_dir = (dest / "reference").stat().st_ino
+
+    (src / "reference" / "notes.md").write_text("new notes, longer\n", encoding="utf-8")
+    sync.sync_tree(src, dest)
+
+    assert not (dest / "extra.md").exists()
+    assert (dest / "SKILL.md").stat().st_ino == kept
+    assert (dest / "reference").stat().st_ino == kept_dir
+    assert (dest / "reference" / "notes.md").read_text(encoding="utf-8") == "new notes, longer\n"
+
+
+def test_kind_changes_are_replaced(sync, tmp_path: Path) -> None:
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    make_skill(src)
+    sync.sync_tree(src, dest)
+    # Source swaps a dir for a file and vice versa; a symlinked dest dir is unlinked, not followed.
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.md").write_text("keep\n", encoding="utf-8")
+    (src / "reference" / "notes.md").unlink()
+    (src / "reference").rmdir()
+    (src / "reference").write_text("now a file\n", encoding="utf-8")
+    (src / "assets").mkdir()
+    (src / "assets" / "a.txt").write_text("a\n", encoding="utf-8")
+    (dest / "assets").symlink_to(outside)
+
+    sync.sync_tree(src, dest)
+
+    assert (dest / "reference").read_text(encoding="utf-8") == "now a file\n"
+    assert not (dest / "assets").is_symlink() and (dest / "assets" / "a.txt").exists()
+    assert (outside / "keep.md").exists()
@@ -0,0 +1,154 @@
+"""--watch: change detection (inotify + polling), change classification, the watch loop."""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import run_sync
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+
+def drain(watcher, settle: float = 0.2) -> set:
+    changed: set = set()
+    while True:
+        more = watcher.poll(settle)
+        if not more:
+            return changed
+        changed |= more
+
+
+@linux_only
+def test_inotify_follows_created_and_deleted_dirs(sync, tmp_path: Path) -> None:
+    root = tmp_path / "library"
+    root.mkdir()
+    watcher = sync.InotifyWatcher([root])
+    try:
+        assert len(watcher._dirs) == 1
+        (root / "tidy" / "reference").mkdir(parents=True)
+        drain(watcher)
+        (root / "tidy" / "reference" / "notes.md").write_text("x\n", encoding="utf-8")
+        assert root / "tidy" / "reference" / "notes.md" in drain(watcher)
+        assert len(watcher._dirs) == 3
+
+        shutil.rmtree(root / "tidy")
+        assert root / "tidy" in drain(watcher)
+        assert list(watcher._dirs.values()) == [root]
+    finally:
+        watcher.close()
+
+
+@linux_only
+def test_inotify_renames_keep_one_watch_per_dir(sync, tmp_path: Path) -> None:
+    root, outside = tmp_path / "library", tmp_path / "outside"
+    (root / "old" / "sub").mkdir(parents=True)
+    outside.mkdir()
+    watcher = sync.InotifyWatcher([root])
+    try:
+        for n in range(5):  # rename the same skill back and forth
+            (root / ("old" if n % 2 == 0 else "new")).rename(root / ("new" if n % 2 == 0 else "old"))
+            drain(watcher)
+        assert sorted(watcher._dirs.values()) == [root, root / "new", root / "new" / "sub"]
+        (root / "new" / "sub" / "a.md").write_text("x\n", encoding="utf-8")
+        assert root / "new" / "sub" / "a.md" in drain(watcher)
+
+        (root / "new").rename(outside / "new")  # moved out: its watches go too
+        drain(watcher)
+        assert list(watcher._dirs.values()) == [root]
+        (outside / "new" / "sub" / "b.md").write_text("x\n", encoding="utf-8")
+        assert drain(watcher) == set()
+    finally:
+        watcher.close()
+
+
+def test_polling_watcher_reports_changed_paths(sync, tmp_path: Path) -> None:
+    (tmp_path / "agents").mkdir()
+    f = tmp_path / "agents" / "helper.md"
+    f.write_text("one\n", encoding="utf-8")
+    watcher = sync.PollingWatcher([tmp_path])
+    f.write_text("one two\n", encoding="utf-8")
+    assert f in watcher.poll(0)
+    assert watcher.poll(0) == set()
+
+
+def test_classify_change(sync, tmp_path: Path) -> None:
+    lib = tmp_path / "library"
+    profiles = ["alice"]
+    assert sync.classify_change(tmp_path / "profiles" / "alice.yml", tmp_path, profiles) == ("profile", "alice")
+    assert sync.classify_change(tmp_path / "profiles" / "bob.yml", tmp_path, profiles) == ("ignore", None)
+    assert sync.classify_change(lib / "alice" / ".commands" / "build.md", tmp_path, profiles) == (
+        "entry",
+        ("commands", "build", "alice"),
+    )
+    assert sync.classify_change(lib / "alice" / "skills" / "tidy" / "reference" / "a.md", tmp_path, profiles) == (
+        "entry",
+        ("skills", "tidy", "alice"),
+    )
+    assert sync.classify_change(lib / "alice" / "scripts" / "x.py", tmp_path, profiles) == ("full", None)
+    assert sync.classify_change(lib / "alice", tmp_path, profiles) == ("full", None)
+    assert sync.classify_change(tmp_path / "README.md", tmp_path, profiles) == ("ignore", None)
+
+
+def test_watch_resyncs_an_edited_entry(mini_repo: Path, tmp_path: Path) -> None:
+    # Start the watch loop, edit one agent, expect exactly that entry to be re-synced.
+    assert run_sync(mini_repo, "alice").returncode == 0
+    out = tmp_path / "out"
+    argv = [
+        sys.executable,
+        str(mini_repo / "repo-library" / "scripts" / "devkit-sync-adapter.py"),
+        "alice",
+        "--watch",
+        "--watch-interval",
+        "0.1",
+        "--watch-debounce",
+        "0.1",
+        "--claude-root",
+        str(out / "claude"),
+        "--opencode-root",
+        str(out / "opencode"),
+        "--state-file",
+        str(out / "state.json"),
+    ]
+    env = dict(os.environ, HOME=str(tmp_path / "home"), PYTHONUNBUFFERED="1")
+    proc = subprocess.Popen(argv, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    lines: "queue.Queue[str]" = queue.Queue()
+    threading.Thread(target=lambda: [lines.put(line) for line in proc.stdout], daemon=True).start()
+
+    def wait_for(text: str) -> list:
+        seen = []
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                line = lines.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            seen.append(line)
+            if text in line:
+                return seen
+        pytest.fail(f"no {text!r} in watch output: {''.join(seen)}")
+
+    try:
+        wait_for("Watching library/")
+        (mini_repo / "library" / "alice" / "agents" / "helper.md").write_text(
+            "---\ndescription: Edited while watching\n---\n", encoding="utf-8"
+        )
+        seen = wait_for("State updated")
+        synced = [line for line in seen if " -> " in line]
+        assert sorted(line.split(" -> ")[0] for line in synced) == [
+            "claude: update agents:helper",
+            "opencode: update agents:helper",
+        ]
+        assert "Edited while watching" in (out / "claude" / "agents" / "helper.md").read_text(encoding="utf-8")
+    finally:
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=10) == 0
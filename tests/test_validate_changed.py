@@ -0,0 +1,81 @@
+"""validate --changed-since REF: per-file checks on the diff, references library-wide."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from conftest import run_script, write_extra
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(mini_repo: Path) -> Path:
+    # Committed with one tool that already fails validation (no description).
+    write_extra(mini_repo, "alice", "jq-cli")
+    (mini_repo / "library" / "alice" / "agents" / "legacy.md").write_text("---\nname: legacy\n---\n", encoding="utf-8")
+    git(mini_repo, "init", "-q")
+    git(mini_repo, "add", "library", "config")
+    git(mini_repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "base")
+    return mini_repo
+
+
+def validate(repo: Path, *args: str):
+    r = run_script(repo, "devkit-validate-library.py", *args)
+    return r.returncode, r.stdout + r.stderr
+
+
+def test_only_changed_tools_get_per_file_checks(repo: Path) -> None:
+    code, out = validate(repo)
+    assert code == 1 and "legacy.md" in out
+
+    code, out = validate(repo, "--changed-since", "HEAD")
+    assert code == 0, out
+    assert "(0 path(s) changed since HEAD)" in out
+
+    helper = repo / "library" / "alice" / "agents" / "helper.md"
+    helper.write_text("---\nname: helper\n---\n", encoding="utf-8")
+    (repo / "library" / "alice" / "agents" / "fresh.md").write_text("---\nname: fresh\n---\n", encoding="utf-8")  # untracked
+    code, out = validate(repo, "--changed-since", "HEAD")
+    assert code == 1
+    assert "(2 path(s) changed since HEAD)" in out
+    assert "helper.md" in out and "fresh.md" in out
+    assert "legacy.md" not in out
+
+
+def test_skill_folder_changes_select_the_skill(repo: Path) -> None:
+    (repo / "library" / "alice" / "skills" / "tidy" / "SKILL.md").write_text("---\nname: tidy\n---\n", encoding="utf-8")
+    code, out = validate(repo, "--changed-since", "HEAD")
+    assert code == 1 and "tidy" in out and "legacy.md" not in out
+
+
+def test_references_are_still_checked_library_wide(repo: Path) -> None:
+    helper = repo / "library" / "alice" / "agents" / "helper.md"
+    helper.write_text("---\ndescription: Helper agent\nrequires_extras: [jq-cli]\n---\n", encoding="utf-8")
+    git(repo, "add", "library")
+    git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "-m", "require jq")
+
+    (repo / "library" / "alice" / "extras" / "jq-cli.md").unlink()  # helper.md itself is unchanged
+    code, out = validate(repo, "--changed-since", "HEAD")
+    assert code == 1
+    assert "requires_extras references non-existent 'jq-cli'" in out
+
+
+def test_config_change_checks_every_file(repo: Path) -> None:
+    schema = repo / "config" / "schema.yml"
+    schema.write_text(schema.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    code, out = validate(repo, "--changed-since", "HEAD")
+    assert code == 1
+    assert "config/ changed since HEAD; checking every file" in out
+    assert "legacy.md" in out
+
+
+def test_bad_ref_is_a_usage_error(repo: Path) -> None:
+    code, out = validate(repo, "--changed-since", "no-such-ref")
+    assert code == 2
+    assert "--changed-since no-such-ref:" in out